@@ -1,10 +1,17 @@
+import os
+import sys
 import openpyxl
+from openpyxl.packaging.custom import StringProperty
 from openpyxl.worksheet.worksheet import Worksheet
 from openpyxl.workbook.workbook import Workbook
-import random
 from pathlib import Path
 from typing import Optional
 
+# Add project root to sys.path so we can import from modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from modules import acak, beban_engine
+
 
 class ExcelBebanProcessor:
     """
@@ -12,16 +19,19 @@ class ExcelBebanProcessor:
     berdasarkan MUTU, KODE_BENDA_UJI, UMUR, dan DOCKET
     """
     
-    def __init__(self, file_path: str, sheet_name: str = 'ODOO'):
+    def __init__(self, file_path: str, sheet_name: str = 'ODOO', seed: Optional[int] = None):
         """
         Inisialisasi processor
         
         Args:
             file_path: Path ke file Excel
             sheet_name: Nama sheet yang akan diproses (default: 'ODOO')
+            seed: Seed acak; isi dengan seed tercatat untuk mengulang hasil (default: seed baru)
         """
         self.file_path = file_path
         self.sheet_name = sheet_name
+        self.aturan = beban_engine.muat_aturan('load')
+        self.konteks = acak.KonteksAcak(seed)
         self.workbook: Optional[Workbook] = None
         self.sheet: Optional[Worksheet] = None
         
@@ -79,653 +89,23 @@ class ExcelBebanProcessor:
         """
         Menghitung nilai BEBAN untuk baris tertentu
         
+        Parameter per mutu diambil dari profil "load" di modules/aturan_mutu.json
+        
         Args:
             row_index: Index baris di Excel (1-based)
             
         Returns:
             String nilai BEBAN atau None jika tidak memenuhi kriteria
         """
-        # Ambil data dari row
-        mutu = str(self.get_cell_value(row_index, 'MUTU') or '')
-        kode_benda_uji = str(self.get_cell_value(row_index, 'KODE_BENDA_UJI') or '')
+        mutu = self.get_cell_value(row_index, 'MUTU')
         umur = self.get_cell_value(row_index, 'UMUR')
         docket = self.get_cell_value(row_index, 'DOCKET')
-
-
-        if "Class B-2" in mutu:
-        # Logika perhitungan berdasarkan UMUR
-            if umur == 7:
-                random_beban = random.uniform(390.12, 460.34)
-                return f"{random_beban:.2f}"        
-            elif umur == 28:
-                # Umur 28 hari dengan logika khusus
-                # Skenario 1: Kondisi awal (docket & beban sebelumnya = 0.0 atau None)
-                if (self.previous_docket is None or self.previous_docket == 0.0 or 
-                    self.previous_beban is None or self.previous_beban == 0.0):
-                    new_beban = random.uniform(580, 700)
-                
-                # Skenario 2: Docket sama & beban != 0
-                elif self.previous_docket == docket and self.previous_beban != None:
-                    mean = (580 + 700) / 2  # 640
-                    if self.previous_beban >= mean:
-                        adjustment = random.uniform(-29, -3)  # Turun
-                    else:
-                        adjustment = random.uniform(3, 29)  # Naik
-                    new_beban = max(580, min(self.previous_beban + adjustment, 700))
-                # Skenario 3: Docket berbeda
-                elif self.previous_docket != docket:
-                    mean = (580 + 700) / 2  # 640
-                    if self.previous_beban >= mean:
-                        adjustment = random.uniform(-59, -40)  # Turun signifikan
-                    else:
-                        adjustment = random.uniform(40, 59)  # Naik signifikan
-                    new_beban = self.previous_beban + adjustment
-                    # Pastikan tetap dalam range
-                    new_beban = max(580, min(new_beban, 700))
-                else:
-                    # Fallback (seharusnya tidak terjadi)
-                    new_beban = random.uniform(580, 700)
-                # Update tracking variables
-                self.previous_docket = str(docket) if docket is not None else None
-                self.previous_beban = new_beban
-                
-                return f"{new_beban:.2f}"
-            else:
-                # Umur selain 7 atau 28
-                return "0.00"
-            
-        elif "K-400" in mutu:
-        # Logika perhitungan berdasarkan UMUR
-            if umur == 7:
-                random_beban = random.uniform(390.12, 460.34)
-                return f"{random_beban:.2f}"        
-            elif umur == 28:
-                # Umur 28 hari dengan logika khusus
-                # Skenario 1: Kondisi awal (docket & beban sebelumnya = 0.0 atau None)
-                if (self.previous_docket is None or self.previous_docket == 0.0 or 
-                    self.previous_beban is None or self.previous_beban == 0.0):
-                    new_beban = random.uniform(580, 700)
-                
-                # Skenario 2: Docket sama & beban != 0
-                elif self.previous_docket == docket and self.previous_beban != None:
-                    mean = (580 + 700) / 2  # 640
-                    if self.previous_beban >= mean:
-                        adjustment = random.uniform(-29, -3)  # Turun
-                    else:
-                        adjustment = random.uniform(3, 29)  # Naik
-                    new_beban = max(580, min(self.previous_beban + adjustment, 700))
-                # Skenario 3: Docket berbeda
-                elif self.previous_docket != docket:
-                    mean = (580 + 700) / 2  # 640
-                    if self.previous_beban >= mean:
-                        adjustment = random.uniform(-59, -40)  # Turun signifikan
-                    else:
-                        adjustment = random.uniform(40, 59)  # Naik signifikan
-                    new_beban = self.previous_beban + adjustment
-                    # Pastikan tetap dalam range
-                    new_beban = max(580, min(new_beban, 700))
-                else:
-                    # Fallback (seharusnya tidak terjadi)
-                    new_beban = random.uniform(580, 700)
-                # Update tracking variables
-                self.previous_docket = str(docket) if docket is not None else None
-                self.previous_beban = new_beban
-                
-                return f"{new_beban:.2f}"
-            else:
-                # Umur selain 7 atau 28
-                return "0.00"
-        
-        elif "Class B-1" in mutu:
-        # Logika perhitungan berdasarkan UMUR
-            if umur == 7:
-                random_beban = random.uniform(360.12, 420.34)
-                return f"{random_beban:.2f}"        
-            elif umur == 28:
-                # Umur 28 hari dengan logika khusus
-                # Skenario 1: Kondisi awal (docket & beban sebelumnya = 0.0 atau None)
-                if (self.previous_docket is None or self.previous_docket == 0.0 or 
-                    self.previous_beban is None or self.previous_beban == 0.0):
-                    new_beban = random.uniform(540, 625)
-                
-                # Skenario 2: Docket sama & beban != 0
-                elif self.previous_docket == docket and self.previous_beban != None:
-                    mean = (540 + 625) / 2  # 582.5
-                    if self.previous_beban >= mean:
-                        adjustment = random.uniform(-29, -3)  # Turun
-                    else:
-                        adjustment = random.uniform(3, 29)  # Naik
-                    new_beban = max(540, min(self.previous_beban + adjustment, 625))
-                # Skenario 3: Docket berbeda
-                elif self.previous_docket != docket:
-                    mean = (540 + 625) / 2  # 582.5
-                    if self.previous_beban >= mean:
-                        adjustment = random.uniform(-42, -30)  # Turun signifikan
-                    else:
-                        adjustment = random.uniform(30, 42)  # Naik signifikan
-                    new_beban = self.previous_beban + adjustment
-                    # Pastikan tetap dalam range
-                    new_beban = max(540, min(new_beban, 625))
-                else:
-                    # Fallback (seharusnya tidak terjadi)
-                    new_beban = random.uniform(540, 625)
-                # Update tracking variables
-                self.previous_docket = str(docket) if docket is not None else None
-                self.previous_beban = new_beban
-                
-                return f"{new_beban:.2f}"
-            else:
-                # Umur selain 7 atau 28
-                return "0.00"
-            
-        elif "Fc-30" in mutu:
-        # Logika perhitungan berdasarkan UMUR
-            if umur == 7:
-                random_beban = random.uniform(360.12, 420.34)
-                return f"{random_beban:.2f}"        
-            elif umur == 28:
-                # Umur 28 hari dengan logika khusus
-                # Skenario 1: Kondisi awal (docket & beban sebelumnya = 0.0 atau None)
-                if (self.previous_docket is None or self.previous_docket == 0.0 or 
-                    self.previous_beban is None or self.previous_beban == 0.0):
-                    new_beban = random.uniform(540, 625)
-                
-                # Skenario 2: Docket sama & beban != 0
-                elif self.previous_docket == docket and self.previous_beban != None:
-                    mean = (540 + 625) / 2  # 582.5
-                    if self.previous_beban >= mean:
-                        adjustment = random.uniform(-29, -3)  # Turun
-                    else:
-                        adjustment = random.uniform(3, 29)  # Naik
-                    new_beban = max(540, min(self.previous_beban + adjustment, 625))
-                # Skenario 3: Docket berbeda
-                elif self.previous_docket != docket:
-                    mean = (540 + 625) / 2  # 582.5
-                    if self.previous_beban >= mean:
-                        adjustment = random.uniform(-42, -30)  # Turun signifikan
-                    else:
-                        adjustment = random.uniform(30, 42)  # Naik signifikan
-                    new_beban = self.previous_beban + adjustment
-                    # Pastikan tetap dalam range
-                    new_beban = max(540, min(new_beban, 625))
-                else:
-                    # Fallback (seharusnya tidak terjadi)
-                    new_beban = random.uniform(540, 625)
-                # Update tracking variables
-                self.previous_docket = str(docket) if docket is not None else None
-                self.previous_beban = new_beban
-                
-                return f"{new_beban:.2f}"
-            else:
-                # Umur selain 7 atau 28
-                return "0.00"
-            
-        elif "K-300" in mutu:
-        # Logika perhitungan berdasarkan UMUR
-            if umur == 7:
-                random_beban = random.uniform(290.12, 360.34)
-                return f"{random_beban:.2f}"        
-            elif umur == 28:
-                # Umur 28 hari dengan logika khusus
-                # Skenario 1: Kondisi awal (docket & beban sebelumnya = 0.0 atau None)
-                if (self.previous_docket is None or self.previous_docket == 0.0 or 
-                    self.previous_beban is None or self.previous_beban == 0.0):
-                    new_beban = random.uniform(430, 500)
-                
-                # Skenario 2: Docket sama & beban != 0
-                elif self.previous_docket == docket and self.previous_beban != None:
-                    mean = (430 + 500) / 2  # 465
-                    if self.previous_beban >= mean:
-                        adjustment = random.uniform(-29, -3)  # Turun
-                    else:
-                        adjustment = random.uniform(3, 29)  # Naik
-                    new_beban = max(430, min(self.previous_beban + adjustment, 500))
-                # Skenario 3: Docket berbeda
-                elif self.previous_docket != docket:
-                    mean = (430 + 500) / 2  # 465
-                    if self.previous_beban >= mean:
-                        adjustment = random.uniform(-34, -20)  # Turun signifikan
-                    else:
-                        adjustment = random.uniform(20, 34)  # Naik signifikan
-                    new_beban = self.previous_beban + adjustment
-                    # Pastikan tetap dalam range
-                    new_beban = max(430, min(new_beban, 500))
-                else:
-                    # Fallback (seharusnya tidak terjadi)
-                    new_beban = random.uniform(430, 500)
-                # Update tracking variables
-                self.previous_docket = str(docket) if docket is not None else None
-                self.previous_beban = new_beban
-                
-                return f"{new_beban:.2f}"
-            else:
-                # Umur selain 7 atau 28
-                return "0.00"
-        
-        elif "Fc-25" in mutu:
-        # Logika perhitungan berdasarkan UMUR
-            if umur == 7:
-                random_beban = random.uniform(290.12, 360.34)
-                return f"{random_beban:.2f}"        
-            elif umur == 28:
-                # Umur 28 hari dengan logika khusus
-                # Skenario 1: Kondisi awal (docket & beban sebelumnya = 0.0 atau None)
-                if (self.previous_docket is None or self.previous_docket == 0.0 or 
-                    self.previous_beban is None or self.previous_beban == 0.0):
-                    new_beban = random.uniform(430, 500)
-                
-                # Skenario 2: Docket sama & beban != 0
-                elif self.previous_docket == docket and self.previous_beban != None:
-                    mean = (430 + 500) / 2  # 465
-                    if self.previous_beban >= mean:
-                        adjustment = random.uniform(-29, -3)  # Turun
-                    else:
-                        adjustment = random.uniform(3, 29)  # Naik
-                    new_beban = max(430, min(self.previous_beban + adjustment, 500))
-                # Skenario 3: Docket berbeda
-                elif self.previous_docket != docket:
-                    mean = (430 + 500) / 2  # 465
-                    if self.previous_beban >= mean:
-                        adjustment = random.uniform(-34, -20)  # Turun signifikan
-                    else:
-                        adjustment = random.uniform(20, 34)  # Naik signifikan
-                    new_beban = self.previous_beban + adjustment
-                    # Pastikan tetap dalam range
-                    new_beban = max(430, min(new_beban, 500))
-                else:
-                    # Fallback (seharusnya tidak terjadi)
-                    new_beban = random.uniform(430, 500)
-                # Update tracking variables
-                self.previous_docket = str(docket) if docket is not None else None
-                self.previous_beban = new_beban
-                
-                return f"{new_beban:.2f}"
-            else:
-                # Umur selain 7 atau 28
-                return "0.00"
-            
-        elif "K-250" in mutu:
-        # Logika perhitungan berdasarkan UMUR
-            if umur == 7:
-                random_beban = random.uniform(230.12, 285.34)
-                return f"{random_beban:.2f}"        
-            elif umur == 28:
-                # Umur 28 hari dengan logika khusus
-                # Skenario 1: Kondisi awal (docket & beban sebelumnya = 0.0 atau None)
-                if (self.previous_docket is None or self.previous_docket == 0.0 or 
-                    self.previous_beban is None or self.previous_beban == 0.0):
-                    new_beban = random.uniform(355, 410)
-                
-                # Skenario 2: Docket sama & beban != 0
-                elif self.previous_docket == docket and self.previous_beban != None:
-                    mean = (355 + 410) / 2  # 382,5
-                    if self.previous_beban >= mean:
-                        adjustment = random.uniform(-29, -3)  # Turun
-                    else:
-                        adjustment = random.uniform(3, 29)  # Naik
-                    new_beban = max(355, min(self.previous_beban + adjustment, 410))
-                # Skenario 3: Docket berbeda
-                elif self.previous_docket != docket:
-                    mean = (355 + 410) / 2  # 382,5
-                    if self.previous_beban >= mean:
-                        adjustment = random.uniform(-26, -11)  # Turun signifikan
-                    else:
-                        adjustment = random.uniform(11, 26)  # Naik signifikan
-                    new_beban = self.previous_beban + adjustment
-                    # Pastikan tetap dalam range
-                    new_beban = max(355, min(new_beban, 410))
-                else:
-                    # Fallback (seharusnya tidak terjadi)
-                    new_beban = random.uniform(355, 410)
-                # Update tracking variables
-                self.previous_docket = str(docket) if docket is not None else None
-                self.previous_beban = new_beban
-                
-                return f"{new_beban:.2f}"
-            else:
-                # Umur selain 7 atau 28
-                return "0.00"
-        
-        elif "Fc-20" in mutu:
-        # Logika perhitungan berdasarkan UMUR
-            if umur == 7:
-                random_beban = random.uniform(230.12, 285.34)
-                return f"{random_beban:.2f}"        
-            elif umur == 28:
-                # Umur 28 hari dengan logika khusus
-                # Skenario 1: Kondisi awal (docket & beban sebelumnya = 0.0 atau None)
-                if (self.previous_docket is None or self.previous_docket == 0.0 or 
-                    self.previous_beban is None or self.previous_beban == 0.0):
-                    new_beban = random.uniform(355, 410)
-                
-                # Skenario 2: Docket sama & beban != 0
-                elif self.previous_docket == docket and self.previous_beban != None:
-                    mean = (355 + 410) / 2  # 382,5
-                    if self.previous_beban >= mean:
-                        adjustment = random.uniform(-29, -3)  # Turun
-                    else:
-                        adjustment = random.uniform(3, 29)  # Naik
-                    new_beban = max(355, min(self.previous_beban + adjustment, 410))
-                # Skenario 3: Docket berbeda
-                elif self.previous_docket != docket:
-                    mean = (355 + 410) / 2  # 382,5
-                    if self.previous_beban >= mean:
-                        adjustment = random.uniform(-26, -11)  # Turun signifikan
-                    else:
-                        adjustment = random.uniform(11, 26)  # Naik signifikan
-                    new_beban = self.previous_beban + adjustment
-                    # Pastikan tetap dalam range
-                    new_beban = max(355, min(new_beban, 410))
-                else:
-                    # Fallback (seharusnya tidak terjadi)
-                    new_beban = random.uniform(355, 410)
-                # Update tracking variables
-                self.previous_docket = str(docket) if docket is not None else None
-                self.previous_beban = new_beban
-                
-                return f"{new_beban:.2f}"
-            else:
-                # Umur selain 7 atau 28
-                return "0.00"
         
-        elif "Class C" in mutu:
-        # Logika perhitungan berdasarkan UMUR
-            if umur == 7:
-                random_beban = random.uniform(230.12, 285.34)
-                return f"{random_beban:.2f}"        
-            elif umur == 28:
-                # Umur 28 hari dengan logika khusus
-                # Skenario 1: Kondisi awal (docket & beban sebelumnya = 0.0 atau None)
-                if (self.previous_docket is None or self.previous_docket == 0.0 or 
-                    self.previous_beban is None or self.previous_beban == 0.0):
-                    new_beban = random.uniform(355, 410)
-                
-                # Skenario 2: Docket sama & beban != 0
-                elif self.previous_docket == docket and self.previous_beban != None:
-                    mean = (355 + 410) / 2  # 382,5
-                    if self.previous_beban >= mean:
-                        adjustment = random.uniform(-29, -3)  # Turun
-                    else:
-                        adjustment = random.uniform(3, 29)  # Naik
-                    new_beban = max(355, min(self.previous_beban + adjustment, 410))
-                # Skenario 3: Docket berbeda
-                elif self.previous_docket != docket:
-                    mean = (355 + 410) / 2  # 382,5
-                    if self.previous_beban >= mean:
-                        adjustment = random.uniform(-26, -11)  # Turun signifikan
-                    else:
-                        adjustment = random.uniform(11, 26)  # Naik signifikan
-                    new_beban = self.previous_beban + adjustment
-                    # Pastikan tetap dalam range
-                    new_beban = max(355, min(new_beban, 410))
-                else:
-                    # Fallback (seharusnya tidak terjadi)
-                    new_beban = random.uniform(355, 410)
-                # Update tracking variables
-                self.previous_docket = str(docket) if docket is not None else None
-                self.previous_beban = new_beban
-                
-                return f"{new_beban:.2f}"
-            else:
-                # Umur selain 7 atau 28
-                return "0.00"
-        
-        elif "K-175" in mutu:
-        # Logika perhitungan berdasarkan UMUR
-            if umur == 7:
-                random_beban = random.uniform(165.12, 215.34)
-                return f"{random_beban:.2f}"        
-            elif umur == 28:
-                # Umur 28 hari dengan logika khusus
-                # Skenario 1: Kondisi awal (docket & beban sebelumnya = 0.0 atau None)
-                if (self.previous_docket is None or self.previous_docket == 0.0 or 
-                    self.previous_beban is None or self.previous_beban == 0.0):
-                    new_beban = random.uniform(255, 305)
-                
-                # Skenario 2: Docket sama & beban != 0
-                elif self.previous_docket == docket and self.previous_beban != None:
-                    mean = (255 + 305) / 2  # 280
-                    if self.previous_beban >= mean:
-                        adjustment = random.uniform(-29, -3)  # Turun
-                    else:
-                        adjustment = random.uniform(3, 29)  # Naik
-                    new_beban = max(255, min(self.previous_beban + adjustment, 305))
-                # Skenario 3: Docket berbeda
-                elif self.previous_docket != docket:
-                    mean = (255 + 305) / 2  # 280
-                    if self.previous_beban >= mean:
-                        adjustment = random.uniform(-24, -8)  # Turun signifikan
-                    else:
-                        adjustment = random.uniform(8, 24)  # Naik signifikan
-                    new_beban = self.previous_beban + adjustment
-                    # Pastikan tetap dalam range
-                    new_beban = max(255, min(new_beban, 305))
-                else:
-                    # Fallback (seharusnya tidak terjadi)
-                    new_beban = random.uniform(255, 305)
-                # Update tracking variables
-                self.previous_docket = str(docket) if docket is not None else None
-                self.previous_beban = new_beban
-                
-                return f"{new_beban:.2f}"
-            else:
-                # Umur selain 7 atau 28
-                return "0.00"
-        
-        elif "Fc-15" in mutu:
-        # Logika perhitungan berdasarkan UMUR
-            if umur == 7:
-                random_beban = random.uniform(165.12, 215.34)
-                return f"{random_beban:.2f}"        
-            elif umur == 28:
-                # Umur 28 hari dengan logika khusus
-                # Skenario 1: Kondisi awal (docket & beban sebelumnya = 0.0 atau None)
-                if (self.previous_docket is None or self.previous_docket == 0.0 or 
-                    self.previous_beban is None or self.previous_beban == 0.0):
-                    new_beban = random.uniform(255, 305)
-                
-                # Skenario 2: Docket sama & beban != 0
-                elif self.previous_docket == docket and self.previous_beban != None:
-                    mean = (255 + 305) / 2  # 280
-                    if self.previous_beban >= mean:
-                        adjustment = random.uniform(-29, -3)  # Turun
-                    else:
-                        adjustment = random.uniform(3, 29)  # Naik
-                    new_beban = max(255, min(self.previous_beban + adjustment, 305))
-                # Skenario 3: Docket berbeda
-                elif self.previous_docket != docket:
-                    mean = (255 + 305) / 2  # 280
-                    if self.previous_beban >= mean:
-                        adjustment = random.uniform(-24, -8)  # Turun signifikan
-                    else:
-                        adjustment = random.uniform(8, 24)  # Naik signifikan
-                    new_beban = self.previous_beban + adjustment
-                    # Pastikan tetap dalam range
-                    new_beban = max(255, min(new_beban, 305))
-                else:
-                    # Fallback (seharusnya tidak terjadi)
-                    new_beban = random.uniform(255, 305)
-                # Update tracking variables
-                self.previous_docket = str(docket) if docket is not None else None
-                self.previous_beban = new_beban
-                
-                return f"{new_beban:.2f}"
-            else:
-                # Umur selain 7 atau 28
-                return "0.00"
-        
-        elif "Class D" in mutu:
-        # Logika perhitungan berdasarkan UMUR
-            if umur == 7:
-                random_beban = random.uniform(165.12, 215.34)
-                return f"{random_beban:.2f}"        
-            elif umur == 28:
-                # Umur 28 hari dengan logika khusus
-                # Skenario 1: Kondisi awal (docket & beban sebelumnya = 0.0 atau None)
-                if (self.previous_docket is None or self.previous_docket == 0.0 or 
-                    self.previous_beban is None or self.previous_beban == 0.0):
-                    new_beban = random.uniform(255, 305)
-                
-                # Skenario 2: Docket sama & beban != 0
-                elif self.previous_docket == docket and self.previous_beban != None:
-                    mean = (255 + 305) / 2  # 280
-                    if self.previous_beban >= mean:
-                        adjustment = random.uniform(-29, -3)  # Turun
-                    else:
-                        adjustment = random.uniform(3, 29)  # Naik
-                    new_beban = max(255, min(self.previous_beban + adjustment, 305))
-                # Skenario 3: Docket berbeda
-                elif self.previous_docket != docket:
-                    mean = (255 + 305) / 2  # 280
-                    if self.previous_beban >= mean:
-                        adjustment = random.uniform(-24, -8)  # Turun signifikan
-                    else:
-                        adjustment = random.uniform(8, 24)  # Naik signifikan
-                    new_beban = self.previous_beban + adjustment
-                    # Pastikan tetap dalam range
-                    new_beban = max(255, min(new_beban, 305))
-                else:
-                    # Fallback (seharusnya tidak terjadi)
-                    new_beban = random.uniform(255, 305)
-                # Update tracking variables
-                self.previous_docket = str(docket) if docket is not None else None
-                self.previous_beban = new_beban
-                
-                return f"{new_beban:.2f}"
-            else:
-                # Umur selain 7 atau 28
-                return "0.00"
-
-        elif "K-125" in mutu:
-        # Logika perhitungan berdasarkan UMUR
-            if umur == 7:
-                random_beban = random.uniform(120.12, 165.34)
-                return f"{random_beban:.2f}"        
-            elif umur == 28:
-                # Umur 28 hari dengan logika khusus
-                # Skenario 1: Kondisi awal (docket & beban sebelumnya = 0.0 atau None)
-                if (self.previous_docket is None or self.previous_docket == 0.0 or 
-                    self.previous_beban is None or self.previous_beban == 0.0):
-                    new_beban = random.uniform(180, 240)
-                
-                # Skenario 2: Docket sama & beban != 0
-                elif self.previous_docket == docket and self.previous_beban != None:
-                    mean = (180 + 240) / 2  # 210
-                    if self.previous_beban >= mean:
-                        adjustment = random.uniform(-29, -3)  # Turun
-                    else:
-                        adjustment = random.uniform(3, 29)  # Naik
-                    new_beban = max(180, min(self.previous_beban + adjustment, 240))
-                # Skenario 3: Docket berbeda
-                elif self.previous_docket != docket:
-                    mean = (180 + 240) / 2  # 210
-                    if self.previous_beban >= mean:
-                        adjustment = random.uniform(-29, -12)  # Turun signifikan
-                    else:
-                        adjustment = random.uniform(12, 29)  # Naik signifikan
-                    new_beban = self.previous_beban + adjustment
-                    # Pastikan tetap dalam range
-                    new_beban = max(180, min(new_beban, 240))
-                else:
-                    # Fallback (seharusnya tidak terjadi)
-                    new_beban = random.uniform(180, 240)
-                # Update tracking variables
-                self.previous_docket = str(docket) if docket is not None else None
-                self.previous_beban = new_beban
-                
-                return f"{new_beban:.2f}"
-            else:
-                # Umur selain 7 atau 28
-                return "0.00"
-            
-        elif "Fc-10" in mutu:
-        # Logika perhitungan berdasarkan UMUR
-            if umur == 7:
-                random_beban = random.uniform(120.12, 165.34)
-                return f"{random_beban:.2f}"        
-            elif umur == 28:
-                # Umur 28 hari dengan logika khusus
-                # Skenario 1: Kondisi awal (docket & beban sebelumnya = 0.0 atau None)
-                if (self.previous_docket is None or self.previous_docket == 0.0 or 
-                    self.previous_beban is None or self.previous_beban == 0.0):
-                    new_beban = random.uniform(180, 240)
-                
-                # Skenario 2: Docket sama & beban != 0
-                elif self.previous_docket == docket and self.previous_beban != None:
-                    mean = (180 + 240) / 2  # 210
-                    if self.previous_beban >= mean:
-                        adjustment = random.uniform(-29, -3)  # Turun
-                    else:
-                        adjustment = random.uniform(3, 29)  # Naik
-                    new_beban = max(180, min(self.previous_beban + adjustment, 240))
-                # Skenario 3: Docket berbeda
-                elif self.previous_docket != docket:
-                    mean = (180 + 240) / 2  # 210
-                    if self.previous_beban >= mean:
-                        adjustment = random.uniform(-29, -12)  # Turun signifikan
-                    else:
-                        adjustment = random.uniform(12, 29)  # Naik signifikan
-                    new_beban = self.previous_beban + adjustment
-                    # Pastikan tetap dalam range
-                    new_beban = max(180, min(new_beban, 240))
-                else:
-                    # Fallback (seharusnya tidak terjadi)
-                    new_beban = random.uniform(180, 240)
-                # Update tracking variables
-                self.previous_docket = str(docket) if docket is not None else None
-                self.previous_beban = new_beban
-                
-                return f"{new_beban:.2f}"
-            else:
-                # Umur selain 7 atau 28
-                return "0.00"
-
-        elif "Class E" in mutu:
-        # Logika perhitungan berdasarkan UMUR
-            if umur == 7:
-                random_beban = random.uniform(120.12, 165.34)
-                return f"{random_beban:.2f}"        
-            elif umur == 28:
-                # Umur 28 hari dengan logika khusus
-                # Skenario 1: Kondisi awal (docket & beban sebelumnya = 0.0 atau None)
-                if (self.previous_docket is None or self.previous_docket == 0.0 or 
-                    self.previous_beban is None or self.previous_beban == 0.0):
-                    new_beban = random.uniform(180, 240)
-                
-                # Skenario 2: Docket sama & beban != 0
-                elif self.previous_docket == docket and self.previous_beban != None:
-                    mean = (180 + 240) / 2  # 210
-                    if self.previous_beban >= mean:
-                        adjustment = random.uniform(-29, -3)  # Turun
-                    else:
-                        adjustment = random.uniform(3, 29)  # Naik
-                    new_beban = max(180, min(self.previous_beban + adjustment, 240))
-                # Skenario 3: Docket berbeda
-                elif self.previous_docket != docket:
-                    mean = (180 + 240) / 2  # 210
-                    if self.previous_beban >= mean:
-                        adjustment = random.uniform(-29, -12)  # Turun signifikan
-                    else:
-                        adjustment = random.uniform(12, 29)  # Naik signifikan
-                    new_beban = self.previous_beban + adjustment
-                    # Pastikan tetap dalam range
-                    new_beban = max(180, min(new_beban, 240))
-                else:
-                    # Fallback (seharusnya tidak terjadi)
-                    new_beban = random.uniform(180, 240)
-                # Update tracking variables
-                self.previous_docket = str(docket) if docket is not None else None
-                self.previous_beban = new_beban
-                
-                return f"{new_beban:.2f}"
-            else:
-                # Umur selain 7 atau 28
-                return "0.00"
-
-        else:
-            return None
-
-
+        beban, (self.previous_docket, self.previous_beban) = beban_engine.hitung_satu(
+            docket, mutu, umur, (self.previous_docket, self.previous_beban), self.aturan,
+            konteks=self.konteks
+        )
+        return beban
 
     def process_all_rows(self, start_row: int = 2) -> None:
         """
@@ -770,12 +150,24 @@ class ExcelBebanProcessor:
                     print(f"  Progress: {processed_count}/{total_rows - start_row + 1} baris | "
                           f"Terupdate: {updated_count}")
         
+        self.record_seed()
+        
         print(f"\n{'='*60}")
         print(f"✓ Proses selesai!")
         print(f"  Total baris diproses: {processed_count}")
         print(f"  Total BEBAN terupdate: {updated_count}")
+        print(f"  Seed acak: {self.konteks.seed}")
         print(f"{'='*60}\n")
     
+    def record_seed(self) -> None:
+        """Mencatat seed acak di properti workbook ('seed_beban') untuk audit"""
+        if self.workbook is None:
+            return
+        props = self.workbook.custom_doc_props
+        if 'seed_beban' in props.names:
+            del props['seed_beban']
+        props.append(StringProperty(name='seed_beban', value=str(self.konteks.seed)))
+    
     def save_excel(self) -> bool:
         """Menyimpan perubahan ke file Excel yang sama"""
         if self.workbook is None:
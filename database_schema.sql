@@ -14,17 +14,17 @@
 CREATE TABLE IF NOT EXISTS pengujian (
     idpengujian SERIAL PRIMARY KEY,           -- Auto-incrementing ID
     tgluji DATE,                              -- Tanggal Pengujian
-    idalat CHAR(100),                         -- ID Alat
-    kodebendauji CHAR(200),                   -- Kode Benda Uji
-    nodocket CHAR(100),                       -- Nomor Docket
-    nourutbenda CHAR(2),                      -- Nomor Urut Benda
+    idalat VARCHAR(100),                      -- ID Alat
+    kodebendauji VARCHAR(200),                -- Kode Benda Uji
+    nodocket VARCHAR(100),                    -- Nomor Docket
+    nourutbenda VARCHAR(2),                   -- Nomor Urut Benda
     nilaikn NUMERIC(10, 2),                   -- Nilai kN
     beratbenda NUMERIC(10, 2),                -- Berat Benda
     tiperetak CHAR(1),                        -- Tipe Retak
-    sinkron CHAR(1) DEFAULT 'B',              -- Status Sinkronisasi (B/Belum, S/Sudah)
-    idbendauji CHAR(100),                     -- ID Benda Uji (dari sistem lain/Odoo)
+    sinkron CHAR(1) DEFAULT 'B',              -- Status Sinkronisasi (B/Belum, P/Proses, S/Sudah, G/Gagal)
+    idbendauji VARCHAR(100),                  -- ID Benda Uji (dari sistem lain/Odoo)
     tglrencanauji DATE,                       -- Tanggal Rencana Uji
-    bujnama CHAR(20),                         -- Nama/Jenis Benda Uji
+    bujnama VARCHAR(20),                      -- Nama/Jenis Benda Uji
     kuattekan NUMERIC(10, 2),                 -- Kuat Tekan
     bebanmpa NUMERIC(10, 2),                  -- Beban MPa
     umur INTEGER,                             -- Umur Beton (hari)
@@ -32,21 +32,401 @@ CREATE TABLE IF NOT EXISTS pengujian (
 );
 
 -- 5. Tambahkan Index (Opsional, untuk performa pencarian)
-CREATE INDEX IF NOT EXISTS idx_pengujian_tgluji ON pengujian(tgluji);
+--    Index tgluji dan sinkron diganti di bagian 11
 CREATE INDEX IF NOT EXISTS idx_pengujian_nodocket ON pengujian(nodocket);
-CREATE INDEX IF NOT EXISTS idx_pengujian_sinkron ON pengujian(sinkron);
+
+-- 6. Notifikasi untuk daemon sinkronisasi (modules/daemon_sync.py, LISTEN pengujian_sinkron)
+--    Payload dibuat konstan agar banyak baris dalam satu transaksi hanya
+--    menghasilkan satu notifikasi.
+CREATE OR REPLACE FUNCTION notify_pengujian_sinkron() RETURNS trigger AS $$
+BEGIN
+    PERFORM pg_notify('pengujian_sinkron', '');
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_pengujian_sinkron ON pengujian;
+CREATE TRIGGER trg_pengujian_sinkron
+    AFTER INSERT OR UPDATE OF sinkron ON pengujian
+    FOR EACH ROW
+    WHEN (NEW.sinkron = 'B')
+    EXECUTE PROCEDURE notify_pengujian_sinkron();
+
+-- 7. Klaim baris oleh worker sinkronisasi (FOR UPDATE SKIP LOCKED)
+--    sinkron = 'P' berarti baris sedang dikirim oleh salah satu worker sampai
+--    klaim_sampai; setelah itu baris boleh diklaim ulang.
+ALTER TABLE pengujian ADD COLUMN IF NOT EXISTS klaim_sampai TIMESTAMP;
+
+-- 8. Retry dengan backoff dan dead-letter
+--    percobaan dihitung per baris; setelah [daemon] max_percobaan kali gagal
+--    baris dipindah ke sinkron = 'G' dan tidak diklaim lagi. Untuk mengirim
+--    ulang setelah masalahnya diperbaiki:
+--    UPDATE pengujian SET sinkron = 'B', percobaan = 0 WHERE sinkron = 'G';
+ALTER TABLE pengujian ADD COLUMN IF NOT EXISTS percobaan INTEGER NOT NULL DEFAULT 0;
+
+-- 9. Kunci alami: satu baris per benda uji (nodocket + nourutbenda)
+--    Upload CSV (modules/bulk_loader.py) memakai INSERT ... ON CONFLICT DO
+--    NOTHING, sehingga upload ulang file yang sama tidak menambah baris.
+--    Duplikat lama dipindah ke pengujian_duplikat sebelum index dibuat; baris
+--    yang sudah tersinkron ('S') dan idpengujian terkecil yang dipertahankan.
+CREATE TABLE IF NOT EXISTS pengujian_duplikat (LIKE pengujian);
+
+--    Baris dikenali dengan (tableoid, ctid), bukan idpengujian: setelah
+--    bagian 12 idpengujian tidak lagi dijamin unik oleh tabel itu sendiri.
+WITH urut AS (
+    SELECT tableoid, ctid,
+           row_number() OVER (
+               PARTITION BY nodocket, nourutbenda
+               ORDER BY (sinkron = 'S') DESC, idpengujian
+           ) AS ke
+    FROM pengujian
+    WHERE nodocket IS NOT NULL AND nourutbenda IS NOT NULL
+), pindah AS (
+    DELETE FROM pengujian p USING urut u
+    WHERE p.tableoid = u.tableoid AND p.ctid = u.ctid AND u.ke > 1
+    RETURNING p.*
+)
+INSERT INTO pengujian_duplikat SELECT * FROM pindah;
+
+--    Setelah bagian 12 (tabel dipartisi) index ini diganti bagian 12 dan 14.
+DO $$
+BEGIN
+    IF (SELECT relkind FROM pg_class WHERE oid = to_regclass('pengujian')) = 'r' THEN
+        CREATE UNIQUE INDEX IF NOT EXISTS uq_pengujian_benda ON pengujian(nodocket, nourutbenda);
+    END IF;
+END
+$$;
+
+-- 10. Paginasi grid (modules/db_controller.py queryGridHalaman / iterGrid)
+--     Halaman berikutnya dimulai dari (tgluji, idpengujian) baris terakhir,
+--     sehingga setiap halaman hanya membaca range index ini.
+CREATE INDEX IF NOT EXISTS idx_pengujian_tgluji_id ON pengujian(tgluji, idpengujian);
+
+-- 11. Tipe kolom ringkas dan index yang sesuai pola query
+--     Ukur sebelum dan sesudah dengan:
+--       python -m modules.laporan_skema --json sebelum.json
+--       (jalankan bagian ini)
+--       python -m modules.laporan_skema --bandingkan sebelum.json
+--
+--     CHAR(n) menyimpan spasi pengisi sampai n karakter di setiap baris.
+--     Konversi ke VARCHAR membuang spasi di belakang (rtrim); semua kolom
+--     diubah dalam satu ALTER TABLE sehingga tabel hanya ditulis ulang sekali,
+--     dan hanya jika masih bertipe CHAR.
+DO $$
+DECLARE
+    perubahan TEXT;
+BEGIN
+    SELECT string_agg(
+               format('ALTER COLUMN %I TYPE VARCHAR(%s) USING rtrim(%I)',
+                      column_name, character_maximum_length, column_name), ', ')
+      INTO perubahan
+      FROM information_schema.columns
+     WHERE table_schema = current_schema()
+       AND table_name = 'pengujian'
+       AND column_name IN ('idalat', 'kodebendauji', 'nodocket', 'nourutbenda', 'idbendauji', 'bujnama')
+       AND data_type = 'character';
+    IF perubahan IS NOT NULL THEN
+        EXECUTE 'ALTER TABLE pengujian ' || perubahan;
+    END IF;
+END
+$$;
+
+--     sinkron hanya bernilai B/P/S/G dan hampir semua baris 'S': B-tree
+--     penuh pada kolom ini besar tetapi tidak berguna. Daemon hanya mencari
+--     baris antrian (B dan P), jadi cukup index parsial yang kecil.
+DROP INDEX IF EXISTS idx_pengujian_sinkron;
+CREATE INDEX IF NOT EXISTS idx_pengujian_antrian ON pengujian(idpengujian)
+    WHERE sinkron IN ('B', 'P');
+
+--     Baris masuk kurang lebih berurutan tanggal, sehingga BRIN tgluji
+--     (beberapa halaman saja) cukup untuk scan rentang tanggal yang lebar.
+--     B-tree tgluji tunggal sudah tercakup idx_pengujian_tgluji_id.
+DROP INDEX IF EXISTS idx_pengujian_tgluji;
+CREATE INDEX IF NOT EXISTS brin_pengujian_tgluji ON pengujian USING brin (tgluji);
+
+--     Pencarian benda uji dari ERP (bjdt_id)
+CREATE INDEX IF NOT EXISTS idx_pengujian_idbendauji ON pengujian(idbendauji);
+
+ANALYZE pengujian;
+
+-- 12. Partisi bulanan pada tgluji
+--     Semua query aplikasi (grid, upload harian, backlog daemon) memfilter
+--     tanggal; dengan partisi per bulan, query rentang tanggal hanya membaca
+--     partisi bulan yang relevan, dan VACUUM/index bekerja per partisi.
+--     Partisi bulan berikutnya dibuat oleh modules/partisi.py (dipanggil
+--     daemon sekali sehari); baris tanpa partisi masuk ke pengujian_default
+--     dan dipindah saat partisinya dibuat.
+--
+--     Tabel partisi mensyaratkan setiap unique index memuat tgluji, sehingga
+--     index di tabel ini hanya UNIQUE (idpengujian, tgluji) dan
+--     UNIQUE (nodocket, nourutbenda, tgluji). Keunikan idpengujian dan kunci
+--     alami di seluruh tabel (tgluji berbeda pun) dijaga tabel
+--     pengujian_kunci di bagian 14; jalankan bagian itu bersama bagian ini.
+--
+--     Konversi dilakukan satu kali (hanya jika pengujian masih tabel biasa)
+--     dalam satu transaksi: data disalin ke tabel partisi baru, tabel lama
+--     dihapus, sequence idpengujian dipindah ke tabel baru. Backup dulu.
+DO $$
+DECLARE
+    urutan TEXT;
+    bulan DATE;
+    akhir DATE;
+BEGIN
+    IF (SELECT relkind FROM pg_class WHERE oid = to_regclass('pengujian')) <> 'r' THEN
+        RETURN;
+    END IF;
+
+    urutan := pg_get_serial_sequence('pengujian', 'idpengujian');
+    ALTER TABLE pengujian RENAME TO pengujian_lama;
+    EXECUTE format('ALTER SEQUENCE %s OWNED BY NONE', urutan);
+
+    CREATE TABLE pengujian (LIKE pengujian_lama INCLUDING DEFAULTS)
+        PARTITION BY RANGE (tgluji);
+    CREATE TABLE pengujian_default PARTITION OF pengujian DEFAULT;
+
+    SELECT date_trunc('month', COALESCE(min(tgluji), current_date))::date,
+           (date_trunc('month', GREATEST(max(tgluji), current_date)) + interval '4 months')::date
+      INTO bulan, akhir
+      FROM pengujian_lama;
+    WHILE bulan < akhir LOOP
+        EXECUTE format('CREATE TABLE %I PARTITION OF pengujian FOR VALUES FROM (%L) TO (%L)',
+                       'pengujian_p' || to_char(bulan, 'YYYY_MM'), bulan, bulan + interval '1 month');
+        bulan := bulan + interval '1 month';
+    END LOOP;
+
+    INSERT INTO pengujian SELECT * FROM pengujian_lama;
+    DROP TABLE pengujian_lama;
+    EXECUTE format('ALTER SEQUENCE %s OWNED BY pengujian.idpengujian', urutan);
+
+    -- Index dibuat sesudah data dimuat (sekali per partisi)
+    CREATE UNIQUE INDEX pengujian_id_tgluji ON pengujian(idpengujian, tgluji);
+    CREATE UNIQUE INDEX uq_pengujian_benda ON pengujian(nodocket, nourutbenda, tgluji);
+    CREATE INDEX idx_pengujian_tgluji_id ON pengujian(tgluji, idpengujian);
+    CREATE INDEX idx_pengujian_nodocket ON pengujian(nodocket);
+    CREATE INDEX idx_pengujian_antrian ON pengujian(idpengujian) WHERE sinkron IN ('B', 'P');
+    CREATE INDEX brin_pengujian_tgluji ON pengujian USING brin (tgluji);
+    CREATE INDEX idx_pengujian_idbendauji ON pengujian(idbendauji);
+
+    CREATE TRIGGER trg_pengujian_sinkron
+        AFTER INSERT OR UPDATE OF sinkron ON pengujian
+        FOR EACH ROW
+        WHEN (NEW.sinkron = 'B')
+        EXECUTE PROCEDURE notify_pengujian_sinkron();
+END
+$$;
+
+ANALYZE pengujian;
+
+-- 13. Ringkasan harian untuk total grid dan dashboard
+--     Satu baris per (tgluji, bujnama, umur, sinkron), dijaga oleh trigger
+--     per statement (transition table), sehingga COPY ribuan baris atau
+--     UPDATE batch daemon hanya menambah satu upsert per kelompok. Membaca
+--     total rentang tanggal menjadi O(hari x kelompok), bukan O(baris).
+--     Baris dengan tgluji NULL tidak diringkas; bujnama NULL disimpan ''
+--     dan umur NULL disimpan -1. TRUNCATE tidak dijaga: jalankan
+--     SELECT ringkasan_harian_bangun_ulang(); sesudahnya.
+CREATE TABLE IF NOT EXISTS ringkasan_harian (
+    tgluji DATE NOT NULL,
+    bujnama VARCHAR(20) NOT NULL,
+    umur INTEGER NOT NULL,
+    sinkron CHAR(1) NOT NULL,
+    jumlah BIGINT NOT NULL DEFAULT 0,          -- jumlah benda uji
+    jumlah_mpa BIGINT NOT NULL DEFAULT 0,      -- jumlah benda uji dengan bebanmpa terisi
+    total_mpa NUMERIC NOT NULL DEFAULT 0,      -- sum(bebanmpa), rata-rata = total_mpa / jumlah_mpa
+    PRIMARY KEY (tgluji, bujnama, umur, sinkron)
+);
+
+CREATE OR REPLACE FUNCTION ringkasan_harian_delta() RETURNS trigger AS $$
+DECLARE
+    sumber TEXT;
+    kolom CONSTANT TEXT := 'tgluji, COALESCE(rtrim(bujnama), '''') AS bujnama, COALESCE(umur, -1) AS umur, '
+                        || 'COALESCE(sinkron, '''') AS sinkron, ';
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        sumber := 'SELECT ' || kolom || '1 AS n, (bebanmpa IS NOT NULL)::int AS nm, COALESCE(bebanmpa, 0) AS m FROM baru';
+    ELSIF TG_OP = 'DELETE' THEN
+        sumber := 'SELECT ' || kolom || '-1 AS n, -(bebanmpa IS NOT NULL)::int AS nm, -COALESCE(bebanmpa, 0) AS m FROM lama';
+    ELSE
+        sumber := 'SELECT ' || kolom || '1 AS n, (bebanmpa IS NOT NULL)::int AS nm, COALESCE(bebanmpa, 0) AS m FROM baru '
+               || 'UNION ALL SELECT ' || kolom || '-1, -(bebanmpa IS NOT NULL)::int, -COALESCE(bebanmpa, 0) FROM lama';
+    END IF;
+    -- Kelompok yang selisihnya nol (misal UPDATE klaim_sampai) tidak disentuh
+    EXECUTE 'INSERT INTO ringkasan_harian AS r (tgluji, bujnama, umur, sinkron, jumlah, jumlah_mpa, total_mpa) '
+         || 'SELECT tgluji, bujnama, umur, sinkron, sum(n), sum(nm), sum(m) FROM (' || sumber || ') d '
+         || 'WHERE tgluji IS NOT NULL GROUP BY 1, 2, 3, 4 '
+         || 'HAVING sum(n) <> 0 OR sum(nm) <> 0 OR sum(m) <> 0 '
+         || 'ORDER BY 1, 2, 3, 4 '
+         || 'ON CONFLICT (tgluji, bujnama, umur, sinkron) DO UPDATE SET '
+         || 'jumlah = r.jumlah + EXCLUDED.jumlah, jumlah_mpa = r.jumlah_mpa + EXCLUDED.jumlah_mpa, '
+         || 'total_mpa = r.total_mpa + EXCLUDED.total_mpa';
+    -- Kelompok yang menjadi 0 (misal semua 'B' sudah 'S') dibiarkan; tidak
+    -- mengubah total dan dibersihkan oleh ringkasan_harian_bangun_ulang()
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_ringkasan_insert ON pengujian;
+CREATE TRIGGER trg_ringkasan_insert
+    AFTER INSERT ON pengujian
+    REFERENCING NEW TABLE AS baru
+    FOR EACH STATEMENT
+    EXECUTE PROCEDURE ringkasan_harian_delta();
+
+DROP TRIGGER IF EXISTS trg_ringkasan_update ON pengujian;
+CREATE TRIGGER trg_ringkasan_update
+    AFTER UPDATE ON pengujian
+    REFERENCING OLD TABLE AS lama NEW TABLE AS baru
+    FOR EACH STATEMENT
+    EXECUTE PROCEDURE ringkasan_harian_delta();
+
+DROP TRIGGER IF EXISTS trg_ringkasan_delete ON pengujian;
+CREATE TRIGGER trg_ringkasan_delete
+    AFTER DELETE ON pengujian
+    REFERENCING OLD TABLE AS lama
+    FOR EACH STATEMENT
+    EXECUTE PROCEDURE ringkasan_harian_delta();
+
+-- Isi awal / perbaikan jika ringkasan tidak cocok lagi dengan pengujian
+CREATE OR REPLACE FUNCTION ringkasan_harian_bangun_ulang() RETURNS BIGINT AS $$
+    DELETE FROM ringkasan_harian;
+    INSERT INTO ringkasan_harian (tgluji, bujnama, umur, sinkron, jumlah, jumlah_mpa, total_mpa)
+    SELECT tgluji, COALESCE(rtrim(bujnama), ''), COALESCE(umur, -1), COALESCE(sinkron, ''),
+           count(*), count(bebanmpa), COALESCE(sum(bebanmpa), 0)
+    FROM pengujian
+    WHERE tgluji IS NOT NULL
+    GROUP BY 1, 2, 3, 4;
+    SELECT count(*) FROM ringkasan_harian;
+$$ LANGUAGE sql;
+
+SELECT ringkasan_harian_bangun_ulang();
+
+-- 14. Kunci global idpengujian dan benda uji (nodocket + nourutbenda)
+--     Unique index tabel partisi hanya berlaku bersama tgluji (bagian 12),
+--     sehingga benda uji yang sama dengan tgluji lain, atau idpengujian yang
+--     sama di bulan lain, tidak ditolak oleh pengujian sendiri.
+--     pengujian_kunci (tabel biasa, tidak dipartisi) menyimpan kunci setiap
+--     baris pengujian dan dijaga trigger per statement: INSERT atau UPDATE
+--     yang membuat kunci ganda gagal dengan unique_violation, sama seperti
+--     primary key sebelum partisi. modules/bulk_loader.py memakai tabel ini
+--     untuk melewati baris CSV yang sudah ada sebelum INSERT.
+--     Baris dengan nodocket atau nourutbenda NULL hanya dijaga idpengujian-nya.
+--     DML langsung pada partisi (modules/partisi.py) tidak menjalankan
+--     trigger tabel induk; setelah impor seperti itu jalankan
+--     SELECT pengujian_kunci_bangun_ulang();
+CREATE TABLE IF NOT EXISTS pengujian_kunci (
+    idpengujian INTEGER PRIMARY KEY,
+    nodocket VARCHAR(100),
+    nourutbenda VARCHAR(2),
+    CONSTRAINT uq_pengujian_kunci_benda UNIQUE (nodocket, nourutbenda)
+);
+
+--     Duplikat yang sudah terlanjur masuk dipindah ke pengujian_duplikat
+--     dulu (aturan sama dengan bagian 9), idpengujian ganda lalu benda uji
+--     ganda, agar kunci bisa diisi.
+WITH urut AS (
+    SELECT tableoid, ctid,
+           row_number() OVER (PARTITION BY idpengujian ORDER BY (sinkron = 'S') DESC, tgluji) AS ke
+    FROM pengujian
+), pindah AS (
+    DELETE FROM pengujian p USING urut u
+    WHERE p.tableoid = u.tableoid AND p.ctid = u.ctid AND u.ke > 1
+    RETURNING p.*
+)
+INSERT INTO pengujian_duplikat SELECT * FROM pindah;
+
+WITH urut AS (
+    SELECT tableoid, ctid,
+           row_number() OVER (
+               PARTITION BY nodocket, nourutbenda
+               ORDER BY (sinkron = 'S') DESC, idpengujian
+           ) AS ke
+    FROM pengujian
+    WHERE nodocket IS NOT NULL AND nourutbenda IS NOT NULL
+), pindah AS (
+    DELETE FROM pengujian p USING urut u
+    WHERE p.tableoid = u.tableoid AND p.ctid = u.ctid AND u.ke > 1
+    RETURNING p.*
+)
+INSERT INTO pengujian_duplikat SELECT * FROM pindah;
+
+CREATE OR REPLACE FUNCTION pengujian_kunci_delta() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO pengujian_kunci (idpengujian, nodocket, nourutbenda)
+        SELECT idpengujian, nodocket, nourutbenda FROM baru;
+    ELSIF TG_OP = 'DELETE' THEN
+        DELETE FROM pengujian_kunci k USING lama l WHERE k.idpengujian = l.idpengujian;
+    ELSIF TG_OP = 'UPDATE' THEN
+        -- UPDATE yang tidak mengubah kunci (sinkron, klaim_sampai, pindah
+        -- partisi karena tgluji) tidak menyentuh pengujian_kunci
+        DELETE FROM pengujian_kunci k
+         USING lama l
+         WHERE k.idpengujian = l.idpengujian
+           AND NOT EXISTS (SELECT 1 FROM baru b
+                            WHERE b.idpengujian = l.idpengujian
+                              AND b.nodocket IS NOT DISTINCT FROM l.nodocket
+                              AND b.nourutbenda IS NOT DISTINCT FROM l.nourutbenda);
+        INSERT INTO pengujian_kunci (idpengujian, nodocket, nourutbenda)
+        SELECT idpengujian, nodocket, nourutbenda FROM baru b
+         WHERE NOT EXISTS (SELECT 1 FROM pengujian_kunci k WHERE k.idpengujian = b.idpengujian);
+    ELSE
+        DELETE FROM pengujian_kunci;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Isi awal / perbaikan jika kunci tidak cocok lagi dengan pengujian
+CREATE OR REPLACE FUNCTION pengujian_kunci_bangun_ulang() RETURNS BIGINT AS $$
+    DELETE FROM pengujian_kunci;
+    INSERT INTO pengujian_kunci (idpengujian, nodocket, nourutbenda)
+    SELECT idpengujian, nodocket, nourutbenda FROM pengujian;
+    SELECT count(*) FROM pengujian_kunci;
+$$ LANGUAGE sql;
+
+SELECT pengujian_kunci_bangun_ulang();
+
+DROP TRIGGER IF EXISTS trg_kunci_insert ON pengujian;
+CREATE TRIGGER trg_kunci_insert
+    AFTER INSERT ON pengujian
+    REFERENCING NEW TABLE AS baru
+    FOR EACH STATEMENT
+    EXECUTE PROCEDURE pengujian_kunci_delta();
+
+DROP TRIGGER IF EXISTS trg_kunci_update ON pengujian;
+CREATE TRIGGER trg_kunci_update
+    AFTER UPDATE ON pengujian
+    REFERENCING OLD TABLE AS lama NEW TABLE AS baru
+    FOR EACH STATEMENT
+    EXECUTE PROCEDURE pengujian_kunci_delta();
+
+DROP TRIGGER IF EXISTS trg_kunci_delete ON pengujian;
+CREATE TRIGGER trg_kunci_delete
+    AFTER DELETE ON pengujian
+    REFERENCING OLD TABLE AS lama
+    FOR EACH STATEMENT
+    EXECUTE PROCEDURE pengujian_kunci_delta();
+
+DROP TRIGGER IF EXISTS trg_kunci_truncate ON pengujian;
+CREATE TRIGGER trg_kunci_truncate
+    AFTER TRUNCATE ON pengujian
+    FOR EACH STATEMENT
+    EXECUTE PROCEDURE pengujian_kunci_delta();
 
 -- Keterangan Kolom berdasarkan source code (modules/db_controller.py):
--- idpengujian  : Primary Key (Serial)
--- tgluji       : Tanggal pengujian dilakukan
+-- idpengujian  : Serial, unik di seluruh tabel (dijaga pengujian_kunci, bagian 14);
+--                upload CSV menaikkan sequence-nya sampai id terbesar yang dimuat
+-- tgluji       : Tanggal pengujian dilakukan (kunci partisi bulanan)
 -- idalat       : Identitas alat uji
 -- kodebendauji : Kode unik benda uji
 -- nodocket     : Nomor docket pengiriman
--- nourutbenda  : Nomor urut benda uji dalam satu sampel
+-- nourutbenda  : Nomor urut benda uji dalam satu sampel (unik bersama nodocket, dijaga pengujian_kunci)
 -- nilaikn      : Hasil pembacaan beban (kN)
 -- beratbenda   : Berat benda uji
 -- tiperetak    : Kode tipe keretakan
--- sinkron      : Flag sinkronisasi ke Odoo (misal: 'N' belum, 'Y' sudah)
+-- sinkron      : Flag sinkronisasi ke Odoo ('B' belum, 'P' sedang diproses, 'S' sudah, 'G' gagal)
+-- klaim_sampai : Batas waktu klaim worker / waktu retry berikutnya untuk baris 'P'
+-- percobaan    : Jumlah pengiriman yang gagal
 -- idbendauji   : ID referensi benda uji
 -- tglrencanauji: Tanggal rencana pengujian
 -- bujnama      : Jenis benda uji
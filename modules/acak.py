@@ -0,0 +1,106 @@
+"""
+Sumber angka acak yang bisa diulang untuk pembuatan BEBAN dan isian form
+
+Setiap proses memakai satu seed. Dari seed itu setiap docket mendapat
+aliran (stream) acak sendiri yang tidak bergantung pada urutan proses,
+sehingga hasil per docket sama baik dikerjakan berurutan, per batch, maupun
+paralel. Seed dicatat di log/file hasil supaya satu proses bisa diulang:
+
+    konteks = KonteksAcak()            # seed baru
+    konteks = KonteksAcak(1234567890)  # mengulang proses dengan seed tercatat
+"""
+import hashlib
+import threading
+
+import numpy as np
+
+# Konstanta SplitMix64
+_EMAS = np.uint64(0x9E3779B97F4A7C15)
+_K1 = np.uint64(0xBF58476D1CE4E5B9)
+_K2 = np.uint64(0x94D049BB133111EB)
+
+
+def kunci_docket(docket):
+    """Stream key of a DOCKET cell value (101 and "101" share one stream)"""
+    return "" if docket is None else str(docket).strip()
+
+
+def _hash64(*bagian):
+    """Stable 64-bit integer of a key tuple (same across runs and processes)"""
+    teks = "\x1f".join(str(b) for b in bagian).encode("utf-8")
+    return int.from_bytes(hashlib.blake2b(teks, digest_size=8).digest(), "little")
+
+
+def _splitmix(basis, urutan):
+    """Uniform [0, 1) floats: SplitMix64 output number `urutan` of the streams starting at `basis`"""
+    with np.errstate(over="ignore"):
+        z = basis + (urutan + np.uint64(1)) * _EMAS
+        z = (z ^ (z >> np.uint64(30))) * _K1
+        z = (z ^ (z >> np.uint64(27))) * _K2
+        z ^= z >> np.uint64(31)
+    return (z >> np.uint64(11)).astype(np.float64) * (1.0 / (1 << 53))
+
+
+class KonteksAcak:
+    """Per-run seed with an independent stream per key (e.g. per docket)"""
+
+    def __init__(self, seed=None):
+        """
+        Args:
+            seed: Run seed (int); None draws a new one from the OS
+        """
+        self.seed = np.random.SeedSequence(seed).entropy
+        self._dipakai = {}
+        self._lock = threading.Lock()
+
+    def baru(self, *kunci):
+        """
+        New numpy Generator for `kunci`, always starting at the same point
+
+        Children are derived like SeedSequence.spawn, but the spawn key is
+        the hashed key instead of the spawn order. Meant for a handful of
+        draws per key (form fields); bulk draws use undian().
+
+        Returns:
+            numpy.random.Generator
+        """
+        urutan = np.random.SeedSequence(self.seed, spawn_key=(_hash64(*kunci),))
+        return np.random.Generator(np.random.PCG64(urutan))
+
+    def undian(self, kunci):
+        """
+        Next uniform [0, 1) draw of each key's stream, one per element
+
+        A counter-based stream (SplitMix64 over seed, key and draw number),
+        evaluated for all rows at once. Every key continues where its
+        previous call stopped, so drawing a sheet in batches gives the
+        same values as drawing it in one go, and a key's values do not
+        depend on which other keys are drawn.
+
+        Args:
+            kunci: Sequence of keys (hashable, e.g. kunci_docket values)
+
+        Returns:
+            numpy float array, same length as `kunci`
+        """
+        n = len(kunci)
+        if n == 0:
+            return np.empty(0)
+        kode = {}
+        indeks = np.fromiter((kode.setdefault(k, len(kode)) for k in kunci), dtype=np.intp, count=n)
+        jumlah = np.bincount(indeks, minlength=len(kode))
+        # Nomor urut setiap baris di dalam kuncinya
+        urut = np.argsort(indeks, kind="stable")
+        awal_kelompok = np.concatenate(([0], np.cumsum(jumlah)[:-1]))
+        ke = np.empty(n, dtype=np.int64)
+        ke[urut] = np.arange(n) - np.repeat(awal_kelompok, jumlah)
+
+        with self._lock:
+            offset = np.array([self._dipakai.get(k, 0) for k in kode], dtype=np.int64)
+            for k, j in zip(kode, jumlah.tolist()):
+                self._dipakai[k] = self._dipakai.get(k, 0) + j
+        basis = np.array([_hash64(self.seed, k) for k in kode], dtype=np.uint64)
+        return _splitmix(basis[indeks], (offset[indeks] + ke).astype(np.uint64))
+
+    def __repr__(self):
+        return f"KonteksAcak(seed={self.seed})"
@@ -0,0 +1,359 @@
+"""
+Perhitungan BEBAN per kolom untuk ExcelBebanProcessor
+
+Parameter setiap mutu dibaca dari tabel aturan_mutu.json (profil "odoo"
+untuk modules/excel_handler.py, "load" untuk Pengujian/ExcelProcessorLoad.py),
+sehingga menambah atau mengubah mutu tidak perlu mengubah kode.
+
+Satu sheet dihitung sekaligus:
+- MUTU dicocokkan ke tabel sekali per nilai unik (hasil di-cache)
+- nilai umur 7 diundi sekaligus per kelas mutu
+- nilai umur 28 mengikuti docket sebelumnya (random walk); semua undian
+  dan parameter disiapkan sebagai array, lalu satu kali scan berurutan
+  hanya atas baris umur 28
+
+Dengan KonteksAcak (modules/acak.py) setiap baris memakai tepat satu undian
+dari aliran docket-nya, jadi hasil hitung_beban (sekaligus atau per batch)
+dan hitung_satu (baris demi baris) sama untuk seed yang sama.
+"""
+import functools
+import json
+import os
+import random
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+from modules.acak import kunci_docket
+
+FILE_ATURAN = os.path.join(os.path.dirname(os.path.abspath(__file__)), "aturan_mutu.json")
+
+
+class AturanError(ValueError):
+    """Raised when the mutu rule table is missing a field or has an invalid range"""
+
+
+@dataclass(frozen=True)
+class AturanMutu:
+    """Parameter BEBAN satu kelas mutu"""
+    nama: str                 # substring yang dicari di kolom MUTU
+    rentang_7: tuple          # (min, max) umur 7
+    awal_28: tuple            # (min, max) umur 28 tanpa riwayat / docket baru
+    mean_sama: float          # docket sama: turun bila beban sebelumnya >= mean
+    turun_sama: tuple
+    naik_sama: tuple
+    batas_sama: tuple         # (min, max) hasil
+    mean_beda: float          # docket berbeda
+    turun_beda: tuple
+    naik_beda: tuple
+    batas_beda: tuple
+    # Langkah docket berbeda mensyaratkan mutu sebelumnya sama; mutu
+    # sebelumnya tidak pernah dicatat, jadi yang berlaku selalu undian baru
+    beda_perlu_mutu: bool = False
+    lain: Optional[str] = "0.00"   # umur selain 7/28 (None: sel tidak ditulis)
+
+
+# Jenis langkah umur 28
+_BARU, _SAMA, _BEDA = 0, 1, 2
+
+
+def _tabel_langkah(aturan):
+    """
+    Step parameters per rule and step kind, shape (jumlah aturan, 3, 7)
+
+    Columns: mean, turun min, turun lebar, naik min, naik lebar, batas min, batas max
+    """
+    tabel = np.zeros((len(aturan), 3, 7))
+    for i, a in enumerate(aturan):
+        for jenis, (mean, turun, naik, batas) in (
+            (_SAMA, (a.mean_sama, a.turun_sama, a.naik_sama, a.batas_sama)),
+            (_BEDA, (a.mean_beda, a.turun_beda, a.naik_beda, a.batas_beda)),
+        ):
+            tabel[i, jenis] = (
+                mean, turun[0], turun[1] - turun[0], naik[0], naik[1] - naik[0], batas[0], batas[1]
+            )
+    return tabel
+
+
+class TabelAturan:
+    """
+    Compiled rule table of one profile
+
+    Matching keeps the table order (first name contained in MUTU wins).
+    Every distinct MUTU string is matched once and the result kept in a
+    dictionary, so later lookups are a single dict access.
+    """
+
+    def __init__(self, aturan, tidak_dikenal="0.00"):
+        """
+        Args:
+            aturan: Tuple of AturanMutu in matching order
+            tidak_dikenal: Result for a MUTU that matches no rule (None: not written)
+        """
+        self.aturan = tuple(aturan)
+        self.tidak_dikenal = tidak_dikenal
+        # Nama persis selalu cocok dengan aturan pertama yang terkandung di dalamnya
+        self._indeks = {}
+        for a in self.aturan:
+            self._indeks.setdefault(a.nama, self._cocokkan(a.nama))
+        # Parameter umur 28 sebagai array, diindeks dengan kelas per baris
+        self.awal_28 = np.array([a.awal_28 for a in self.aturan], dtype=float).reshape(-1, 2)
+        self.perlu_mutu = np.array([a.beda_perlu_mutu for a in self.aturan], dtype=bool)
+        self.langkah = _tabel_langkah(self.aturan)
+
+    def __len__(self):
+        return len(self.aturan)
+
+    def __getitem__(self, indeks):
+        return self.aturan[indeks]
+
+    def _cocokkan(self, mutu):
+        for i, a in enumerate(self.aturan):
+            if a.nama in mutu:
+                return i
+        return -1
+
+    def cari(self, mutu):
+        """Index of the rule for a MUTU cell value, -1 if none (memoized)"""
+        kunci = str(mutu or '').strip()
+        indeks = self._indeks.get(kunci)
+        if indeks is None:
+            indeks = self._indeks[kunci] = self._cocokkan(kunci)
+        return indeks
+
+
+def _rentang(data, kunci, konteks):
+    try:
+        bawah, atas = (float(x) for x in data[kunci])
+    except KeyError:
+        raise AturanError(f"{konteks}: '{kunci}' tidak ada")
+    except (TypeError, ValueError):
+        raise AturanError(f"{konteks}: '{kunci}' harus [min, max]")
+    if bawah > atas:
+        raise AturanError(f"{konteks}: '{kunci}' min lebih besar dari max")
+    return bawah, atas
+
+
+def _langkah_dari(data, kunci, konteks):
+    try:
+        langkah = data[kunci]
+        mean = float(langkah["mean"])
+    except KeyError as e:
+        raise AturanError(f"{konteks}: {e.args[0]!r} tidak ada")
+    konteks = f"{konteks}.{kunci}"
+    return (
+        mean,
+        _rentang(langkah, "turun", konteks),
+        _rentang(langkah, "naik", konteks),
+        _rentang(langkah, "batas", konteks),
+        bool(langkah.get("perlu_mutu_sama", False)),
+    )
+
+
+def kompilasi(profil):
+    """
+    Build a TabelAturan from one profile of the JSON table
+
+    Args:
+        profil: Dictionary with 'mutu' (list of entries) and optional 'tidak_dikenal'
+
+    Raises:
+        AturanError: missing field or invalid range
+    """
+    aturan = []
+    for nomor, entri in enumerate(profil.get("mutu", []), start=1):
+        nama = entri.get("nama")
+        nama = [nama] if isinstance(nama, str) else nama
+        if not nama:
+            raise AturanError(f"mutu ke-{nomor}: 'nama' tidak ada")
+        konteks = "/".join(nama)
+        mean_sama, turun_sama, naik_sama, batas_sama, _ = _langkah_dari(entri, "docket_sama", konteks)
+        mean_beda, turun_beda, naik_beda, batas_beda, perlu_mutu = _langkah_dari(entri, "docket_beda", konteks)
+        parameter = dict(
+            rentang_7=_rentang(entri, "umur_7", konteks),
+            awal_28=_rentang(entri, "umur_28", konteks),
+            mean_sama=mean_sama, turun_sama=turun_sama, naik_sama=naik_sama, batas_sama=batas_sama,
+            mean_beda=mean_beda, turun_beda=turun_beda, naik_beda=naik_beda, batas_beda=batas_beda,
+            beda_perlu_mutu=perlu_mutu,
+            lain=entri.get("umur_lain", "0.00"),
+        )
+        aturan.extend(AturanMutu(nama=n, **parameter) for n in nama)
+    return TabelAturan(aturan, profil.get("tidak_dikenal", "0.00"))
+
+
+@functools.lru_cache(maxsize=None)
+def muat_aturan(profil="odoo", path=FILE_ATURAN):
+    """
+    Load and compile one profile of the rule table (cached per profile and file)
+
+    Args:
+        profil: Profile name in the table ("odoo", "load")
+        path: JSON rule file
+
+    Raises:
+        AturanError: unknown profile or invalid table
+    """
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    try:
+        return kompilasi(data["profil"][profil])
+    except KeyError:
+        raise AturanError(f"Profil aturan '{profil}' tidak ada di {path}")
+
+
+def _format(nilai):
+    """Format like calculate_beban, as an object array of plain str (openpyxl rejects numpy.str_)"""
+    teks = np.empty(len(nilai), dtype=object)
+    teks[:] = [f"{x:.2f}" for x in nilai]
+    return teks
+
+
+def _undian(docket, rng, konteks):
+    """One uniform [0, 1) draw per row: from the row's docket stream, or from `rng`"""
+    if konteks is None:
+        return (rng or np.random.default_rng()).random(len(docket))
+    return konteks.undian([kunci_docket(d) for d in docket])
+
+
+def hitung_beban(docket, mutu, umur, rng=None, keadaan=(None, None), aturan=None, konteks=None):
+    """
+    Compute the BEBAN column for whole columns of DOCKET, MUTU and UMUR
+
+    Args:
+        docket: Sequence of DOCKET cell values (raw, as read from the sheet)
+        mutu: Sequence of MUTU cell values
+        umur: Sequence of UMUR cell values
+        rng: numpy Generator, used when `konteks` is not given (default: unseeded)
+        keadaan: (previous_docket, previous_beban) carried over from earlier rows
+        aturan: TabelAturan (default: profile "odoo" of aturan_mutu.json)
+        konteks: KonteksAcak; draws come from per-docket streams of its seed
+
+    Returns:
+        Tuple (list of BEBAN strings or None per row, (previous_docket, previous_beban) after the last row)
+    """
+    aturan = aturan or muat_aturan()
+    n = len(mutu)
+    hasil = np.full(n, "0.00", dtype=object)
+    if n == 0:
+        return [], keadaan
+    u = _undian(docket, rng, konteks)
+
+    cari = aturan.cari
+    kelas = np.fromiter((cari(m) for m in mutu), dtype=np.intp, count=n)
+    if aturan.tidak_dikenal != "0.00":
+        hasil[kelas < 0] = aturan.tidak_dikenal
+
+    nilai_umur = np.empty(n, dtype=object)
+    nilai_umur[:] = list(umur)
+    umur_7 = (nilai_umur == 7).astype(bool)
+    umur_28 = (nilai_umur == 28).astype(bool)
+
+    # Umur 7 dan umur lain: tanpa riwayat, diundi sekaligus per kelas
+    for k in np.unique(kelas[kelas >= 0]):
+        a = aturan[k]
+        di_kelas = kelas == k
+        if a.lain != "0.00":
+            hasil[di_kelas & ~umur_7 & ~umur_28] = a.lain
+        baris_7 = np.flatnonzero(di_kelas & umur_7)
+        if len(baris_7):
+            bawah, atas = a.rentang_7
+            hasil[baris_7] = _format(bawah + (atas - bawah) * u[baris_7])
+
+    # Umur 28: riwayat (docket, beban) dibawa dari baris umur 28 sebelumnya, lintas kelas
+    baris_28 = np.flatnonzero(umur_28 & (kelas >= 0))
+    m = len(baris_28)
+    if m == 0:
+        return hasil.tolist(), keadaan
+
+    kelas_28 = kelas[baris_28]
+    docket_28 = [docket[i] for i in baris_28]
+    docket_lalu, beban_lalu = keadaan
+    sebelum = [docket_lalu] + [None if d is None else str(d) for d in docket_28[:-1]]
+    # Sama seperti calculate_beban: docket sebelumnya (str) dibandingkan dengan nilai sel mentah
+    sama = np.array([s == d for s, d in zip(sebelum, docket_28)], dtype=bool)
+    tanpa_riwayat = np.array([s is None for s in sebelum], dtype=bool)
+    if beban_lalu is None or beban_lalu == 0.0:
+        tanpa_riwayat[0] = True
+    perlu_mutu = aturan.perlu_mutu[kelas_28]
+
+    jenis = np.full(m, _BEDA, dtype=np.intp)
+    jenis[sama] = _SAMA
+    jenis[~sama & perlu_mutu] = _BARU
+    jenis[tanpa_riwayat] = _BARU
+
+    awal = aturan.awal_28[kelas_28]
+    u_28 = u[baris_28]
+    nilai = (awal[:, 0] + (awal[:, 1] - awal[:, 0]) * u_28).tolist()
+    langkah = aturan.langkah[kelas_28, jenis].tolist()
+    u_langkah = u_28.tolist()
+
+    # Scan: hanya baris dengan langkah relatif terhadap beban sebelumnya yang berurutan
+    b = beban_lalu
+    for j, jenis_j in enumerate(jenis.tolist()):
+        if jenis_j == _BARU:
+            b = nilai[j]
+            continue
+        mean, turun, lebar_turun, naik, lebar_naik, bawah, atas = langkah[j]
+        if b >= mean:
+            b += turun + lebar_turun * u_langkah[j]
+        else:
+            b += naik + lebar_naik * u_langkah[j]
+        b = max(bawah, min(b, atas))
+        nilai[j] = b
+
+    hasil[baris_28] = _format(nilai)
+    terakhir = docket_28[-1]
+    return hasil.tolist(), (None if terakhir is None else str(terakhir), b)
+
+
+def _langkah(beban_lalu, mean, turun, naik, batas, uniform):
+    if beban_lalu >= mean:
+        beban = beban_lalu + uniform(*turun)
+    else:
+        beban = beban_lalu + uniform(*naik)
+    return max(batas[0], min(beban, batas[1]))
+
+
+def hitung_satu(docket, mutu, umur, keadaan=(None, None), aturan=None, uniform=random.uniform, konteks=None):
+    """
+    Compute BEBAN for a single row (same rules as hitung_beban)
+
+    Args:
+        docket: DOCKET cell value
+        mutu: MUTU cell value
+        umur: UMUR cell value
+        keadaan: (previous_docket, previous_beban) of the previous 28-day row
+        aturan: TabelAturan (default: profile "odoo" of aturan_mutu.json)
+        uniform: Draw function (a, b) -> float, used when `konteks` is not given
+        konteks: KonteksAcak; one draw per row from the docket's stream, as in hitung_beban
+
+    Returns:
+        Tuple (BEBAN string or None, new (previous_docket, previous_beban))
+    """
+    aturan = aturan or muat_aturan()
+    if konteks is not None:
+        u = float(konteks.undian([kunci_docket(docket)])[0])
+
+        def uniform(bawah, atas):
+            return bawah + (atas - bawah) * u
+
+    indeks = aturan.cari(mutu)
+    if indeks < 0:
+        return aturan.tidak_dikenal, keadaan
+    a = aturan[indeks]
+    if umur == 7:
+        return f"{uniform(*a.rentang_7):.2f}", keadaan
+    if umur != 28:
+        return a.lain, keadaan
+
+    docket_lalu, beban_lalu = keadaan
+    if docket_lalu is None or beban_lalu is None or beban_lalu == 0.0:
+        beban = uniform(*a.awal_28)
+    elif docket_lalu == docket:
+        beban = _langkah(beban_lalu, a.mean_sama, a.turun_sama, a.naik_sama, a.batas_sama, uniform)
+    elif not a.beda_perlu_mutu:
+        beban = _langkah(beban_lalu, a.mean_beda, a.turun_beda, a.naik_beda, a.batas_beda, uniform)
+    else:
+        beban = uniform(*a.awal_28)
+    return f"{beban:.2f}", (None if docket is None else str(docket), beban)
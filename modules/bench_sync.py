@@ -0,0 +1,268 @@
+"""
+Benchmark sinkronisasi ERP tanpa menyentuh rmc.adhimix.web.id
+
+- membuat schema terpisah (default: bench) berisi tabel pengujian dengan N baris sintetis
+- menjalankan server HTTP lokal pengganti webser_hasilUji dengan latensi dan
+  tingkat error yang bisa diatur
+- menjalankan threadSinkData terhadap keduanya sampai semua baris selesai,
+  lalu melaporkan baris/detik, latensi push p50/p99 dan query database per baris
+
+Contoh:
+    python -m modules.bench_sync --rows 2000 --latency 30 --error-rate 0.02
+    python -m modules.bench_sync --rows 500 --batch-size 1 --json hasil_baseline.json
+"""
+import argparse
+import json
+import logging
+import math
+import os
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import psycopg2
+
+# Add project root to sys.path so we can import from modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from modules import db_pool, settings
+from modules.daemon_sync import setup_daemon_logging, threadSinkData
+from modules.erp_client import DITOLAK, CircuitBreaker, ErpClient
+
+
+class ErpTiruan(ThreadingHTTPServer):
+    """Local stand-in for the webser_hasilUji endpoint"""
+
+    daemon_threads = True
+
+    def __init__(self, latensi_ms=20.0, jitter_ms=5.0, error_rate=0.0):
+        """
+        Initialize server on a free localhost port
+
+        Args:
+            latensi_ms: Mean response delay in milliseconds
+            jitter_ms: Uniform +/- spread around the mean delay
+            error_rate: Fraction of requests answered with HTTP 500
+        """
+        super().__init__(("127.0.0.1", 0), HandlerErpTiruan)
+        self.latensi_ms = latensi_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.jumlah_request = 0
+        self._lock = threading.Lock()
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}/benda_uji/update/"
+
+
+class HandlerErpTiruan(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, seperti server ERP sebenarnya
+
+    def do_POST(self):
+        panjang = int(self.headers.get("Content-Length", 0))
+        self.rfile.read(panjang)
+
+        server = self.server
+        with server._lock:
+            server.jumlah_request += 1
+        tunda = max(0.0, server.latensi_ms + random.uniform(-server.jitter_ms, server.jitter_ms))
+        time.sleep(tunda / 1000.0)
+
+        if random.random() < server.error_rate:
+            kode, isi = 500, b'{"error": "simulasi error"}'
+        else:
+            kode, isi = 200, b'{"jsonrpc": "2.0", "result": "ok"}'
+        self.send_response(kode)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(isi)))
+        self.end_headers()
+        self.wfile.write(isi)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class ErpClientTerukur(ErpClient):
+    """ErpClient that keeps the latency of every real push (not the refused ones)"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.sampel = []
+        self._sampel_lock = threading.Lock()
+
+    def kirim(self, bendaUji):
+        mulai = time.perf_counter()
+        hasil = super().kirim(bendaUji)
+        if hasil is not DITOLAK:
+            with self._sampel_lock:
+                self.sampel.append(time.perf_counter() - mulai)
+        return hasil
+
+
+def persentil(data, p):
+    """Nearest-rank percentile of `data` (0 if empty)"""
+    if not data:
+        return 0.0
+    urut = sorted(data)
+    k = max(0, min(len(urut) - 1, math.ceil(p / 100.0 * len(urut)) - 1))
+    return urut[k]
+
+
+def siapkan_schema(dsn, schema, jumlah):
+    """
+    (Re)create `schema`.pengujian and fill it with `jumlah` rows sinkron = 'B'
+
+    The table copies the columns and indexes of public.pengujian so the
+    benchmark runs against the real structure.
+    """
+    conn = psycopg2.connect(dsn)
+    try:
+        with conn, conn.cursor() as kursor:
+            kursor.execute(f"DROP SCHEMA IF EXISTS {schema} CASCADE")
+            kursor.execute(f"CREATE SCHEMA {schema}")
+            kursor.execute(
+                f"CREATE TABLE {schema}.pengujian (LIKE public.pengujian INCLUDING DEFAULTS INCLUDING INDEXES)"
+            )
+            # Jangan memakai sequence milik public.pengujian
+            kursor.execute(f"ALTER TABLE {schema}.pengujian ALTER COLUMN idpengujian DROP DEFAULT")
+            kursor.execute(
+                f"""INSERT INTO {schema}.pengujian
+                        (idpengujian, tgluji, idalat, kodebendauji, nodocket, nourutbenda, nilaikn,
+                         beratbenda, tiperetak, sinkron, idbendauji, tglrencanauji, bujnama,
+                         kuattekan, bebanmpa, umur, tglbendauji)
+                    SELECT g, current_date, '4', 'BENCH-' || g, 'BENCH' || (g / 4), (g % 4 + 1)::text,
+                           round((300 + random() * 200)::numeric, 2), 12.2, 'A', 'B', (900000 + g)::text,
+                           current_date, 'Silinder', 250, 20, 28, current_date - 28
+                    FROM generate_series(1, %s) AS g""",
+                (jumlah,),
+            )
+            kursor.execute(f"ANALYZE {schema}.pengujian")
+    finally:
+        conn.close()
+
+
+def hitung_status(dsn, schema):
+    """Row count per sinkron value in the benchmark table"""
+    conn = psycopg2.connect(dsn)
+    try:
+        with conn.cursor() as kursor:
+            kursor.execute(f"SELECT sinkron, count(*) FROM {schema}.pengujian GROUP BY sinkron")
+            return {status.strip(): jumlah for status, jumlah in kursor.fetchall()}
+    finally:
+        conn.close()
+
+
+def jalankan(args):
+    """Run one benchmark and return the report dictionary"""
+    dsn = args.dsn or settings.get_settings().data.dsn
+    logger = setup_daemon_logging(log_level=getattr(logging, args.log_level))
+
+    print(f"Menyiapkan {args.rows} baris di schema '{args.schema}'...")
+    siapkan_schema(dsn, args.schema, args.rows)
+
+    server = ErpTiruan(args.latency, args.jitter, args.error_rate)
+    threading.Thread(target=server.serve_forever, name="ErpTiruan", daemon=True).start()
+
+    db_pool.init_pool(
+        f"{dsn} options='-c search_path={args.schema},public'",
+        minconn=1, maxconn=args.concurrency + 2, timeout=30,
+    )
+    client = ErpClientTerukur(
+        server.url, workers=args.concurrency, logger=logger,
+        breaker=CircuitBreaker(ambang=args.breaker_ambang, jeda=args.breaker_jeda),
+    )
+    daemon = threadSinkData(
+        1, "BenchSinkron", args.delay, logger=logger,
+        batch_size=args.batch_size, concurrency=args.concurrency,
+        erp_client=client, max_percobaan=args.max_percobaan,
+        backoff_dasar=args.backoff_dasar, backoff_maks=args.backoff_maks,
+    )
+
+    query_awal = db_pool.pool_metrics().get("queries", 0)
+    mulai = time.perf_counter()
+    daemon.start()
+
+    status = {}
+    batas = mulai + args.timeout
+    while time.perf_counter() < batas:
+        time.sleep(0.25)
+        status = hitung_status(dsn, args.schema)
+        if status.get("B", 0) == 0 and status.get("P", 0) == 0:
+            break
+    durasi = time.perf_counter() - mulai
+
+    daemon.stop()
+    daemon.join(timeout=30)
+    client.close()
+    server.shutdown()
+
+    query = db_pool.pool_metrics().get("queries", 0) - query_awal
+    db_pool.close_pool()
+    if not args.keep:
+        conn = psycopg2.connect(dsn)
+        with conn, conn.cursor() as kursor:
+            kursor.execute(f"DROP SCHEMA IF EXISTS {args.schema} CASCADE")
+        conn.close()
+
+    selesai = status.get("S", 0)
+    return {
+        "rows": args.rows,
+        "batch_size": args.batch_size,
+        "concurrency": args.concurrency,
+        "latency_ms": args.latency,
+        "error_rate": args.error_rate,
+        "durasi_s": round(durasi, 3),
+        "tersinkron": selesai,
+        "dead_letter": status.get("G", 0),
+        "sisa": status.get("B", 0) + status.get("P", 0),
+        "baris_per_detik": round(selesai / durasi, 2) if durasi else 0.0,
+        "push_total": len(client.sampel),
+        "push_p50_ms": round(persentil(client.sampel, 50) * 1000, 2),
+        "push_p99_ms": round(persentil(client.sampel, 99) * 1000, 2),
+        "request_ke_server": server.jumlah_request,
+        "query_db": query,
+        "query_per_baris": round(query / selesai, 2) if selesai else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark throughput sinkronisasi pengujian -> ERP")
+    parser.add_argument("--rows", type=int, default=1000, help="jumlah baris sintetis")
+    parser.add_argument("--latency", type=float, default=20.0, help="latensi server tiruan (ms)")
+    parser.add_argument("--jitter", type=float, default=5.0, help="sebaran latensi +/- (ms)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraksi respon HTTP 500")
+    parser.add_argument("--batch-size", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--delay", type=float, default=0.5, help="delayNya daemon (detik)")
+    parser.add_argument("--max-percobaan", type=int, default=8)
+    parser.add_argument("--backoff-dasar", type=float, default=0.5)
+    parser.add_argument("--backoff-maks", type=float, default=5.0)
+    parser.add_argument("--breaker-ambang", type=int, default=5)
+    parser.add_argument("--breaker-jeda", type=float, default=2.0)
+    parser.add_argument("--timeout", type=float, default=600.0, help="batas waktu benchmark (detik)")
+    parser.add_argument("--schema", default="bench", help="schema sementara untuk tabel benchmark")
+    parser.add_argument("--dsn", help="DSN PostgreSQL (default: [data] di config.cnf)")
+    parser.add_argument("--keep", action="store_true", help="jangan hapus schema setelah selesai")
+    parser.add_argument("--json", help="simpan hasil ke file JSON (baseline regresi)")
+    parser.add_argument("--log-level", default="WARNING", choices=["DEBUG", "INFO", "WARNING", "ERROR"])
+    args = parser.parse_args()
+
+    hasil = jalankan(args)
+
+    print("=" * 60)
+    print("HASIL BENCHMARK SINKRONISASI")
+    print("=" * 60)
+    for kunci, nilai in hasil.items():
+        print(f"{kunci:20s}: {nilai}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(hasil, f, indent=2)
+        print(f"Hasil disimpan ke {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,397 @@
+import csv
+import io
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+
+import psycopg2
+from psycopg2 import sql
+
+logger = logging.getLogger(__name__)
+
+# Kolom tabel pengujian dan jenis konversinya (lihat database_schema.sql)
+KOLOM_PENGUJIAN = {
+    "idpengujian": "int",
+    "tgluji": "date",
+    "idalat": "char",
+    "kodebendauji": "char",
+    "nodocket": "char",
+    "nourutbenda": "char",
+    "nilaikn": "numeric",
+    "beratbenda": "numeric",
+    "tiperetak": "char",
+    "sinkron": "char",
+    "idbendauji": "char",
+    "tglrencanauji": "date",
+    "bujnama": "char",
+    "kuattekan": "numeric",
+    "bebanmpa": "numeric",
+    "umur": "int",
+    "tglbendauji": "date",
+}
+
+FORMAT_TANGGAL = ("%Y-%m-%d", "%Y-%m-%d %H:%M:%S", "%d/%m/%Y", "%d-%m-%Y", "%d/%m/%Y %H:%M:%S")
+
+
+class BulkLoadError(Exception):
+    """Raised when a CSV value cannot be converted to its column type"""
+
+
+@dataclass(frozen=True)
+class UploadReport:
+    """Result of one bulk upload, computed from the batch itself and catalog statistics"""
+    file: str
+    dibaca: int
+    dimasukkan: int
+    dilewati: int
+    durasi_s: float
+    estimasi_baris_tabel: int = None
+    bentrok_id: int = 0
+
+    def ringkasan(self):
+        """One-line summary for the log"""
+        estimasi = "tidak diketahui" if self.estimasi_baris_tabel is None else f"~{self.estimasi_baris_tabel}"
+        teks = (
+            f"{self.dimasukkan} baris dimasukkan, {self.dilewati} dilewati (duplikat) dari {self.dibaca} "
+            f"dalam {self.durasi_s}s; estimasi isi tabel: {estimasi} baris"
+        )
+        if self.bentrok_id:
+            teks += f"; PERINGATAN: {self.bentrok_id} baris baru tidak masuk karena idpengujian bentrok"
+        return teks
+
+
+def _teks(nilai):
+    # pandas menulis angka bulat dari kolom yang berisi NaN sebagai "12.0"
+    if nilai.endswith(".0") and nilai[:-2].lstrip("-").isdigit():
+        return nilai[:-2]
+    return nilai
+
+
+def _angka(nilai):
+    if "," in nilai and "." not in nilai:
+        nilai = nilai.replace(",", ".")
+    try:
+        return str(Decimal(nilai))
+    except InvalidOperation:
+        raise ValueError(nilai)
+
+
+def _bulat(nilai):
+    return str(int(Decimal(_angka(nilai))))
+
+
+def _tanggal(nilai):
+    for fmt in FORMAT_TANGGAL:
+        try:
+            return datetime.strptime(nilai, fmt).date().isoformat()
+        except ValueError:
+            continue
+    raise ValueError(nilai)
+
+
+KONVERSI = {"char": _teks, "numeric": _angka, "int": _bulat, "date": _tanggal}
+
+
+def baris_csv(path, delimiter=";"):
+    """
+    Read a daily CSV (as written by _generate_csv_files_logic) and coerce its values
+
+    Args:
+        path: CSV file
+        delimiter: Field separator
+
+    Returns:
+        Tuple (kolom, generator of rows); empty strings become None
+    """
+    f = open(path, newline="", encoding="utf-8-sig")
+    pembaca = csv.reader(f, delimiter=delimiter)
+    header = [h.strip().lower() for h in next(pembaca, [])]
+    tidak_dikenal = [h for h in header if h not in KOLOM_PENGUJIAN]
+    if tidak_dikenal:
+        f.close()
+        raise BulkLoadError(f"Kolom tidak dikenal di {path}: {', '.join(tidak_dikenal)}")
+    konversi = [KONVERSI[KOLOM_PENGUJIAN[h]] for h in header]
+
+    def _baris():
+        with f:
+            for nomor, baris in enumerate(pembaca, start=2):
+                if not any(sel.strip() for sel in baris):
+                    continue
+                hasil = []
+                for kolom, fungsi, sel in zip(header, konversi, baris):
+                    sel = sel.strip()
+                    if sel == "" or sel.lower() == "nan" or sel.lower() == "nat":
+                        hasil.append(None)
+                        continue
+                    try:
+                        hasil.append(fungsi(sel))
+                    except (ValueError, InvalidOperation):
+                        raise BulkLoadError(f"Baris {nomor}, kolom {kolom}: nilai {sel!r} tidak valid")
+                yield hasil
+
+    return header, _baris()
+
+
+class _AliranCopy(io.TextIOBase):
+    """File-like object feeding COPY ... FROM STDIN from a row generator, without buffering the whole file"""
+
+    def __init__(self, daftar_baris):
+        self._baris = daftar_baris
+        self._buf = io.StringIO()
+        # Format CSV COPY: sel kosong tanpa kutip = NULL
+        self._penulis = csv.writer(self._buf, lineterminator="\n")
+        self._sisa = ""
+        self.jumlah = 0
+
+    def readable(self):
+        return True
+
+    def read(self, size=-1):
+        while size < 0 or len(self._sisa) + self._buf.tell() < size:
+            baris = next(self._baris, None)
+            if baris is None:
+                break
+            self._penulis.writerow(["" if nilai is None else nilai for nilai in baris])
+            self.jumlah += 1
+        data = self._sisa + self._buf.getvalue()
+        self._buf.seek(0)
+        self._buf.truncate()
+        if size < 0:
+            self._sisa = ""
+            return data
+        self._sisa = data[size:]
+        return data[:size]
+
+
+def muat_csv(conn, path, tabel="pengujian", delimiter=";"):
+    """
+    Bulk-load a daily CSV into `tabel` with COPY FROM STDIN
+
+    Rows are streamed into a temporary staging table (only the CSV's columns,
+    no constraints) and merged into the target with one INSERT ... SELECT,
+    all in a single transaction. Rows whose idpengujian or natural key
+    (nodocket + nourutbenda) already exists, in the table or earlier in the
+    same file, are skipped and counted instead of failing the batch, so
+    re-running a day's upload is a cheap no-op. Existing keys are looked up
+    in the table's key table (`<tabel>_kunci`, database_schema.sql section 14)
+    when there is one: unique indexes of a partitioned table only hold
+    together with tgluji, so the table itself would accept the same benda uji
+    again under another test date. Skipped rows whose idpengujian belongs to
+    a different benda uji are reported as bentrok_id. When the CSV carries
+    idpengujian, the serial sequence is moved past the loaded ids so later
+    single-row inserts (db_controller.simpan) do not collide with them.
+
+    The report costs O(batch): counts come from COPY/rowcount and the table
+    size is the planner's estimate from the catalog, never a scan.
+
+    Args:
+        conn: psycopg2 connection
+        path: CSV file
+        tabel: Target table name
+        delimiter: CSV field separator
+
+    Returns:
+        UploadReport
+
+    Raises:
+        BulkLoadError: unknown column, unconvertible value, or a partitioned
+            target without its key table
+        psycopg2.Error: database error (transaction rolled back)
+    """
+    mulai = time.monotonic()
+    kolom, daftar_baris = baris_csv(path, delimiter)
+    aliran = _AliranCopy(daftar_baris)
+    daftar_kolom = sql.SQL(", ").join(map(sql.Identifier, kolom))
+    target = sql.Identifier(tabel)
+    staging = sql.Identifier(f"stg_{tabel}")
+
+    autocommit_lama = conn.autocommit
+    conn.autocommit = False
+    try:
+        with conn.cursor() as kursor:
+            kunci = _tabel_kunci(kursor, tabel)
+            # Upload lain ke tabel yang sama menunggu, agar cek kunci di bawah tidak basi
+            kursor.execute("SELECT pg_advisory_xact_lock(hashtext(%s))", (kunci,))
+            kursor.execute(
+                sql.SQL("CREATE TEMP TABLE {} ON COMMIT DROP AS SELECT {} FROM {} WITH NO DATA").format(
+                    staging, daftar_kolom, target
+                )
+            )
+            kursor.copy_expert(
+                sql.SQL("COPY {} ({}) FROM STDIN WITH (FORMAT csv)").format(staging, daftar_kolom).as_string(kursor),
+                aliran,
+            )
+            bentrok = _hitung_bentrok(kursor, staging, kunci, kolom)
+            kursor.execute(_sql_gabung(target, staging, kunci, kolom))
+            dimasukkan = kursor.rowcount
+            if "idpengujian" in kolom:
+                _majukan_urutan(kursor, tabel)
+            estimasi = estimasi_baris(kursor, tabel)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.autocommit = autocommit_lama
+
+    laporan = UploadReport(
+        file=path,
+        dibaca=aliran.jumlah,
+        dimasukkan=dimasukkan,
+        dilewati=aliran.jumlah - dimasukkan,
+        durasi_s=round(time.monotonic() - mulai, 3),
+        estimasi_baris_tabel=estimasi,
+        bentrok_id=bentrok,
+    )
+    logger.info(f"Bulk load {path}: {laporan.ringkasan()}")
+    return laporan
+
+
+def _tabel_kunci(kursor, tabel):
+    """
+    Table holding the global keys of `tabel`
+
+    Returns:
+        `<tabel>_kunci` when it exists, otherwise `tabel` itself (a plain
+        table whose unique indexes are already global)
+
+    Raises:
+        BulkLoadError: `tabel` is partitioned and has no key table
+    """
+    kursor.execute(
+        "SELECT to_regclass(%s) IS NOT NULL, (SELECT relkind FROM pg_class WHERE oid = to_regclass(%s))",
+        (f"{tabel}_kunci", tabel),
+    )
+    ada_kunci, jenis = kursor.fetchone()
+    if ada_kunci:
+        return f"{tabel}_kunci"
+    if jenis == "p":
+        raise BulkLoadError(
+            f"Tabel {tabel} dipartisi tetapi {tabel}_kunci belum ada; jalankan bagian 14 database_schema.sql"
+        )
+    return tabel
+
+
+def _hitung_bentrok(kursor, staging, kunci, kolom):
+    """Staging rows whose idpengujian is already used by a different benda uji"""
+    if not {"idpengujian", "nodocket", "nourutbenda"} <= set(kolom):
+        return 0
+    kursor.execute(
+        sql.SQL(
+            "SELECT count(*) FROM {} s JOIN {} k ON k.idpengujian = s.idpengujian "
+            "WHERE k.nodocket IS DISTINCT FROM s.nodocket OR k.nourutbenda IS DISTINCT FROM s.nourutbenda"
+        ).format(staging, sql.Identifier(kunci))
+    )
+    return kursor.fetchone()[0]
+
+
+def _sql_gabung(target, staging, kunci, kolom):
+    """
+    INSERT ... SELECT from staging, without rows whose keys already exist
+
+    Within the file the first row of each idpengujian and of each natural
+    key wins; rows with a NULL key part are only checked on the other key.
+    """
+    daftar_kolom = sql.SQL(", ").join(map(sql.Identifier, kolom))
+    kunci = sql.Identifier(kunci)
+    urutan = []
+    syarat = []
+    if {"nodocket", "nourutbenda"} <= set(kolom):
+        urutan.append(sql.SQL("row_number() OVER (PARTITION BY nodocket, nourutbenda ORDER BY ctid) AS ke_benda"))
+        syarat.append(sql.SQL(
+            "(s.nodocket IS NULL OR s.nourutbenda IS NULL OR (s.ke_benda = 1 AND NOT EXISTS ("
+            "SELECT 1 FROM {} k WHERE k.nodocket = s.nodocket AND k.nourutbenda = s.nourutbenda)))"
+        ).format(kunci))
+    if "idpengujian" in kolom:
+        urutan.append(sql.SQL("row_number() OVER (PARTITION BY idpengujian ORDER BY ctid) AS ke_id"))
+        syarat.append(sql.SQL(
+            "(s.idpengujian IS NULL OR (s.ke_id = 1 AND NOT EXISTS ("
+            "SELECT 1 FROM {} k WHERE k.idpengujian = s.idpengujian)))"
+        ).format(kunci))
+    return sql.SQL(
+        "INSERT INTO {target} ({kolom}) SELECT {kolom} FROM (SELECT {kolom}{urutan} FROM {staging}) s "
+        "WHERE {syarat} ON CONFLICT DO NOTHING"
+    ).format(
+        target=target,
+        kolom=daftar_kolom,
+        urutan=sql.SQL("").join([sql.SQL(", ") + u for u in urutan]),
+        staging=staging,
+        syarat=sql.SQL(" AND ").join(syarat) if syarat else sql.SQL("TRUE"),
+    )
+
+
+def estimasi_baris(kursor, tabel):
+    """
+    Row count estimate of `tabel` from pg_class/pg_stat_user_tables (no table scan)
+
+    For a partitioned table the estimates of its partitions are added up.
+
+    Returns:
+        Estimated number of rows, None if the table has never been analyzed
+    """
+    kursor.execute(
+        """ SELECT sum(GREATEST(c.reltuples::bigint, COALESCE(s.n_live_tup, 0)))
+            FROM pg_class c
+            LEFT JOIN pg_stat_user_tables s ON s.relid = c.oid
+            WHERE c.oid = to_regclass(%s)
+               OR c.oid IN (SELECT inhrelid FROM pg_inherits WHERE inhparent = to_regclass(%s)); """,
+        (tabel, tabel),
+    )
+    baris = kursor.fetchone()
+    if baris is None or baris[0] is None or baris[0] < 0:
+        return None
+    return int(baris[0])
+
+
+def _id_terpakai(kursor, tabel):
+    """
+    Highest idpengujian in use: max of the table and of its serial sequence
+
+    Returns:
+        Tuple (id terbesar, nama sequence atau None)
+    """
+    kursor.execute(sql.SQL("SELECT COALESCE(max(idpengujian), 0) FROM {}").format(sql.Identifier(tabel)))
+    terbesar = kursor.fetchone()[0]
+    kursor.execute("SELECT pg_get_serial_sequence(%s, 'idpengujian')", (tabel,))
+    urutan = kursor.fetchone()[0]
+    if urutan:
+        # Nama dari pg_get_serial_sequence sudah di-quote bila perlu
+        kursor.execute(sql.SQL("SELECT last_value, is_called FROM {}").format(sql.SQL(urutan)))
+        nilai, dipanggil = kursor.fetchone()
+        terbesar = max(terbesar, nilai if dipanggil else nilai - 1)
+    return terbesar, urutan
+
+
+def _majukan_urutan(kursor, tabel):
+    """Move the idpengujian sequence past ids loaded explicitly (never backwards)"""
+    terbesar, urutan = _id_terpakai(kursor, tabel)
+    if urutan and terbesar > 0:
+        kursor.execute("SELECT setval(%s, %s)", (urutan, terbesar))
+
+
+def id_berikutnya(conn, tabel="pengujian"):
+    """
+    Next free idpengujian according to the database
+
+    Takes the larger of max(idpengujian) and the serial sequence's last value,
+    so ids handed out by single-row inserts are not reused.
+
+    Returns:
+        Integer id
+    """
+    with conn.cursor() as kursor:
+        terbesar, _ = _id_terpakai(kursor, tabel)
+    conn.rollback()
+    return terbesar + 1
+
+
+def koneksi(user, password, host, port, database):
+    """
+    Open a dedicated psycopg2 connection for a bulk load (GUI credentials)
+
+    Returns:
+        psycopg2 connection
+    """
+    return psycopg2.connect(user=user, password=password, host=host, port=port, dbname=database)
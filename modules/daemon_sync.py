@@ -1,6 +1,5 @@
-import configparser
 import logging
-import ssl
+import select
 import threading
 import time
 import os
@@ -8,11 +7,20 @@ import sys
 import queue
 
 import psycopg2
-import requests
+
+# Add project root to sys.path so we can import from modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from modules import db_pool, partisi, settings
+from modules.erp_client import DITOLAK, ErpClient, get_erp_client
+from modules.sync_metrics import MetricsServer, SyncMetrics
 
 # Global logger variable for the daemon
 daemon_logger = None
 
+# Channel NOTIFY yang dikirim trigger trg_pengujian_sinkron (database_schema.sql)
+KANAL_SINKRON = "pengujian_sinkron"
+
 def resource_path(relative_path):
     """Get absolute path to resource, works for dev and for PyInstaller"""
     try:
@@ -97,6 +105,62 @@ def get_daemon_logger():
     return daemon_logger
 
 
+class SinkronListener:
+    """
+    Dedicated LISTEN connection for the 'pengujian_sinkron' channel
+    
+    Kept outside the pool because a LISTEN session must stay open for the
+    daemon's whole lifetime. Any connection error closes it; the next wait()
+    reconnects.
+    """
+
+    def __init__(self, logger, channel=KANAL_SINKRON):
+        self.logger = logger
+        self.channel = channel
+        self.conn = None
+
+    def connect(self):
+        """Open the connection and LISTEN on the channel"""
+        self.conn = psycopg2.connect(db_pool.get_pool().dsn)
+        self.conn.autocommit = True
+        with self.conn.cursor() as kursor:
+            kursor.execute(f"LISTEN {self.channel};")
+        self.logger.info(f"LISTEN aktif pada channel '{self.channel}'")
+
+    def wait(self, timeout):
+        """
+        Block until a notification arrives or the timeout expires
+        
+        Args:
+            timeout: Max seconds to block
+        
+        Returns:
+            True if at least one notification was received
+        """
+        if self.conn is None:
+            self.connect()
+        conn = self.conn
+        if not conn.notifies:
+            dapat, _, _ = select.select([conn], [], [], timeout)
+            if dapat:
+                conn.poll()
+        if conn.notifies:
+            jumlah = len(conn.notifies)
+            conn.notifies.clear()
+            self.logger.debug(f"Menerima {jumlah} notifikasi dari channel '{self.channel}'")
+            return True
+        return False
+
+    def close(self):
+        """Close the LISTEN connection"""
+        if self.conn is not None:
+            try:
+                self.conn.close()
+            except Exception:
+                pass
+            self.conn = None
+
+
 class threadSinkData(threading.Thread):
     """
     Thread-safe daemon for syncing local database with ERP database
@@ -108,7 +172,10 @@ class threadSinkData(threading.Thread):
     - Better error handling and graceful shutdown
     """
 
-    def __init__(self, threadID, name, delayNya, log_queue=None, logger=None):
+    def __init__(self, threadID, name, delayNya, log_queue=None, logger=None,
+                 batch_size=1, concurrency=1, listen=False, poll_fallback=60,
+                 erp_client=None, lease=120, max_percobaan=8, backoff_dasar=5, backoff_maks=900,
+                 metrics_port=0, stall_detik=600, partisi_ke_depan=3):
         """
         Initialize daemon thread
         
@@ -118,6 +185,18 @@ class threadSinkData(threading.Thread):
             delayNya: Delay between sync cycles in seconds
             log_queue: Thread-safe queue.Queue() for logging (NOT a GUI widget)
             logger: Optional logger instance
+            batch_size: Rows claimed per cycle; 1 keeps the one-row-per-cycle mode
+            concurrency: Number of parallel POSTs to ERP in batch mode
+            listen: Wake up on NOTIFY instead of polling every delayNya seconds
+            poll_fallback: In listen mode, seconds between safety-net polls
+            erp_client: Optional ErpClient (default: built from the [webser] settings)
+            lease: Seconds a claimed ('P') row stays reserved for this worker
+            max_percobaan: Failed pushes after which a row is parked as 'G'
+            backoff_dasar: Retry delay in seconds after the first failure
+            backoff_maks: Upper bound of the (doubling) retry delay
+            metrics_port: Local port for /metrics and /health (0 = disabled)
+            stall_detik: Backlog without a successful push for this long is unhealthy
+            partisi_ke_depan: Monthly pengujian partitions kept ready ahead (0 = disabled)
         """
         threading.Thread.__init__(self)
         self.daemon = True  # Make this a daemon thread
@@ -125,6 +204,20 @@ class threadSinkData(threading.Thread):
         self.threadID = threadID
         self.name = name
         self.delayNya = delayNya
+        self.batch_size = max(1, int(batch_size))
+        self.concurrency = max(1, int(concurrency))
+        self.listen = listen
+        self.poll_fallback = poll_fallback
+        self.lease = lease
+        self.max_percobaan = max(1, int(max_percobaan))
+        self.backoff_dasar = backoff_dasar
+        self.backoff_maks = backoff_maks
+        self.metrics_port = int(metrics_port)
+        self._metrics_server = None
+        self._backlog_diperbarui = 0.0
+        self.partisi_ke_depan = int(partisi_ke_depan)
+        self._partisi_dirawat = None
+        self._listener = None
         
         # Setup logger - use provided logger or get global daemon logger
         if logger:
@@ -135,6 +228,14 @@ class threadSinkData(threading.Thread):
         else:
             self.logger = get_daemon_logger()
         
+        # ERP client with keep-alive session and bounded worker pool
+        self._own_erp = erp_client is None
+        self.erp = erp_client or ErpClient.from_config(workers=self.concurrency, logger=self.logger)
+        
+        # Counters/gauges for the GUI (snapshot()) and the /metrics endpoint
+        self.metrics = SyncMetrics(stall_detik=stall_detik)
+        self.erp.pengamat_latensi = self.metrics.latensi_erp.amati
+        
         # Thread control
         self._stop_event = threading.Event()
         self.stop_flag = False  # Backward compatibility
@@ -142,6 +243,10 @@ class threadSinkData(threading.Thread):
         self.logger.info("=" * 60)
         self.logger.info("Inisialisasi Daemon Sinkronisasi")
         self.logger.info(f"Thread ID: {threadID}, Name: {name}, Delay: {delayNya}s")
+        if self.batch_size > 1:
+            self.logger.info(f"Mode batch: {self.batch_size} baris/siklus, {self.concurrency} koneksi paralel")
+        if self.listen:
+            self.logger.info(f"Mode LISTEN/NOTIFY, polling cadangan tiap {self.poll_fallback}s")
         self.logger.info("=" * 60)
     
     def stop(self):
@@ -158,6 +263,52 @@ class threadSinkData(threading.Thread):
         """Check if stop was requested"""
         return self._stop_event.is_set()
     
+    def snapshot(self):
+        """
+        Current sync metrics, safe to poll from the GUI thread
+        
+        Returns:
+            Dictionary from SyncMetrics.snapshot()
+        """
+        return self.metrics.snapshot()
+    
+    def _perbarui_backlog(self, interval=10.0):
+        """
+        Refresh the backlog gauge, at most once per `interval` seconds
+        
+        Returns:
+            Current backlog size or None if unknown
+        """
+        if time.monotonic() - self._backlog_diperbarui >= interval:
+            self._backlog_diperbarui = time.monotonic()
+            with self.metrics.ukur_db():
+                return hitungBacklog()
+        return None
+    
+    def _rawat_partisi(self, interval=86400.0):
+        """Create upcoming monthly partitions of pengujian, at most once per `interval` seconds"""
+        if not self.partisi_ke_depan:
+            return
+        if self._partisi_dirawat is not None and time.monotonic() - self._partisi_dirawat < interval:
+            return
+        self._partisi_dirawat = time.monotonic()
+        try:
+            with self.metrics.ukur_db():
+                dibuat = partisi.pastikan_partisi(self.partisi_ke_depan)
+            if dibuat:
+                self.logger.info(f"Partisi baru: {', '.join(dibuat)}")
+        except Exception as e:
+            self.logger.warning(f"Gagal menyiapkan partisi pengujian: {str(e)}")
+    
+    def _akhir_siklus(self, mulai):
+        """Record cycle duration, backlog and breaker state"""
+        self._rawat_partisi()
+        self.metrics.catat_siklus(
+            time.monotonic() - mulai,
+            backlog=self._perbarui_backlog(),
+            breaker=self.erp.breaker.status,
+        )
+    
     def sleep_interruptible(self, seconds):
         """
         Sleep that can be interrupted by stop signal
@@ -176,21 +327,171 @@ class threadSinkData(threading.Thread):
             time.sleep(0.5)
         return True
 
+    def wait_for_data(self):
+        """
+        Wait until new 'B' rows may be available
+        
+        In listen mode this blocks on the NOTIFY socket (checking the stop flag
+        every 0.5 s) and returns as soon as a notification arrives, or after
+        poll_fallback seconds as a safety net. Without listen mode, or when the
+        LISTEN connection fails, it falls back to sleeping delayNya seconds.
+        
+        Returns:
+            True if waiting completed, False if interrupted by stop signal
+        """
+        if not self.listen:
+            return self.sleep_interruptible(self.delayNya)
+        
+        if self._listener is None:
+            self._listener = SinkronListener(self.logger)
+        
+        batas = time.monotonic() + self.poll_fallback
+        try:
+            while not self.is_stopped():
+                sisa = batas - time.monotonic()
+                if sisa <= 0:
+                    self.logger.debug("Polling cadangan (tidak ada notifikasi)")
+                    return True
+                if self._listener.wait(min(0.5, sisa)):
+                    return True
+            return False
+        except Exception as e:
+            self.logger.warning(f"Koneksi LISTEN gagal, kembali ke polling: {str(e)}")
+            self._listener.close()
+            return self.sleep_interruptible(self.delayNya)
+
+    def _proses_hasil(self, daftar, hasil):
+        """
+        Settle claimed rows after a push attempt
+        
+        - 200: marked 'S' in one UPDATE
+        - refused by the open circuit breaker: claim released until the
+          breaker's pause ends, attempt counter untouched
+        - any other failure: attempt counter incremented and the row scheduled
+          for a retry with exponential backoff, or parked as 'G' after
+          max_percobaan attempts, so one bad row never blocks the rest
+        
+        Args:
+            daftar: Claimed rows (cekData() column order)
+            hasil: ErpClient.kirim() results, same order
+        
+        Returns:
+            Tuple (berhasil, gagal) counts
+        """
+        berhasil, ditolak, gagal = [], [], []
+        for data, respon in zip(daftar, hasil):
+            if respon is DITOLAK:
+                ditolak.append(data[11])
+            elif respon is not None and respon.status_code == 200:
+                berhasil.append(data[11])
+            else:
+                gagal.append(data[11])
+                self.logger.warning(
+                    f"Gagal kirim Docket {data[5]}, Urut {data[6]} - "
+                    f"respon: {respon.status_code if respon is not None else 0}"
+                )
+        
+        terupdate, mati = [], 0
+        if berhasil:
+            with self.metrics.ukur_db():
+                terupdate = tandaiSinkron(berhasil)
+            if len(terupdate) != len(berhasil):
+                self.logger.warning(
+                    f"Hanya {len(terupdate)} dari {len(berhasil)} data yang berhasil ditandai 'S'"
+                )
+        if ditolak:
+            self.logger.warning(f"Circuit breaker terbuka, {len(ditolak)} data ditunda tanpa menambah percobaan")
+            with self.metrics.ukur_db():
+                lepasKlaim(ditolak, self.erp.breaker.sisa_jeda())
+        if gagal:
+            with self.metrics.ukur_db():
+                dicatat = catatGagal(gagal, self.max_percobaan, self.backoff_dasar, self.backoff_maks)
+            for idpengujian, sinkron, percobaan in dicatat:
+                if sinkron == "G":
+                    mati += 1
+                    self.logger.error(
+                        f"idpengujian {idpengujian} gagal {percobaan}x, dipindah ke status 'G' (dead-letter)"
+                    )
+        
+        self.metrics.tambah(
+            tersinkron=len(terupdate), gagal=len(gagal), ditolak=len(ditolak), dead_letter=mati
+        )
+        return len(berhasil), len(ditolak) + len(gagal)
+
+    def _siklus_batch(self):
+        """
+        Run one batch-mode cycle: claim many 'B' rows, push them to ERP in
+        parallel, then settle them with _proses_hasil()
+        
+        Returns:
+            True if a full batch went through (backlog remains, skip the sleep)
+        """
+        with self.metrics.ukur_db():
+            daftar = cekDataBatch(self.batch_size, self.lease)
+        if not daftar:
+            self.logger.debug("Tidak ada data yang harus disinkronkan")
+            return False
+        
+        self.logger.debug(f"Batch berisi {len(daftar)} data, mengirim ke ERP...")
+        hasil = self.erp.kirim_banyak(daftar)
+        berhasil, gagal = self._proses_hasil(daftar, hasil)
+        
+        self.logger.info(f"Batch selesai: {berhasil} berhasil, {gagal} gagal/ditunda")
+        self.logger.debug(f"Statistik ERP siklus ini: {self.erp.statistik(reset=True)['jendela']}")
+        self.logger.debug(f"Pool koneksi: {db_pool.pool_metrics()}")
+        return len(daftar) == self.batch_size and gagal == 0
+
+    def _tunggu_breaker(self):
+        """
+        Pause while the ERP circuit breaker is open, without claiming rows
+        
+        Returns:
+            False if interrupted by stop signal
+        """
+        sisa = self.erp.breaker.sisa_jeda()
+        self.metrics.breaker = self.erp.breaker.status
+        if sisa <= 0:
+            return True
+        self.logger.warning(f"Circuit breaker ERP terbuka, pengiriman dijeda {sisa:.0f}s")
+        return self.sleep_interruptible(max(sisa, 0.5))
+
     def run(self):
         """Main daemon execution loop"""
         siklusUmum = 1
         
-        self.logger.info("=" * 60)
-        self.logger.info("DAEMON STARTED")
-        self.logger.info(f"Thread: {self.name} is now running")
-        self.logger.info("=" * 60)
+        self.logger.info(f"DAEMON STARTED - Thread: {self.name} is now running")
+        
+        self.metrics.berjalan = True
+        if self.metrics_port:
+            try:
+                self._metrics_server = MetricsServer(self.metrics, self.metrics_port)
+                self._metrics_server.start()
+            except OSError as e:
+                self.logger.warning(f"Endpoint metrics tidak bisa dibuka di port {self.metrics_port}: {e}")
         
         while not self.is_stopped():
+            mulaiSiklus = time.monotonic()
+            if self.erp.breaker.sisa_jeda() > 0:
+                if not self._tunggu_breaker():
+                    break
+                continue
+            
+            if self.batch_size > 1:
+                try:
+                    lanjut = self._siklus_batch()
+                except Exception as e:
+                    self.logger.error(f"ERROR pada siklus batch {siklusUmum}: {str(e)}")
+                    self.logger.exception("Exception details:")
+                    lanjut = False
+                
+                self._akhir_siklus(mulaiSiklus)
+                siklusUmum += 1
+                if not lanjut and not self.wait_for_data():
+                    break
+                continue
+            
             try:
                 self.logger.debug(f"Memulai siklus thread ThreadSinkron yang ke-{siklusUmum}")
-                self.logger.info(f"╔{'═' * 58}╗")
-                self.logger.info(f"║ Siklus Thread ke-{siklusUmum:3d} - {self.name:40s}║")
-                self.logger.info(f"╚{'═' * 58}╝")
                 
                 counterCekData = 1
                 data = None
@@ -198,18 +499,19 @@ class threadSinkData(threading.Thread):
                 # Query Data Benda pada database lokal dengan kondisi field sinkron = 'B'
                 while not data and not self.is_stopped():
                     self.logger.debug(f"Melakukan pemeriksaan data ke-{counterCekData}")
-                    self.logger.info(f"Cek data ke-{counterCekData}")
                     
-                    data = cekData()
+                    with self.metrics.ukur_db():
+                        data = cekData(self.lease)
                     self.logger.debug(f"Hasil query cekData(): {data}")
                     
                     if not data:
-                        self.logger.warning("Tidak ada data yang harus disinkronkan")
-                        self.logger.info(f"Sleep {self.delayNya}s sebelum cek data berikutnya...")
+                        self.logger.debug("Tidak ada data yang harus disinkronkan")
                         counterCekData += 1
+                        self._akhir_siklus(mulaiSiklus)
+                        mulaiSiklus = time.monotonic()
                         
-                        # Interruptible sleep
-                        if not self.sleep_interruptible(self.delayNya):
+                        # Interruptible wait (NOTIFY or sleep)
+                        if not self.wait_for_data():
                             self.logger.info("Sleep interrupted by stop signal")
                             break
                     else:
@@ -219,67 +521,21 @@ class threadSinkData(threading.Thread):
                 if self.is_stopped():
                     break
 
-                # Proses pengiriman data
-                respon = 0
-                counterPost = 1
+                # Proses pengiriman data: satu percobaan per siklus, kegagalan
+                # dijadwalkan ulang dengan backoff agar data lain tetap jalan
+                self.logger.debug("Mengirim data ke ERP")
+                self.logger.debug(f"Memanggil ErpClient.kirim() dengan data: {data}")
                 
-                while respon != 200 and not self.is_stopped():
-                    self.logger.info(f"Percobaan ke-{counterPost} mengirim data ke ERP")
-                    self.logger.debug(f"Memanggil kirimDataPost() dengan data: {data}")
-                    
-                    responKode = kirimDataPost(data)
-                    respon = responKode.status_code if responKode else 0
-                    
-                    self.logger.debug(f"Respon server: {respon}")
-                    
-                    if respon != 200:
-                        self.logger.warning(f"Respon error: {respon}")
-                        self.logger.warning("Data tidak berhasil dikirim ke Database ERP")
-                        self.logger.info(f"Retry setelah {self.delayNya}s...")
-                        counterPost += 1
-                        
-                        # Interruptible sleep
-                        if not self.sleep_interruptible(self.delayNya):
-                            self.logger.info("Sleep interrupted by stop signal")
-                            break
-                    else:
-                        self.logger.info("Respon OK - Data berhasil disinkronkan dengan ERP")
-                        self.logger.info("Memulai proses update database lokal...")
-
-                if self.is_stopped():
-                    break
-
-                # Proses update database lokal
-                countCekDb = 1
-                cekdb = data[7] if data else None
-                self.logger.debug(f"Status sinkron awal: {cekdb}")
+                responKode = self.erp.kirim(data)
+                berhasil, _ = self._proses_hasil([data], [responKode])
                 
-                while cekdb == "B" and not self.is_stopped():
-                    self.logger.info(f"Update database lokal ke-{countCekDb}")
-                    self.logger.info(f"Set status='S' untuk Docket: {data[5]}, Urut: {data[6]}") # type: ignore
-                    
-                    sinkUpdateLokal(data[5], data[6]) # type: ignore
-                    self.logger.debug(f"Update status untuk bjdt_id: {data[4]}") # type: ignore
-                    
-                    # Verifikasi update berhasil
-                    self.logger.debug("Verifikasi update dengan cekSinkronLokal()")
-                    cekdb = cekSinkronLokal(data[4]) # pyright: ignore[reportOptionalSubscript]
-                    self.logger.debug(f"Status sinkron setelah update: {cekdb}")
-                    
-                    if cekdb == "S":
-                        self.logger.info(f"Update berhasil - Status sekarang: {cekdb}")
-                    else:
-                        self.logger.warning(f"Update mungkin gagal - Status: {cekdb}")
-                    
-                    countCekDb += 1
-                    
-                    # Small delay before next check
-                    if not self.sleep_interruptible(1):
-                        break
+                if berhasil:
+                    self.logger.info("Respon OK - Data berhasil disinkronkan dengan ERP")
+                else:
+                    self.logger.warning("Data tidak berhasil dikirim ke Database ERP")
                 
-                self.logger.info(f"{'─' * 60}")
-                self.logger.info(f"Siklus {siklusUmum} selesai")
-                self.logger.info(f"{'─' * 60}")
+                self.logger.debug(f"Siklus {siklusUmum} selesai")
+                self._akhir_siklus(mulaiSiklus)
                     
             except Exception as e:
                 self.logger.error(f"ERROR pada siklus {siklusUmum}: {str(e)}")
@@ -293,56 +549,68 @@ class threadSinkData(threading.Thread):
             if self.is_stopped():
                 break
 
-            # Interruptible sleep between cycles
-            self.logger.info(f"Sleep {self.delayNya}s sebelum siklus berikutnya...")
-            if not self.sleep_interruptible(self.delayNya):
-                break
+            # Interruptible sleep between cycles (not needed when NOTIFY wakes us)
+            if not self.listen:
+                self.logger.debug(f"Sleep {self.delayNya}s sebelum siklus berikutnya...")
+                if not self.sleep_interruptible(self.delayNya):
+                    break
             
             siklusUmum += 1
         
-        self.logger.info("=" * 60)
-        self.logger.info("DAEMON STOPPED GRACEFULLY")
-        self.logger.info(f"Total siklus yang dijalankan: {siklusUmum - 1}")
-        self.logger.info("=" * 60)
+        self.logger.info(f"Statistik ERP: {self.erp.statistik()['total']}")
+        if self._own_erp:
+            self.erp.close()
+        if self._listener is not None:
+            self._listener.close()
+            self._listener = None
+        
+        self.logger.info(f"Statistik pool koneksi: {db_pool.pool_metrics()}")
+        
+        self.metrics.berjalan = False
+        if self._metrics_server is not None:
+            self._metrics_server.stop()
+            self._metrics_server = None
+        
+        self.logger.info(f"DAEMON STOPPED GRACEFULLY - Total siklus yang dijalankan: {siklusUmum - 1}")
+
+
+# Klaim baris: 'B' (belum) atau 'P' (sedang diproses) yang masa klaimnya habis.
+# FOR UPDATE SKIP LOCKED membuat beberapa worker (thread/proses/host) tidak
+# pernah mengambil baris yang sama; kolom klaim_sampai adalah lease-nya, jadi
+# baris milik worker yang mati akan diambil lagi setelah lease habis.
+SQL_KLAIM = """ UPDATE pengujian
+                SET sinkron = 'P', klaim_sampai = now() + %s * interval '1 second'
+                WHERE idpengujian IN (
+                    SELECT idpengujian FROM pengujian
+                    WHERE sinkron IN ('B', 'P')
+                      AND (sinkron = 'B' OR klaim_sampai < now())
+                    ORDER BY idpengujian
+                    LIMIT %s
+                    FOR UPDATE SKIP LOCKED)
+                RETURNING tgluji, nilaikn, beratbenda, tiperetak, idbendauji, nodocket, nourutbenda, sinkron, bebanmpa, kuattekan, umur, idpengujian; """
 
 
-def cekData():
+def cekData(lease=120):
     """
-    Check for data that needs to be synchronized (sinkron = 'B')
+    Claim one row that needs to be synchronized (sinkron = 'B')
+    
+    The row is set to 'P' for `lease` seconds so parallel workers skip it.
+    
+    Args:
+        lease: Seconds the claim stays valid
     
     Returns:
-        Tuple of data if found, None otherwise
+        Tuple of data if found (idpengujian appended as last item), None otherwise
     """
     logger = get_daemon_logger()
     try:
         logger.debug("Memulai proses cekData()")
-        config = configparser.RawConfigParser()
-        fileConfig = resource_path("config.cnf")
-        config.read(fileConfig)
-        
-        datab = config.get("data", "database")
-        hosted = config.get("data", "host")
-        login = config.get("data", "user")
-        passed = config.get("data", "password")
-        
-        conn = f"dbname={datab} user={login} host={hosted} password={passed}"
-        logger.debug(f"Koneksi database: host={hosted}, database={datab}, user={login}")
         
-        konekdb = psycopg2.connect(conn)
-        konekdb.autocommit = True
-        kursor = konekdb.cursor()
-        
-        SQL = """ SELECT tgluji, nilaikn, beratbenda, tiperetak, idbendauji, nodocket, nourutbenda, sinkron, bebanmpa, kuattekan, umur 
-                  FROM pengujian
-                  WHERE sinkron = 'B' 
-                  LIMIT 1; """
-        
-        logger.debug("Executing SQL query for cekData()")
-        kursor.execute(SQL)
-        daftar = kursor.fetchone()
-        
-        kursor.close()
-        konekdb.close()
+        with db_pool.connection() as konekdb:
+            with konekdb.cursor() as kursor:
+                logger.debug("Executing SQL query for cekData()")
+                kursor.execute(SQL_KLAIM, (lease, 1))
+                daftar = kursor.fetchone()
         
         logger.debug(f"Data ditemukan: {daftar is not None}")
         return daftar
@@ -353,100 +621,178 @@ def cekData():
         return None
 
 
-def cekSinkronLokal(bjdt_id):
+def cekDataBatch(jumlah, lease=120):
     """
-    Check synchronization status for specific bjdt_id
+    Claim up to `jumlah` rows that need to be synchronized (sinkron = 'B')
     
     Args:
-        bjdt_id: Benda uji ID
-        
+        jumlah: Maximum number of rows to claim
+        lease: Seconds the claim stays valid
+    
     Returns:
-        Status sinkron ('B' or 'S') or None on error
+        List of tuples (same column order as cekData()), empty list on error
     """
     logger = get_daemon_logger()
     try:
-        logger.debug(f"Memulai proses cekSinkronLokal() untuk ID: {bjdt_id}")
+        logger.debug(f"Memulai proses cekDataBatch() untuk {jumlah} data")
         
-        config = configparser.RawConfigParser()
-        fileConfig = resource_path("config.cnf")
-        config.read(fileConfig)
+        with db_pool.connection() as konekdb:
+            with konekdb.cursor() as kursor:
+                kursor.execute(SQL_KLAIM, (lease, jumlah))
+                daftar = sorted(kursor.fetchall(), key=lambda baris: baris[11])
         
-        datab = config.get("data", "database")
-        hosted = config.get("data", "host")
-        login = config.get("data", "user")
-        passed = config.get("data", "password")
+        logger.debug(f"Jumlah data diklaim: {len(daftar)}")
+        return daftar
         
-        conn = f"dbname={datab} user={login} host={hosted} password={passed}"
-        konekdb = psycopg2.connect(conn)
-        konekdb.autocommit = True
-        kursor = konekdb.cursor()
+    except Exception as e:
+        logger.error(f"Error pada cekDataBatch(): {str(e)}")
+        logger.exception("Exception details in cekDataBatch():")
+        return []
+
+
+def catatGagal(daftarId, maksPercobaan, dasar, batas):
+    """
+    Record a failed push and schedule the retry with exponential backoff
+    
+    The delay is min(dasar * 2^percobaan, batas) seconds with "equal jitter"
+    (random between half and the full delay) so retries of many rows do not
+    hit the ERP at the same moment. After `maksPercobaan` failures the row is
+    parked as 'G' (dead-letter) and no longer claimed.
+    
+    Args:
+        daftarId: List of idpengujian
+        maksPercobaan: Attempts before the row is parked as 'G'
+        dasar: Delay in seconds after the first failure
+        batas: Upper bound of the delay in seconds
+    
+    Returns:
+        List of (idpengujian, sinkron, percobaan) after the update, empty list on error
+    """
+    logger = get_daemon_logger()
+    if not daftarId:
+        return []
+    try:
+        SQL = """ UPDATE pengujian
+                  SET percobaan = percobaan + 1,
+                      sinkron = CASE WHEN percobaan + 1 >= %(maks)s THEN 'G' ELSE 'P' END,
+                      klaim_sampai = CASE WHEN percobaan + 1 >= %(maks)s THEN NULL
+                          ELSE now() + LEAST(%(dasar)s * power(2, percobaan), %(batas)s)
+                                       * (0.5 + random() / 2) * interval '1 second' END
+                  WHERE idpengujian = ANY(%(id)s) AND sinkron = 'P'
+                  RETURNING idpengujian, sinkron, percobaan; """
+        parameter = {"maks": maksPercobaan, "dasar": dasar, "batas": batas, "id": list(daftarId)}
+        
+        with db_pool.connection() as konekdb:
+            with konekdb.cursor() as kursor:
+                kursor.execute(SQL, parameter)
+                hasil = kursor.fetchall()
+        
+        logger.debug(f"Kegagalan dicatat untuk {len(hasil)} data: {hasil}")
+        return hasil
+        
+    except Exception as e:
+        logger.error(f"Error pada catatGagal(): {str(e)}")
+        logger.exception("Exception details in catatGagal():")
+        return []
+
+
+def lepasKlaim(daftarId, tunda=0):
+    """
+    Give claimed rows back for a later retry, without counting an attempt
+    
+    Rows stay 'P' with their lease shortened to `tunda` seconds, so any worker
+    can claim them again once it expires. Setting them back to 'B' instead
+    would fire the NOTIFY trigger and wake the daemons into an immediate retry.
+    
+    Args:
+        daftarId: List of idpengujian
+        tunda: Seconds before the rows may be claimed again
+    
+    Returns:
+        Number of rows released, 0 on error
+    """
+    logger = get_daemon_logger()
+    if not daftarId:
+        return 0
+    try:
+        SQL = """ UPDATE pengujian SET klaim_sampai = now() + %s * interval '1 second'
+                  WHERE idpengujian = ANY(%s) AND sinkron = 'P'; """
         
-        SQL = """ SELECT sinkron FROM pengujian WHERE idbendauji = %s ; """
-        data = (bjdt_id,)
+        with db_pool.connection() as konekdb:
+            with konekdb.cursor() as kursor:
+                kursor.execute(SQL, (tunda, list(daftarId)))
+                rows_affected = kursor.rowcount
         
-        logger.debug(f"Executing cekSinkronLokal query for ID: {bjdt_id}")
-        kursor.execute(SQL, data)
-        daftar = kursor.fetchone()
+        logger.debug(f"Klaim dilepas ({rows_affected} rows), coba lagi setelah {tunda}s")
+        return rows_affected
         
-        kursor.close()
-        konekdb.close()
+    except Exception as e:
+        logger.error(f"Error pada lepasKlaim(): {str(e)}")
+        logger.exception("Exception details in lepasKlaim():")
+        return 0
+
+
+def hitungBacklog():
+    """
+    Count rows still waiting to be synchronized ('B' and 'P')
+    
+    Returns:
+        Number of rows, None on error
+    """
+    logger = get_daemon_logger()
+    try:
+        SQL = """ SELECT count(*) FROM pengujian WHERE sinkron IN ('B', 'P'); """
         
-        result = daftar[0] if daftar else None
-        logger.debug(f"Status sinkron untuk ID {bjdt_id}: {result}")
-        return result
+        with db_pool.connection() as konekdb:
+            with konekdb.cursor() as kursor:
+                kursor.execute(SQL)
+                return kursor.fetchone()[0]
         
     except Exception as e:
-        logger.error(f"Error pada cekSinkronLokal(): {str(e)}")
-        logger.exception("Exception details in cekSinkronLokal():")
+        logger.error(f"Error pada hitungBacklog(): {str(e)}")
         return None
 
 
-def sinkUpdateLokal(nomer, urut):
+def tandaiSinkron(daftarId):
     """
-    Update local database to mark data as synchronized
+    Mark claimed rows as synchronized by primary key
+    
+    One UPDATE for any number of rows; the RETURNING list confirms which rows
+    actually changed, so no separate verification query is needed.
     
     Args:
-        nomer: Nomor docket
-        urut: Nomor urut benda
+        daftarId: List of idpengujian
+    
+    Returns:
+        List of idpengujian that are now 'S', empty list on error
     """
     logger = get_daemon_logger()
+    if not daftarId:
+        return []
     try:
-        logger.debug(f"Memulai proses sinkUpdateLokal() untuk nomer: {nomer}, urut: {urut}")
-        
-        config = configparser.RawConfigParser()
-        fileConfig = resource_path("config.cnf")
-        config.read(fileConfig)
-        
-        datab = config.get("data", "database")
-        hosted = config.get("data", "host")
-        login = config.get("data", "user")
-        passed = config.get("data", "password")
+        logger.debug(f"Memulai proses tandaiSinkron() untuk {len(daftarId)} data")
         
-        conn = f"dbname={datab} user={login} host={hosted} password={passed}"
-        konekdb = psycopg2.connect(conn)
-        konekdb.autocommit = True
-        kursor = konekdb.cursor()
+        SQL = """ UPDATE pengujian SET sinkron = 'S', klaim_sampai = NULL
+                  WHERE idpengujian = ANY(%s)
+                  RETURNING idpengujian; """
         
-        SQL = """ UPDATE pengujian SET sinkron = 'S' WHERE noDocket = %s AND noUrutBenda = %s; """
-        data = (nomer, urut)
+        with db_pool.connection() as konekdb:
+            with konekdb.cursor() as kursor:
+                kursor.execute(SQL, (list(daftarId),))
+                terupdate = [baris[0] for baris in kursor.fetchall()]
         
-        logger.debug(f"Executing update query for noDocket: {nomer}, noUrutBenda: {urut}")
-        kursor.execute(SQL, data)
-        
-        rows_affected = kursor.rowcount
-        kursor.close()
-        konekdb.close()
-        
-        logger.info(f"Update berhasil ({rows_affected} rows) - noDocket: {nomer}, noUrutBenda: {urut}")
+        logger.info(f"Update berhasil ({len(terupdate)} rows) - idpengujian: {terupdate}")
+        return terupdate
 
     except Exception as e:
-        logger.error(f"Error pada sinkUpdateLokal(): {str(e)}")
-        logger.exception("Exception details in sinkUpdateLokal():")
+        logger.error(f"Error pada tandaiSinkron(): {str(e)}")
+        logger.exception("Exception details in tandaiSinkron():")
+        return []
 
 
 def kirimDataPost(bendaUji):
     """
-    Send data to ERP webservice
+    Send data to ERP webservice using the shared keep-alive ERP client
     
     Args:
         bendaUji: Tuple containing test data
@@ -455,53 +801,14 @@ def kirimDataPost(bendaUji):
         Response object or None on error
     """
     logger = get_daemon_logger()
-    try:
-        logger.debug("Memulai proses kirimDataPost()")
-        
-        fileConfig = resource_path("config.cnf")
-        config = configparser.RawConfigParser()
-        config.read(fileConfig)
-        
-        urlKirim = config.get("webser", "webser_hasilUji")
-        
-        ctx = ssl.create_default_context()
-        ctx.check_hostname = False
-        ctx.verify_mode = ssl.CERT_NONE
-        
-        logger.debug(f"URL target: {urlKirim}")
-        
-        datanya = {"params": {}}
-        datanya["params"]["bjdt_tgl_test"] = str(bendaUji[0])
-        datanya["params"]["bjdt_beban"] = float(bendaUji[1])
-        datanya["params"]["bjdt_berat"] = float(bendaUji[2])
-        datanya["params"]["bjdt_tipe_retak"] = bendaUji[3]
-        datanya["params"]["bjdt_id"] = int(bendaUji[4])
-        datanya["params"]["bjdt_beban_mpa"] = float(bendaUji[8])
-        datanya["params"]["bjdt_beban_kg"] = str(bendaUji[9])
-        datanya["params"]["bjdt_umur"] = int(bendaUji[10])
-
-        logger.debug(f"Data yang akan dikirim: {datanya}")
-        logger.info("Mengirim data ke webservice ERP...")
-        
-        response = requests.post(urlKirim, json=datanya, timeout=30)
-        logger.info(f"Response status code: {response.status_code}")
-        logger.debug(f"Response content: {response.text[:200]}")  # First 200 chars
-        
-        return response
-        
-    except requests.Timeout:
-        logger.error("Request timeout - Server tidak merespon dalam waktu 30 detik")
-        return None
-    except requests.HTTPError as e:
-        logger.error(f"HTTP Error: {e}")
-        return None
-    except requests.ConnectionError as e:
-        logger.error(f"Connection Error - Gagal menyambungkan ke server: {e}")
-        return None
-    except Exception as e:
-        logger.error(f"Error pada kirimDataPost(): {str(e)}")
-        logger.exception("Exception details in kirimDataPost():")
+    logger.info("Mengirim data ke webservice ERP...")
+    response = get_erp_client().kirim(bendaUji)
+    if response is DITOLAK:
+        logger.warning("Circuit breaker ERP terbuka, data tidak dikirim")
         return None
+    if response is not None:
+        logger.info(f"Response status code: {response.status_code}")
+    return response
 
 
 # Main execution code for standalone testing
@@ -513,15 +820,12 @@ if __name__ == "__main__":
     # Setup logging for standalone execution
     setup_daemon_logging(log_file="daemonSync.log", log_level=logging.DEBUG)
     
-    fileConfig = resource_path("config.cnf")
-    config = configparser.RawConfigParser()
-    config.read(fileConfig)
-    tunda = config.get("daemon", "delay") if config.has_option("daemon", "delay") else '2'
+    opsiDaemon = settings.get_settings().daemon
     
     logger = get_daemon_logger()
     logger.info("Starting daemon in standalone mode")
     
-    daemon = threadSinkData(1, "ThreadSinkron", float(tunda))
+    daemon = threadSinkData(1, "ThreadSinkron", opsiDaemon.delay, **opsiDaemon.sebagai_kwargs())
     daemon.start()
     
     try:
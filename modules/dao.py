@@ -0,0 +1,115 @@
+"""
+Prepared statement untuk query pengujian yang paling sering dijalankan
+
+Setiap pernyataan di-PREPARE sekali per koneksi pool (saat pertama dipakai)
+dan sesudahnya hanya di-EXECUTE, sehingga PostgreSQL tidak mem-parse dan
+merencanakan ulang query yang sama di setiap pemanggilan.
+"""
+import logging
+
+import psycopg2.errors
+
+logger = logging.getLogger(__name__)
+
+# Kolom grid (urutan = kolom GridBendaUji.lstBendaUji)
+KOLOM_GRID = "idpengujian, tgluji, nodocket, nourutbenda, bujnama, umur, nilaikn, bebanmpa, kuattekan, beratbenda, tiperetak, sinkron"
+
+# Kolom data pengujian (tanpa kolom internal daemon klaim_sampai/percobaan)
+KOLOM_PENGUJIAN = (
+    "idpengujian, tgluji, idalat, kodebendauji, nodocket, nourutbenda, nilaikn, beratbenda, tiperetak, "
+    "sinkron, idbendauji, tglrencanauji, bujnama, kuattekan, bebanmpa, umur, tglbendauji"
+)
+
+# nama -> (tipe parameter, query dengan $1..$n)
+PERNYATAAN = {
+    "nourut_terakhir": (
+        "varchar",
+        """ SELECT nourutbenda FROM pengujian
+            WHERE nodocket = $1 ORDER BY nourutbenda DESC LIMIT 1 """,
+    ),
+    "simpan_pengujian": (
+        "date, varchar, varchar, varchar, varchar, numeric, numeric, char, char, varchar, date, varchar, "
+        "numeric, numeric, integer, date",
+        """ INSERT INTO pengujian(tgluji, idalat, kodebendauji, nodocket, nourutbenda, nilaikn, beratbenda,
+                tiperetak, sinkron, idbendauji, tglrencanauji, bujnama, kuattekan, bebanmpa, umur, tglbendauji)
+            VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12, $13, $14, $15, $16) """,
+    ),
+    "benda_uji": (
+        "varchar, varchar",
+        " SELECT " + KOLOM_PENGUJIAN + """ FROM pengujian
+            WHERE nodocket = $1 AND nourutbenda = $2 ORDER BY tgluji DESC """,
+    ),
+    "grid_awal": (
+        "date, date, text[], integer",
+        " SELECT " + KOLOM_GRID + """ FROM pengujian
+            WHERE (tgluji BETWEEN $1 AND $2) AND sinkron = ANY($3)
+            ORDER BY tgluji, idpengujian LIMIT $4 """,
+    ),
+    "grid_lanjut": (
+        "date, date, text[], date, integer, integer",
+        " SELECT " + KOLOM_GRID + """ FROM pengujian
+            WHERE (tgluji BETWEEN $1 AND $2) AND sinkron = ANY($3)
+              AND (tgluji, idpengujian) > ($4, $5)
+            ORDER BY tgluji, idpengujian LIMIT $6 """,
+    ),
+}
+
+
+def _siap(konekdb):
+    """Set of statement names already prepared on this connection"""
+    siap = getattr(konekdb, "pernyataan_siap", None)
+    if siap is None:
+        siap = set()
+        konekdb.pernyataan_siap = siap
+    return siap
+
+
+def siapkan(kursor, nama):
+    """
+    PREPARE statement `nama` on the cursor's connection if it is not yet
+
+    Args:
+        kursor: Cursor of a pooled connection
+        nama: Key of PERNYATAAN
+    """
+    siap = _siap(kursor.connection)
+    if nama in siap:
+        return
+    tipe, sql = PERNYATAAN[nama]
+    kursor.execute(f"PREPARE {nama} ({tipe}) AS {sql}")
+    siap.add(nama)
+    logger.debug(f"Prepared statement {nama} dibuat")
+
+
+def jalankan(kursor, nama, parameter):
+    """
+    EXECUTE a prepared statement, preparing it first when needed
+
+    If the server no longer knows the statement (e.g. after DISCARD ALL on
+    the connection) it is prepared again and the call retried once.
+
+    Args:
+        kursor: Cursor of a pooled connection
+        nama: Key of PERNYATAAN
+        parameter: Tuple of parameter values in $1..$n order
+    """
+    siapkan(kursor, nama)
+    perintah = f"EXECUTE {nama} ({', '.join(['%s'] * len(parameter))})"
+    try:
+        kursor.execute(perintah, parameter)
+    except (psycopg2.errors.InvalidSqlStatementName, psycopg2.errors.FeatureNotSupported):
+        # FeatureNotSupported: "cached plan must not change result type" setelah ALTER TABLE
+        konekdb = kursor.connection
+        if not konekdb.autocommit:
+            raise
+        _siap(konekdb).discard(nama)
+        if _ada(kursor, nama):
+            kursor.execute(f"DEALLOCATE {nama}")
+        siapkan(kursor, nama)
+        kursor.execute(perintah, parameter)
+
+
+def _ada(kursor, nama):
+    """True if `nama` is still prepared on the server side of this connection"""
+    kursor.execute("SELECT 1 FROM pg_prepared_statements WHERE name = %s", (nama,))
+    return kursor.fetchone() is not None
@@ -1,30 +1,40 @@
 import random
 from datetime import datetime, timedelta
 
-def generate_random_slump_test(slump_rencana):
+# rng: numpy Generator (misal KonteksAcak.baru(no_docket) dari modules/acak.py)
+# supaya hasil bisa diulang; None = modul random global seperti sebelumnya
+
+def _uniform(rng, a, b):
+    return random.uniform(a, b) if rng is None else float(rng.uniform(a, b))
+
+def _randint(rng, a, b):
+    """Random integer in [a, b], both ends included like random.randint"""
+    return random.randint(a, b) if rng is None else int(rng.integers(a, b + 1))
+
+def generate_random_slump_test(slump_rencana, rng=None):
     """Generate random slump test value (±2 from slump_rencana)"""
     try:
         base_value = float(slump_rencana)
         
         # Special case for slump 55
         if base_value == 55:
-            result = 60 + random.uniform(-5, 5)
+            result = 60 + _uniform(rng, -5, 5)
         else:
-            result = base_value + random.uniform(-1, 2)
+            result = base_value + _uniform(rng, -1, 2)
         
         return str(int(round(result)))  # Convert to integer to remove decimal
     except:
-        result = random.uniform(11, 14)
+        result = _uniform(rng, 11, 14)
         return str(int(round(result)))
 
-def generate_random_yield():
+def generate_random_yield(rng=None):
     """Generate random yield value between 0.97-0.99"""
-    return str(round(random.uniform(0.97, 0.99), 2))
+    return str(round(_uniform(rng, 0.97, 0.99), 2))
 
-def calculate_jam_sample(base_time):
+def calculate_jam_sample(base_time, rng=None):
     """Calculate jam sample by adding 1:10 to 1:50 hours to base time"""
     try:
-        additional_minutes = random.randint(65, 90)
+        additional_minutes = _randint(rng, 65, 90)
         str_val = str(base_time).strip()
         
         # Check if base_time contains date (format: 'DD/MM/YYYY HH:MM:SS' or 'YYYY-MM-DD HH:MM:SS')
@@ -68,6 +78,6 @@ def calculate_jam_sample(base_time):
             return f"{final_hour:02d}:{final_minute:02d}"
     except:
         # Fallback to random time
-        hour = random.randint(10, 15)
-        minute = random.randint(0, 59)
+        hour = _randint(rng, 10, 15)
+        minute = _randint(rng, 0, 59)
         return f"{hour:02d}:{minute:02d}"
@@ -1,54 +1,47 @@
-import configparser
 import logging
+from contextlib import contextmanager
 
 import psycopg2
 import psycopg2.extras
+import psycopg2.errors
 import wx
 
+from modules import dao, db_pool
+
 logging.basicConfig(
     level=logging.DEBUG,
     format="%(asctime)s - [%(levelname)s] [%(threadName)s] (%(module)s:%(lineno)d) %(message)s",
     filename="aplikasiAlatUji.log",
 )
 
-import os
-import sys
-
-def resource_path(relative_path):
-    """Get absolute path to resource, works for dev and for PyInstaller"""
-    try:
-        base_path = sys._MEIPASS # type: ignore
-    except Exception:
-        base_path = os.path.abspath(".")
-    return os.path.join(base_path, relative_path)
-
-fileConfig = resource_path("config.cnf")
-config = configparser.RawConfigParser()
-config.read(fileConfig)
-datab = config.get("data", "database")
-hosted = config.get("data", "host")
-login = config.get("data", "user")
-passed = config.get("data", "password")
-
 
 # Struktur tabel :
 # idpengujian serial
 # tgluji 	date 		0	self.txtTglPengujian
-# idalat 	char(100) 	1	self.txtIdAlat
-# kodebendaUjichar(200) 	2	self.txtKodeBendaUji
-# nodocket 	char(100) 	3	self.txtNomorDocket
-# nourutbenda 	char (2) 	4	self.txtNoUrut
+# idalat 	varchar(100) 	1	self.txtIdAlat
+# kodebendaUjivarchar(200) 	2	self.txtKodeBendaUji
+# nodocket 	varchar(100) 	3	self.txtNomorDocket
+# nourutbenda 	varchar(2) 	4	self.txtNoUrut
 # nilaikn 	numeric(10,2) 	5	self.txtHasilUji
 # beratbenda 	numeric(10,2) 	6	self.txtBerat
 # tiperetak 	char(1) 		7	self.chcTipeRetak
 # sinkron 	char(1)
-# idbendauji 	char(100) 	8	self.txtidBendaUji
+# idbendauji 	varchar(100) 	8	self.txtidBendaUji
 # tglrencanauji date 		9	self.txtRencanaTglUji
-# bujnama 	char(20)	10	self.txtJenisBUJ
+# bujnama 	varchar(20)	10	self.txtJenisBUJ
 # kuattekan 	numeric(10,2)	11	self.txtBeban
 # bebanmpa 	numeric(10,2)	12	self.txtMpa
 # umur 	integer		13	self.txtKg
 # CONSTRAINT "idPengujian_PK" PRIMARY KEY ("idPengujian")
+#
+# Kolom teks bertipe VARCHAR (dulu CHAR yang mengabaikan spasi di belakang
+# saat dibandingkan), jadi nilai teks dari form di-strip sebelum disimpan
+# atau dicari.
+
+
+def _teks(nilai):
+    """Strip a text value from the form; non-strings are passed through"""
+    return nilai.strip() if isinstance(nilai, str) else nilai
 
 
 # Fungsi cekBendaUji(bendaUji) berfungsi untuk
@@ -57,16 +50,12 @@ def cekBendaUji(bendaUji):
         logging.info("Mulai mengeksekusi method cekBendaUji() pada file dbctrl.py")
 
         # ceknomerurut = []
-        conn = f"dbname={datab} user={login} host={hosted} password={passed}"
-        konekdb = psycopg2.connect(conn)
-        konekdb.autocommit = True
-        kursor = konekdb.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
-        data = (bendaUji,)
-        SQL = """ SELECT nourutbenda FROM pengujian
-			WHERE noDocket = %s ORDER BY nourutbenda DESC LIMIT 1 ; """
-        kursor.execute(SQL, data)
-
-        nomer = kursor.fetchall()
+        data = (_teks(bendaUji),)
+        with db_pool.connection() as konekdb:
+            with konekdb.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as kursor:
+                dao.jalankan(kursor, "nourut_terakhir", data)
+                nomer = kursor.fetchall()
+
         # nomerBaru = int(nomer) + 1
         logging.debug("Data Benda uji hasil method cekBendaUji() : %s", str(nomer))
         print(" Nomer : ", nomer)
@@ -92,23 +81,19 @@ def simpan(bendaUji):
     try:
         print("bendaUji = ", bendaUji)
         logging.info("Mulai mengeksekusi method simpan() pada file dbctrl.py")
-        conn = f"dbname={datab} user={login} host={hosted} password={passed}"
-        konekdb = psycopg2.connect(conn)
-        konekdb.autocommit = True
-        kursor = konekdb.cursor()
         data = (
             bendaUji[0],
-            bendaUji[1],
-            bendaUji[2],
-            bendaUji[3],
-            bendaUji[4],
+            _teks(bendaUji[1]),
+            _teks(bendaUji[2]),
+            _teks(bendaUji[3]),
+            _teks(bendaUji[4]),
             bendaUji[5],
             bendaUji[6],
             bendaUji[7],
             "B",
-            bendaUji[8],
+            _teks(bendaUji[8]),
             bendaUji[9],
-            bendaUji[10],
+            _teks(bendaUji[10]),
             bendaUji[11],
             bendaUji[12],
             bendaUji[13],
@@ -116,9 +101,9 @@ def simpan(bendaUji):
         )
 
         print("data = ", data)
-        SQL = """ INSERT INTO pengujian(tgluji, idalat, kodebendaUji, nodocket, nourutbenda, nilaikn, beratbenda, tiperetak, sinkron, idbendauji, tglrencanauji, bujnama, kuattekan, bebanmpa, umur, tglbendauji)
-		VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s); """
-        kursor.execute(SQL, data)
+        with db_pool.connection() as konekdb:
+            with konekdb.cursor() as kursor:
+                dao.jalankan(kursor, "simpan_pengujian", data)
         logging.debug("Data berhasil disimpan")
         pesanError = "Data berhasil disimpan"
         dlg = wx.MessageDialog(
@@ -126,10 +111,21 @@ def simpan(bendaUji):
         )
         dlg.ShowModal()
         dlg.Destroy()
-        kursor.close()
-        konekdb.close()
 
             # sinkBendaUji(bendaUji)
+    except psycopg2.errors.UniqueViolation:
+        logging.warning(
+            "simpan(): benda uji docket %s urut %s sudah ada di database", bendaUji[3], bendaUji[4]
+        )
+        pesanError = (
+            "Benda uji docket " + str(bendaUji[3]) + " nomor urut " + str(bendaUji[4])
+            + " sudah tersimpan, data tidak disimpan ulang"
+        )
+        dlg = wx.MessageDialog(
+            None, pesanError, "Penyimpanan pada database", wx.OK | wx.ICON_WARNING
+        )
+        dlg.ShowModal()
+        dlg.Destroy()
     except Exception as e:
         logging.error(
             "Error pada saat menjalankan method simpan() pda file dbctrl.py : %s",
@@ -147,20 +143,14 @@ def simpan(bendaUji):
 def queryBendaUji(bendaUji):
     try:
         logging.info("Mulai mengeksekusi method queryBendaUji() pada file dbctrl.py")
-        conn = f"dbname={datab} user={login} host={hosted} password={passed}"
-        konekdb = psycopg2.connect(conn)
-        konekdb.autocommit = True
-        kursor = konekdb.cursor()
         data = (
-            bendaUji[0],
-            bendaUji[1],
+            _teks(bendaUji[0]),
+            _teks(bendaUji[1]),
         )
-        SQL = """ SELECT * FROM pengujian
-		WHERE noDocket = %s AND noUrutBenda = %s) ORDER BY tgluji DESC; """
-        kursor.execute(SQL, data)
-        hasilSelect = kursor.fetchone()
-        kursor.close()
-        konekdb.close()
+        with db_pool.connection() as konekdb:
+            with konekdb.cursor() as kursor:
+                dao.jalankan(kursor, "benda_uji", data)
+                hasilSelect = kursor.fetchone()
         logging.debug(
             "Data Benda uji hasil method queryBendaUji() : %s", str(hasilSelect)
         )
@@ -178,27 +168,240 @@ def queryBendaUji(bendaUji):
         dlg.Destroy()
 
 
+# Kolom grid (urutan = kolom GridBendaUji.lstBendaUji)
+KOLOM_GRID = dao.KOLOM_GRID
+
+# Jumlah baris per halaman grid
+UKURAN_HALAMAN = 500
+
+# Pilihan status sinkron grid -> nilai kolom sinkron yang ditampilkan
+# ("Belum" = semua yang belum sampai ke ERP, termasuk yang sedang dikirim dan gagal)
+STATUS_SINKRON = {
+    "Semua": ["B", "P", "S", "G"],
+    "Belum": ["B", "P", "G"],
+    "Sinkron": ["S"],
+    "Gagal": ["G"],
+}
+
+# Filter grid; urutan (tgluji, idpengujian) memakai idx_pengujian_tgluji_id
+SQL_GRID_FILTER = """ FROM pengujian
+		WHERE (tgluji BETWEEN %s AND %s) AND sinkron = ANY(%s) """
+
+
+@contextmanager
+def _koneksiAtauPool(konekdb):
+    """Yield `konekdb` as is, or check one out of the shared pool when None"""
+    if konekdb is not None:
+        yield konekdb
+    else:
+        with db_pool.connection() as konekdb:
+            yield konekdb
+
+
+def kunciHalaman(baris):
+    """
+    Keyset of the last row of a grid page, to fetch the page after it
+
+    Args:
+        baris: Row as returned by queryGridHalaman (idpengujian first, tgluji second)
+
+    Returns:
+        Tuple (tgluji, idpengujian)
+    """
+    return (baris[1], baris[0])
+
+
+# Agregat ringkasan; sumbernya ringkasan_harian (database_schema.sql bagian 13)
+# atau pengujian langsung bila tabel ringkasan belum dibuat
+SQL_AGREGAT = """ COALESCE(sum(jumlah), 0),
+        COALESCE(sum(jumlah) FILTER (WHERE sinkron = 'S'), 0),
+        COALESCE(sum(jumlah) FILTER (WHERE sinkron IN ('B', 'P')), 0),
+        COALESCE(sum(jumlah) FILTER (WHERE sinkron = 'G'), 0),
+        round(sum(total_mpa) / NULLIF(sum(jumlah_mpa), 0), 2) """
+
+SQL_SUMBER_RINGKASAN = " FROM ringkasan_harian "
+
+SQL_SUMBER_PENGUJIAN = """ FROM (SELECT tgluji, rtrim(bujnama) AS bujnama, umur, sinkron, 1 AS jumlah,
+        (bebanmpa IS NOT NULL)::int AS jumlah_mpa, COALESCE(bebanmpa, 0) AS total_mpa
+        FROM pengujian) p """
+
+KUNCI_RINGKASAN = ("jumlah", "sinkron", "belum", "gagal", "rata2_mpa")
+
+# False setelah ringkasan_harian terbukti tidak ada, agar tidak dicoba terus
+_adaRingkasan = True
+
+
+def _agregat(kursor, sesudahFrom, data, kelompok=""):
+    """Run SQL_AGREGAT (after the `kelompok` columns) on the summary table, or on pengujian when it is missing"""
+    global _adaRingkasan
+    if _adaRingkasan:
+        try:
+            kursor.execute("SELECT " + kelompok + SQL_AGREGAT + SQL_SUMBER_RINGKASAN + sesudahFrom, data)
+            return kursor.fetchall()
+        except psycopg2.errors.UndefinedTable:
+            logging.warning("Tabel ringkasan_harian belum ada, total dihitung dari pengujian")
+            _adaRingkasan = False
+            if not kursor.connection.autocommit:
+                kursor.connection.rollback()
+    kursor.execute("SELECT " + kelompok + SQL_AGREGAT + SQL_SUMBER_PENGUJIAN + sesudahFrom, data)
+    return kursor.fetchall()
+
+
+def ringkasanGrid(parList, konekdb=None):
+    """
+    Totals of the grid filter from the daily summary, in O(days) instead of O(rows)
+
+    Args:
+        parList: [tglAwal, tglAkhir, daftar status sinkron (STATUS_SINKRON)]
+        konekdb: Connection to use (default: one from the shared pool)
+
+    Returns:
+        Dictionary with jumlah, sinkron, belum (B and P), gagal (G) and
+        rata2_mpa (None when no bebanmpa); None on error
+    """
+    try:
+        with _koneksiAtauPool(konekdb) as konekdb:
+            with konekdb.cursor() as kursor:
+                baris = _agregat(
+                    kursor, " WHERE (tgluji BETWEEN %s AND %s) AND sinkron = ANY(%s) ", tuple(parList[:3])
+                )
+        return dict(zip(KUNCI_RINGKASAN, baris[0]))
+    except Exception as e:
+        logging.error("Error pada saat menjalankan method ringkasanGrid() pda file dbctrl.py : %s", str(e))
+        return None
+
+
+def ringkasanHarian(tglAwal, tglAkhir, konekdb=None):
+    """
+    Per-day, per-mutu totals for a date range (dashboard)
+
+    Args:
+        tglAwal: First test date
+        tglAkhir: Last test date
+        konekdb: Connection to use (default: one from the shared pool)
+
+    Returns:
+        List of dictionaries with tgluji, bujnama, umur and the ringkasanGrid
+        totals, ordered by date; None on error
+    """
+    try:
+        with _koneksiAtauPool(konekdb) as konekdb:
+            with konekdb.cursor() as kursor:
+                baris = _agregat(
+                    kursor,
+                    """ WHERE tgluji BETWEEN %s AND %s
+                        GROUP BY tgluji, bujnama, umur
+                        HAVING sum(jumlah) <> 0
+                        ORDER BY tgluji, bujnama, umur """,
+                    (tglAwal, tglAkhir),
+                    kelompok="tgluji, bujnama, umur,",
+                )
+        return [dict(zip(("tgluji", "bujnama", "umur") + KUNCI_RINGKASAN, b)) for b in baris]
+    except Exception as e:
+        logging.error("Error pada saat menjalankan method ringkasanHarian() pda file dbctrl.py : %s", str(e))
+        return None
+
+
+def hitungGrid(parList, konekdb=None):
+    """
+    Number of rows matching the grid filter, without fetching them
+
+    Args:
+        parList: [tglAwal, tglAkhir, daftar status sinkron (STATUS_SINKRON)]
+        konekdb: Connection to use (default: one from the shared pool)
+
+    Returns:
+        Integer count, None on error
+    """
+    ringkasan = ringkasanGrid(parList, konekdb)
+    return None if ringkasan is None else ringkasan["jumlah"]
+
+
+def queryGridHalaman(parList, kunci=None, ukuran=UKURAN_HALAMAN, konekdb=None):
+    """
+    One page of the grid, keyset-paginated on (tgluji, idpengujian)
+
+    Each page is an index range scan that starts right after `kunci`, so
+    page N costs the same as page 1 (no OFFSET).
+
+    Args:
+        parList: [tglAwal, tglAkhir, daftar status sinkron (STATUS_SINKRON)]
+        kunci: kunciHalaman() of the previous page's last row, None for the first page
+        ukuran: Maximum rows in the page
+        konekdb: Connection to use (default: one from the shared pool); lets
+            the caller cancel the query with konekdb.cancel()
+
+    Returns:
+        List of rows (KOLOM_GRID); fewer than `ukuran` rows means last page
+
+    Raises:
+        psycopg2.Error: database error
+    """
+    data = tuple(parList[:3])
+    if kunci is None:
+        nama = "grid_awal"
+    else:
+        nama = "grid_lanjut"
+        data += tuple(kunci)
+    with _koneksiAtauPool(konekdb) as konekdb:
+        with konekdb.cursor() as kursor:
+            dao.jalankan(kursor, nama, data + (ukuran,))
+            hasil = kursor.fetchall()
+    logging.debug("queryGridHalaman(): %d baris setelah %s", len(hasil), kunci)
+    return hasil
+
+
+def iterGrid(parList, ukuran=UKURAN_HALAMAN, kunci=None):
+    """
+    Stream the grid result page by page through a named server-side cursor
+
+    The whole range is one query, but rows leave the server only `ukuran`
+    at a time, so neither side materializes a multi-month result. The pooled
+    connection is held until the generator is exhausted or closed.
+
+    Args:
+        parList: [tglAwal, tglAkhir, daftar status sinkron (STATUS_SINKRON)]
+        ukuran: Rows per page
+        kunci: Optional kunciHalaman() to resume after
+
+    Yields:
+        Lists of rows (KOLOM_GRID), in (tgluji, idpengujian) order
+
+    Raises:
+        psycopg2.Error: database error
+    """
+    data = tuple(parList[:3])
+    SQL = "SELECT " + KOLOM_GRID + SQL_GRID_FILTER
+    if kunci is not None:
+        SQL += " AND (tgluji, idpengujian) > (%s, %s) "
+        data += tuple(kunci)
+    SQL += " ORDER BY tgluji, idpengujian; "
+    with db_pool.connection() as konekdb:
+        # Cursor bernama (DECLARE) butuh transaksi; koneksi pool autocommit
+        konekdb.autocommit = False
+        try:
+            with konekdb.cursor(name="grid_benda_uji") as kursor:
+                kursor.itersize = ukuran
+                kursor.execute(SQL, data)
+                while True:
+                    halaman = kursor.fetchmany(ukuran)
+                    if not halaman:
+                        break
+                    yield halaman
+        finally:
+            if not konekdb.closed:
+                konekdb.rollback()
+                konekdb.autocommit = True
+
+
 def queryGrid(parList):
 
     try:
         logging.info("Mulai mengeksekusi method queryGrid() pada file dbctrl.py")
-        conn = f"dbname={datab} user={login} host={hosted} password={passed}"
-        konekdb = psycopg2.connect(conn)
-        konekdb.autocommit = True
-        kursor = konekdb.cursor()
-        dataList = (
-            parList[0],
-            parList[1],
-            parList[2],
-        )
-        SQL = """ SELECT idpengujian, tgluji, nodocket, nourutbenda, bujnama, umur, nilaikn, bebanmpa, kuattekan, beratbenda, tiperetak, sinkron FROM pengujian
-		WHERE  (tgluji BETWEEN %s AND %s) AND sinkron LIKE %s
-		ORDER BY idpengujian ASC; """
-        kursor.execute(SQL, dataList)
-        hasilSelect = kursor.fetchall()
-        logging.debug("Data Benda uji hasil method queryGrid() : %s", str(hasilSelect))
-        kursor.close()
-        konekdb.close()
+        hasilSelect = []
+        for halaman in iterGrid(parList):
+            hasilSelect.extend(halaman)
+        logging.debug("Jumlah benda uji hasil method queryGrid() : %d", len(hasilSelect))
         return hasilSelect
     except Exception as e:
         logging.error(
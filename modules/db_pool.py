@@ -0,0 +1,311 @@
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+import psycopg2
+import psycopg2.pool
+
+from modules import settings
+
+logger = logging.getLogger(__name__)
+
+
+class PoolTimeout(Exception):
+    """Raised when no connection becomes free within the configured wait time"""
+
+
+class HitungCursor(psycopg2.extensions.cursor):
+    """Cursor that counts the statements it executes, reported as metrics()['queries']"""
+
+    def execute(self, query, vars=None):
+        self.connection.jumlah_query += 1
+        return super().execute(query, vars)
+
+    def executemany(self, query, vars_list):
+        self.connection.jumlah_query += 1
+        return super().executemany(query, vars_list)
+
+    def copy_expert(self, sql, file, size=8192):
+        self.connection.jumlah_query += 1
+        return super().copy_expert(sql, file, size)
+
+
+class HitungConnection(psycopg2.extensions.connection):
+    """Connection whose default cursor is HitungCursor"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.jumlah_query = 0
+        # Nama prepared statement yang sudah dibuat di koneksi ini (modules/dao.py)
+        self.pernyataan_siap = set()
+        self.cursor_factory = HitungCursor
+
+
+class ConnectionPool:
+    """
+    Thread-safe PostgreSQL connection pool shared by daemon_sync and db_controller
+
+    Wraps psycopg2's ThreadedConnectionPool with:
+    - blocking checkout (waits up to `timeout` seconds instead of raising at once)
+    - health check on connections that sat idle longer than `health_interval`
+    - automatic reconnect when a connection is found broken
+    - size, wait-time and executed-query metrics via metrics()
+    """
+
+    def __init__(self, dsn, minconn=1, maxconn=5, timeout=10.0, health_interval=30.0):
+        """
+        Initialize pool
+
+        Args:
+            dsn: libpq connection string
+            minconn: Connections opened up front
+            maxconn: Upper bound of open connections
+            timeout: Max seconds to wait for a free connection
+            health_interval: Idle seconds after which a connection is pinged before reuse
+        """
+        self.dsn = dsn
+        self.minconn = minconn
+        self.maxconn = maxconn
+        self.timeout = timeout
+        self.health_interval = health_interval
+
+        self._pool = psycopg2.pool.ThreadedConnectionPool(
+            minconn, maxconn, dsn, connection_factory=HitungConnection
+        )
+        self._slots = threading.BoundedSemaphore(maxconn)
+        self._lock = threading.Lock()
+        self._last_used = {}
+
+        # Metrics
+        self._in_use = 0
+        self._checkouts = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._timeouts = 0
+        self._reconnects = 0
+        self._failed_checks = 0
+        self._queries_closed = 0
+        self._pensiun = False
+
+    def _is_healthy(self, conn):
+        """Ping connection if it has been idle too long"""
+        if conn.closed:
+            return False
+        terakhir = self._last_used.get(id(conn))
+        if terakhir is None or time.monotonic() - terakhir < self.health_interval:
+            return True
+        try:
+            with conn.cursor() as kursor:
+                kursor.execute("SELECT 1")
+            return True
+        except psycopg2.Error:
+            return False
+
+    def getconn(self):
+        """
+        Check out a connection, waiting up to `timeout` seconds
+
+        Returns:
+            psycopg2 connection in autocommit mode
+
+        Raises:
+            PoolTimeout: no connection became free in time
+            psycopg2.OperationalError: database unreachable
+        """
+        mulai = time.monotonic()
+        if not self._slots.acquire(timeout=self.timeout):
+            with self._lock:
+                self._timeouts += 1
+            raise PoolTimeout(f"Tidak ada koneksi bebas dalam {self.timeout}s (max {self.maxconn})")
+        tunggu = time.monotonic() - mulai
+
+        try:
+            conn = self._pool.getconn()
+            if not self._is_healthy(conn):
+                with self._lock:
+                    self._failed_checks += 1
+                    self._reconnects += 1
+                logger.warning("Koneksi database tidak sehat, membuka koneksi baru")
+                self._pool.putconn(conn, close=True)
+                conn = self._pool.getconn()
+            conn.autocommit = True
+        except Exception:
+            self._slots.release()
+            raise
+
+        with self._lock:
+            self._in_use += 1
+            self._checkouts += 1
+            self._wait_total += tunggu
+            self._wait_max = max(self._wait_max, tunggu)
+        return conn
+
+    def putconn(self, conn, close=False):
+        """
+        Return a connection to the pool
+
+        Args:
+            conn: Connection obtained from getconn()
+            close: Discard the connection instead of keeping it for reuse
+        """
+        try:
+            if conn.closed or self._pensiun:
+                close = True
+            elif not close and conn.status != psycopg2.extensions.STATUS_READY:
+                conn.rollback()
+            self._last_used[id(conn)] = time.monotonic()
+            if close:
+                self._last_used.pop(id(conn), None)
+                with self._lock:
+                    self._queries_closed += getattr(conn, "jumlah_query", 0)
+            self._pool.putconn(conn, close=close)
+        finally:
+            with self._lock:
+                self._in_use -= 1
+            self._slots.release()
+
+    @contextmanager
+    def connection(self):
+        """
+        Context manager yielding a pooled connection
+
+        Connections that fail with an OperationalError/InterfaceError are
+        discarded so the next checkout reconnects.
+        """
+        conn = self.getconn()
+        rusak = False
+        try:
+            yield conn
+        except (psycopg2.OperationalError, psycopg2.InterfaceError):
+            rusak = True
+            raise
+        finally:
+            self.putconn(conn, close=rusak or conn.closed != 0)
+
+    def metrics(self):
+        """
+        Snapshot of pool size and wait-time metrics
+
+        Returns:
+            Dictionary of counters
+        """
+        with self._lock:
+            return {
+                "max": self.maxconn,
+                "in_use": self._in_use,
+                "idle": len(self._pool._pool),
+                "checkouts": self._checkouts,
+                "wait_total_s": round(self._wait_total, 4),
+                "wait_avg_s": round(self._wait_total / self._checkouts, 4) if self._checkouts else 0.0,
+                "wait_max_s": round(self._wait_max, 4),
+                "timeouts": self._timeouts,
+                "reconnects": self._reconnects,
+                "failed_health_checks": self._failed_checks,
+                "queries": self._queries_closed + sum(
+                    getattr(conn, "jumlah_query", 0) for conn in self._pool._used.values()
+                ) + sum(getattr(conn, "jumlah_query", 0) for conn in self._pool._pool),
+            }
+
+    def pensiunkan(self):
+        """
+        Retire the pool after a configuration change
+
+        Idle connections are closed now; connections still checked out are
+        closed when they are returned, so in-flight queries are not cut off.
+        """
+        self._pensiun = True
+        with self._pool._lock:
+            for conn in self._pool._pool:
+                self._last_used.pop(id(conn), None)
+                conn.close()
+            self._pool._pool.clear()
+
+    def closeall(self):
+        """Close every connection held by the pool"""
+        self._pool.closeall()
+        self._last_used.clear()
+
+
+_pool = None
+_pool_data = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """
+    Get the process-wide pool, building it from the [data] settings on first use
+
+    When config.cnf is edited so that [data] changes, the next call builds a
+    new pool and retires the old one (see ConnectionPool.pensiunkan()).
+
+    Returns:
+        ConnectionPool instance
+    """
+    global _pool, _pool_data
+    data = settings.get_settings().data
+    if _pool is not None and (_pool_data is None or _pool_data == data):
+        return _pool
+    with _pool_lock:
+        if _pool is not None and (_pool_data is None or _pool_data == data):
+            return _pool
+        lama = _pool
+        _pool = ConnectionPool(
+            data.dsn,
+            minconn=data.pool_min,
+            maxconn=data.pool_max,
+            timeout=data.pool_timeout,
+        )
+        _pool_data = data
+        if lama is not None:
+            lama.pensiunkan()
+            logger.info("Konfigurasi [data] berubah, pool koneksi lama dipensiunkan")
+        logger.info(f"Pool koneksi dibuat: host={data.host}, database={data.database}, max={_pool.maxconn}")
+    return _pool
+
+
+def init_pool(dsn, **kwargs):
+    """
+    Replace the process-wide pool with one for `dsn` (e.g. a benchmark schema)
+
+    Args:
+        dsn: libpq connection string
+        **kwargs: Passed to ConnectionPool
+
+    Returns:
+        The new ConnectionPool
+    """
+    global _pool, _pool_data
+    with _pool_lock:
+        if _pool is not None:
+            _pool.closeall()
+        _pool = ConnectionPool(dsn, **kwargs)
+        # Pool eksplisit: jangan diganti otomatis saat config.cnf berubah
+        _pool_data = None
+    return _pool
+
+
+def pool_metrics():
+    """
+    Metrics of the process-wide pool without forcing it to be built
+
+    Returns:
+        Dictionary of counters, empty if the pool has not been created yet
+    """
+    pool = _pool
+    return pool.metrics() if pool is not None else {}
+
+
+def connection():
+    """Shortcut for get_pool().connection()"""
+    return get_pool().connection()
+
+
+def close_pool():
+    """Close the process-wide pool (e.g. on application exit)"""
+    global _pool, _pool_data
+    with _pool_lock:
+        if _pool is not None:
+            _pool.closeall()
+            _pool = None
+            _pool_data = None
@@ -0,0 +1,325 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from modules import settings
+
+logger = logging.getLogger(__name__)
+
+
+def buat_payload(bendaUji):
+    """
+    Build the webser_hasilUji JSON body from a pengujian row
+
+    Args:
+        bendaUji: Tuple in cekData() column order
+
+    Returns:
+        Dictionary ready to be sent as JSON
+    """
+    datanya = {"params": {}}
+    datanya["params"]["bjdt_tgl_test"] = str(bendaUji[0])
+    datanya["params"]["bjdt_beban"] = float(bendaUji[1])
+    datanya["params"]["bjdt_berat"] = float(bendaUji[2])
+    datanya["params"]["bjdt_tipe_retak"] = bendaUji[3]
+    datanya["params"]["bjdt_id"] = int(bendaUji[4])
+    datanya["params"]["bjdt_beban_mpa"] = float(bendaUji[8])
+    datanya["params"]["bjdt_beban_kg"] = str(bendaUji[9])
+    datanya["params"]["bjdt_umur"] = int(bendaUji[10])
+    return datanya
+
+
+class Ditolak:
+    """Result placeholder for a row that was not sent because the circuit is open"""
+    status_code = 0
+
+    def __bool__(self):
+        return False
+
+
+DITOLAK = Ditolak()
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker for the ERP endpoint
+
+    - tertutup: requests flow normally
+    - terbuka: after `ambang` consecutive failures every request is refused
+      for `jeda` seconds, so a down ERP is not hammered
+    - setengah: after the pause one trial request is let through; success
+      closes the circuit, failure opens it again
+    """
+
+    TERTUTUP = "tertutup"
+    TERBUKA = "terbuka"
+    SETENGAH = "setengah"
+
+    def __init__(self, ambang=5, jeda=60.0):
+        """
+        Initialize breaker
+
+        Args:
+            ambang: Consecutive failures that open the circuit
+            jeda: Seconds the circuit stays open before a trial request
+        """
+        self.ambang = max(1, int(ambang))
+        self.jeda = jeda
+        self._lock = threading.Lock()
+        self._status = self.TERTUTUP
+        self._gagal_beruntun = 0
+        self._dibuka_pada = 0.0
+        self._uji_berjalan = False
+        self.jumlah_dibuka = 0
+
+    @property
+    def status(self):
+        with self._lock:
+            return self._status
+
+    def izinkan(self):
+        """
+        Whether a request may be sent now
+
+        Returns:
+            True if the request may go out
+        """
+        with self._lock:
+            if self._status == self.TERTUTUP:
+                return True
+            if self._status == self.TERBUKA:
+                if time.monotonic() - self._dibuka_pada < self.jeda:
+                    return False
+                self._status = self.SETENGAH
+                self._uji_berjalan = False
+            # Setengah terbuka: hanya satu request uji pada satu waktu
+            if self._uji_berjalan:
+                return False
+            self._uji_berjalan = True
+            return True
+
+    def sukses(self):
+        """Record a successful request"""
+        with self._lock:
+            self._status = self.TERTUTUP
+            self._gagal_beruntun = 0
+            self._uji_berjalan = False
+
+    def gagal(self):
+        """Record a failed request (timeout, connection error, 5xx)"""
+        with self._lock:
+            self._gagal_beruntun += 1
+            self._uji_berjalan = False
+            if self._status == self.SETENGAH or self._gagal_beruntun >= self.ambang:
+                if self._status != self.TERBUKA:
+                    self.jumlah_dibuka += 1
+                self._status = self.TERBUKA
+                self._dibuka_pada = time.monotonic()
+
+    def sisa_jeda(self):
+        """
+        Seconds left before the open circuit allows a trial request
+
+        Returns:
+            0 when requests are allowed
+        """
+        with self._lock:
+            if self._status != self.TERBUKA:
+                return 0.0
+            return max(0.0, self.jeda - (time.monotonic() - self._dibuka_pada))
+
+
+class ErpClient:
+    """
+    HTTP client for the ERP hasil uji webservice
+
+    - one requests.Session with a keep-alive connection pool, so repeated
+      pushes reuse the TCP/TLS connection instead of handshaking each time
+    - bounded worker pool for sending several bjdt_id results concurrently
+    - (connect, read) timeout per request
+    - circuit breaker that refuses requests while the ERP keeps failing
+    - throughput and latency counters, see statistik()
+    """
+
+    def __init__(self, url, workers=4, connect_timeout=5.0, read_timeout=30.0, logger=None,
+                 breaker=None):
+        """
+        Initialize client
+
+        Args:
+            url: webser_hasilUji endpoint
+            workers: Max requests in flight at once
+            connect_timeout: Seconds to establish a connection
+            read_timeout: Seconds to wait for the response
+            logger: Logger to report to (default: module logger)
+            breaker: CircuitBreaker instance (default: 5 failures, 60 s pause)
+        """
+        self.url = url
+        self.workers = max(1, int(workers))
+        self.timeout = (connect_timeout, read_timeout)
+        self.logger = logger if logger is not None else logging.getLogger(__name__)
+        self.breaker = breaker or CircuitBreaker()
+        # Optional callable(detik) fed with every request latency (e.g. a metrics histogram)
+        self.pengamat_latensi = None
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.workers)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="ErpPost")
+        self._lock = threading.Lock()
+        self._total = self._hitungan_baru()
+        self._jendela = self._hitungan_baru()
+
+    @classmethod
+    def from_config(cls, workers=None, logger=None):
+        """
+        Build a client from the [webser] and [daemon] settings
+
+        Args:
+            workers: Override [daemon] concurrency
+            logger: Logger to report to
+        """
+        konfigurasi = settings.get_settings()
+        webser = konfigurasi.webser
+        if workers is None:
+            workers = konfigurasi.daemon.concurrency
+        return cls(
+            webser.webser_hasilUji,
+            workers=workers,
+            connect_timeout=webser.connect_timeout,
+            read_timeout=webser.timeout,
+            logger=logger,
+            breaker=CircuitBreaker(ambang=webser.breaker_ambang, jeda=webser.breaker_jeda),
+        )
+
+    @staticmethod
+    def _hitungan_baru():
+        return {"dikirim": 0, "berhasil": 0, "gagal": 0, "ditolak": 0, "latensi_total": 0.0,
+                "latensi_max": 0.0, "mulai": time.monotonic()}
+
+    def _catat(self, berhasil, latensi):
+        with self._lock:
+            for h in (self._total, self._jendela):
+                h["dikirim"] += 1
+                h["berhasil" if berhasil else "gagal"] += 1
+                h["latensi_total"] += latensi
+                h["latensi_max"] = max(h["latensi_max"], latensi)
+        if self.pengamat_latensi is not None:
+            self.pengamat_latensi(latensi)
+
+    def kirim(self, bendaUji):
+        """
+        Send one row to the ERP
+
+        Args:
+            bendaUji: Tuple in cekData() column order
+
+        Returns:
+            Response object, None on error, or DITOLAK if the circuit is open
+        """
+        if not self.breaker.izinkan():
+            with self._lock:
+                self._total["ditolak"] += 1
+                self._jendela["ditolak"] += 1
+            return DITOLAK
+
+        mulai = time.monotonic()
+        response = None
+        try:
+            datanya = buat_payload(bendaUji)
+            self.logger.debug(f"Data yang akan dikirim: {datanya}")
+
+            response = self.session.post(self.url, json=datanya, timeout=self.timeout)
+            self.logger.debug(f"Response status code: {response.status_code}")
+            self.logger.debug(f"Response content: {response.text[:200]}")  # First 200 chars
+            return response
+
+        except requests.Timeout:
+            self.logger.error(f"Request timeout - Server tidak merespon dalam waktu {self.timeout[1]} detik")
+            return None
+        except requests.ConnectionError as e:
+            self.logger.error(f"Connection Error - Gagal menyambungkan ke server: {e}")
+            return None
+        except Exception as e:
+            self.logger.error(f"Error pada ErpClient.kirim(): {str(e)}")
+            self.logger.exception("Exception details in ErpClient.kirim():")
+            return None
+        finally:
+            berhasil = response is not None and response.status_code == 200
+            self._catat(berhasil, time.monotonic() - mulai)
+            # 4xx is a problem with this row, not with the ERP: keep the circuit closed
+            if response is None or response.status_code >= 500:
+                self.breaker.gagal()
+            else:
+                self.breaker.sukses()
+
+    def kirim_banyak(self, daftar):
+        """
+        Send many rows concurrently over the bounded worker pool
+
+        Args:
+            daftar: List of tuples in cekData() column order
+
+        Returns:
+            List of kirim() results, same order as `daftar`
+        """
+        return list(self._executor.map(self.kirim, daftar))
+
+    def statistik(self, reset=False):
+        """
+        Throughput and latency counters
+
+        Args:
+            reset: Start a new measurement window after reading (e.g. once per cycle)
+
+        Returns:
+            Dictionary with 'jendela' (since last reset) and 'total' counters
+        """
+        with self._lock:
+            hasil = {}
+            for nama, h in (("jendela", self._jendela), ("total", self._total)):
+                durasi = max(time.monotonic() - h["mulai"], 1e-9)
+                hasil[nama] = {
+                    "dikirim": h["dikirim"],
+                    "berhasil": h["berhasil"],
+                    "gagal": h["gagal"],
+                    "ditolak": h["ditolak"],
+                    "per_detik": round(h["dikirim"] / durasi, 2),
+                    "latensi_rata_ms": round(h["latensi_total"] / h["dikirim"] * 1000, 1) if h["dikirim"] else 0.0,
+                    "latensi_max_ms": round(h["latensi_max"] * 1000, 1),
+                }
+            hasil["breaker"] = self.breaker.status
+            if reset:
+                self._jendela = self._hitungan_baru()
+            return hasil
+
+    def close(self):
+        """Stop the worker pool and close pooled HTTP connections"""
+        self._executor.shutdown(wait=True)
+        self.session.close()
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_erp_client():
+    """
+    Get the process-wide ERP client, building it from the settings on first use
+
+    Returns:
+        ErpClient instance
+    """
+    global _client
+    if _client is not None:
+        return _client
+    with _client_lock:
+        if _client is None:
+            _client = ErpClient.from_config()
+    return _client
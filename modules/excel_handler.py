@@ -1,11 +1,13 @@
 import pandas as pd
 import logging
 import openpyxl
-import random
 from pathlib import Path
 from typing import Optional
 from openpyxl.worksheet.worksheet import Worksheet
 from openpyxl.workbook.workbook import Workbook
+from openpyxl.packaging.custom import StringProperty
+
+from modules import acak, beban_engine
 
 logger = logging.getLogger(__name__)
 
@@ -70,23 +72,27 @@ class ExcelBebanProcessor:
     berdasarkan MUTU, KODE_BENDA_UJI, UMUR, dan DOCKET
     """
     
-    def __init__(self, file_path: str, sheet_name: str = 'ODOO'):
+    def __init__(self, file_path: str, sheet_name: str = 'ODOO', profil_aturan: str = 'odoo',
+                 seed: Optional[int] = None):
         """
         Inisialisasi processor
         
         Args:
             file_path: Path ke file Excel
             sheet_name: Nama sheet yang akan diproses (default: 'ODOO')
+            profil_aturan: Profil di aturan_mutu.json (default: 'odoo')
+            seed: Seed acak proses ini; isi dengan seed tercatat untuk mengulang hasil (default: seed baru)
         """
         self.file_path = file_path
         self.sheet_name = sheet_name
+        self.aturan = beban_engine.muat_aturan(profil_aturan)
+        self.konteks = acak.KonteksAcak(seed)
         self.workbook: Optional[Workbook] = None
         self.sheet: Optional[Worksheet] = None
         
         # Tracking untuk logika umur 28
         self.previous_docket: Optional[str] = None
         self.previous_beban: Optional[float] = None
-        self.previous_mutu: Optional[str] = None
         
         # Mapping kolom (1-based index untuk Excel)
         self.column_map = {
@@ -100,10 +106,15 @@ class ExcelBebanProcessor:
         # Keywords untuk pengecekan
         self.keywords = ["PP - TOL PTB", "WASKITA - ABP JO", "HK - JAKON JO", "WIKA - ADHI JO"]
     
-    def load_excel(self) -> bool:
-        """Membuka file Excel"""
+    def load_excel(self, workbook: Optional[Workbook] = None) -> bool:
+        """
+        Membuka file Excel
+        
+        Args:
+            workbook: Workbook yang sudah dimuat pemanggil (default: buka file_path)
+        """
         try:
-            self.workbook = openpyxl.load_workbook(self.file_path)
+            self.workbook = workbook or openpyxl.load_workbook(self.file_path)
             self.sheet = self.workbook[self.sheet_name]
             print(f"✓ File Excel berhasil dibuka: {self.file_path}")
             print(f"✓ Sheet aktif: {self.sheet_name}")
@@ -138,752 +149,72 @@ class ExcelBebanProcessor:
         """
         Menghitung nilai BEBAN untuk baris tertentu
         
+        Parameter per mutu diambil dari tabel aturan (lihat beban_engine.muat_aturan)
+        
         Args:
             row_index: Index baris di Excel (1-based)
             
         Returns:
             String nilai BEBAN atau None jika tidak memenuhi kriteria
         """
-        # Ambil data dari row
-        mutu = str(self.get_cell_value(row_index, 'MUTU') or '')
-        kode_benda_uji = str(self.get_cell_value(row_index, 'KODE_BENDA_UJI') or '')
+        mutu = self.get_cell_value(row_index, 'MUTU')
         umur = self.get_cell_value(row_index, 'UMUR')
         docket = self.get_cell_value(row_index, 'DOCKET')
+        
+        beban, (self.previous_docket, self.previous_beban) = beban_engine.hitung_satu(
+            docket, mutu, umur, (self.previous_docket, self.previous_beban), self.aturan,
+            konteks=self.konteks
+        )
+        return beban
 
-
-        if "Class B-2" in mutu:
-        # Logika perhitungan berdasarkan UMUR
-            if umur == 7:
-                random_beban = random.uniform(390.12, 460.34)
-                return f"{random_beban:.2f}"        
-            elif umur == 28:
-                # Umur 28 hari dengan logika khusus
-                # Skenario 1: Kondisi awal (docket & beban sebelumnya = 0.0 atau None)
-                if (self.previous_docket is None or self.previous_docket == 0.0 or 
-                    self.previous_beban is None or self.previous_beban == 0.0):
-                    new_beban = random.uniform(580, 700)
-                
-                # Skenario 2: Docket sama & beban != 0
-                elif self.previous_docket == docket and self.previous_beban != None:
-                    mean = 645
-                    if self.previous_beban >= mean:
-                        adjustment = random.uniform(-19, -8)  # Turun
-                    else:
-                        adjustment = random.uniform(8, 19)  # Naik
-                    new_beban = max(520, min(self.previous_beban + adjustment, 750))
-                # Skenario 3: Docket berbeda & mutu sama
-                elif self.previous_docket != docket and self.previous_mutu == mutu:
-                    mean = 645
-                    if self.previous_beban >= mean:
-                        adjustment = random.uniform(-84, -68)  # Turun signifikan
-                    else:
-                        adjustment = random.uniform(74, 96)  # Naik signifikan
-                    new_beban = self.previous_beban + adjustment
-                    # Pastikan tetap dalam range
-                    new_beban = max(590, min(new_beban, 750))
-
-                # Skenario 4: Docket berbeda & mutu berbeda
-                elif self.previous_docket != docket and self.previous_mutu != mutu:
-                    new_beban = random.uniform(580, 700)
-                else:
-                    # Fallback (seharusnya tidak terjadi)
-                    new_beban = random.uniform(580, 700)
-                # Update tracking variables
-                self.previous_docket = str(docket) if docket is not None else None
-                self.previous_beban = new_beban
-                
-                return f"{new_beban:.2f}"
-            else:
-                # Umur selain 7 atau 28
-                return "0.00"
-            
-        elif "K-400" in mutu:
-        # Logika perhitungan berdasarkan UMUR
-            if umur == 7:
-                random_beban = random.uniform(390.12, 460.34)
-                return f"{random_beban:.2f}"        
-            elif umur == 28:
-                # Umur 28 hari dengan logika khusus
-                # Skenario 1: Kondisi awal (docket & beban sebelumnya = 0.0 atau None)
-                if (self.previous_docket is None or self.previous_docket == 0.0 or 
-                    self.previous_beban is None or self.previous_beban == 0.0):
-                    new_beban = random.uniform(580, 700)
-                
-                # Skenario 2: Docket sama & beban != 0
-                elif self.previous_docket == docket and self.previous_beban != None:
-                    mean = 645
-                    if self.previous_beban >= mean:
-                        adjustment = random.uniform(-19, -8)  # Turun
-                    else:
-                        adjustment = random.uniform(8, 19)  # Naik
-                    new_beban = max(520, min(self.previous_beban + adjustment, 750))
-                # Skenario 3: Docket berbeda & mutu sama
-                elif self.previous_docket != docket and self.previous_mutu == mutu:
-                    mean = 645
-                    if self.previous_beban >= mean:
-                        adjustment = random.uniform(-84, -68)  # Turun signifikan
-                    else:
-                        adjustment = random.uniform(74, 96)  # Naik signifikan
-                    new_beban = self.previous_beban + adjustment
-                    # Pastikan tetap dalam range
-                    new_beban = max(590, min(new_beban, 750))
-
-                # Skenario 4: Docket berbeda & mutu berbeda
-                elif self.previous_docket != docket and self.previous_mutu != mutu:
-                    new_beban = random.uniform(580, 700)
-                else:
-                    # Fallback (seharusnya tidak terjadi)
-                    new_beban = random.uniform(580, 700)
-                # Update tracking variables
-                self.previous_docket = str(docket) if docket is not None else None
-                self.previous_beban = new_beban
-                
-                return f"{new_beban:.2f}"
-            else:
-                # Umur selain 7 atau 28
-                return "0.00"
-
-        elif "Class B-1" in mutu:
-        # Logika perhitungan berdasarkan UMUR
-            if umur == 7:
-                random_beban = random.uniform(360.12, 420.34)
-                return f"{random_beban:.2f}"        
-            elif umur == 28:
-                # Umur 28 hari dengan logika khusus
-                # Skenario 1: Kondisi awal (docket & beban sebelumnya = 0.0 atau None)
-                if (self.previous_docket is None or self.previous_docket == 0.0 or 
-                    self.previous_beban is None or self.previous_beban == 0.0):
-                    new_beban = random.uniform(540, 660)
-                
-                # Skenario 2: Docket sama & beban != 0
-                elif self.previous_docket == docket and self.previous_beban != None:
-                    mean = 600
-                    if self.previous_beban >= mean:
-                        adjustment = random.uniform(-18, -6)  # Turun
-                    else:
-                        adjustment = random.uniform(5, 15)  # Naik
-                    new_beban = max(500, min(self.previous_beban + adjustment, 700))
-                # Skenario 3: Docket berbeda & mutu sama
-                elif self.previous_docket != docket:
-                    mean = 625
-                    if self.previous_beban >= mean:
-                        adjustment = random.uniform(-83, -71)  # Turun signifikan
-                    else:
-                        adjustment = random.uniform(59, 71)  # Naik signifikan
-                    new_beban = self.previous_beban + adjustment
-                    # Pastikan tetap dalam range
-                    new_beban = max(540, min(new_beban, 710))
-                    
-                else:
-                    # Fallback (seharusnya tidak terjadi)
-                    new_beban = random.uniform(540, 660)
-                # Update tracking variables
-                self.previous_docket = str(docket) if docket is not None else None
-                self.previous_beban = new_beban
-                
-                return f"{new_beban:.2f}"
-            else:
-                # Umur selain 7 atau 28
-                return "0.00"
-
-        elif "Fc-30" in mutu:
-        # Logika perhitungan berdasarkan UMUR
-            if umur == 7:
-                random_beban = random.uniform(360.12, 420.34)
-                return f"{random_beban:.2f}"        
-            elif umur == 28:
-                # Umur 28 hari dengan logika khusus
-                # Skenario 1: Kondisi awal (docket & beban sebelumnya = 0.0 atau None)
-                if (self.previous_docket is None or self.previous_docket == 0.0 or 
-                    self.previous_beban is None or self.previous_beban == 0.0):
-                    new_beban = random.uniform(540, 660)
-                
-                # Skenario 2: Docket sama & beban != 0
-                elif self.previous_docket == docket and self.previous_beban != None:
-                    mean = 600
-                    if self.previous_beban >= mean:
-                        adjustment = random.uniform(-18, -6)  # Turun
-                    else:
-                        adjustment = random.uniform(5, 15)  # Naik
-                    new_beban = max(500, min(self.previous_beban + adjustment, 700))
-                # Skenario 3: Docket berbeda & mutu sama
-                elif self.previous_docket != docket:
-                    mean = 625
-                    if self.previous_beban >= mean:
-                        adjustment = random.uniform(-83, -71)  # Turun signifikan
-                    else:
-                        adjustment = random.uniform(59, 71)  # Naik signifikan
-                    new_beban = self.previous_beban + adjustment
-                    # Pastikan tetap dalam range
-                    new_beban = max(540, min(new_beban, 710))
-                    
-                else:
-                    # Fallback (seharusnya tidak terjadi)
-                    new_beban = random.uniform(540, 660)
-                # Update tracking variables
-                self.previous_docket = str(docket) if docket is not None else None
-                self.previous_beban = new_beban
-                
-                return f"{new_beban:.2f}"
-            else:
-                # Umur selain 7 atau 28
-                return "0.00"
-            
-        elif "K-350" in mutu:
-        # Logika perhitungan berdasarkan UMUR
-            if umur == 7:
-                random_beban = random.uniform(328.12, 380.34)
-                return f"{random_beban:.2f}"        
-            elif umur == 28:
-                # Umur 28 hari dengan logika khusus
-                # Skenario 1: Kondisi awal (docket & beban sebelumnya = 0.0 atau None)
-                if (self.previous_docket is None or self.previous_docket == 0.0 or 
-                    self.previous_beban is None or self.previous_beban == 0.0):
-                    new_beban = random.uniform(510, 640)
-                
-                # Skenario 2: Docket sama & beban != 0
-                elif self.previous_docket == docket and self.previous_beban != None:
-                    mean = (510 + 640) / 2  # 575
-                    if self.previous_beban >= mean:
-                        adjustment = random.uniform(-21, -3)  # Turun
-                    else:
-                        adjustment = random.uniform(3, 19)  # Naik
-                    new_beban = max(510, min(self.previous_beban + adjustment, 640))
-                # Skenario 3: Docket berbeda & mutu sama
-                elif self.previous_docket != docket and self.previous_mutu == mutu:
-                    mean = (510 + 640) / 2  # 575
-                    if self.previous_beban >= mean:
-                        adjustment = random.uniform(-66, -52)  # Turun signifikan
-                    else:
-                        adjustment = random.uniform(62, 74)  # Naik signifikan
-                    new_beban = self.previous_beban + adjustment
-                    # Pastikan tetap dalam range
-                    new_beban = max(510, min(new_beban, 640))
-                
-                # Skenario 4: Docket berbeda & mutu berbeda
-                elif self.previous_docket != docket and self.previous_mutu != mutu:
-                    new_beban = random.uniform(510, 640)
-                    
-                else:
-                    # Fallback (seharusnya tidak terjadi)
-                    new_beban = random.uniform(510, 640)
-                # Update tracking variables
-                self.previous_docket = str(docket) if docket is not None else None
-                self.previous_beban = new_beban
-                
-                return f"{new_beban:.2f}"
-
-        elif "K-300" in mutu:
-        # Logika perhitungan berdasarkan UMUR
-            if umur == 7:
-                random_beban = random.uniform(290.12, 360.34)
-                return f"{random_beban:.2f}"        
-            elif umur == 28:
-                # Umur 28 hari dengan logika khusus
-                # Skenario 1: Kondisi awal (docket & beban sebelumnya = 0.0 atau None)
-                if (self.previous_docket is None or self.previous_docket == 0.0 or 
-                    self.previous_beban is None or self.previous_beban == 0.0):
-                    new_beban = random.uniform(430, 500)
-                
-                # Skenario 2: Docket sama & beban != 0
-                elif self.previous_docket == docket and self.previous_beban != None:
-                    mean = (430 + 500) / 2  # 465
-                    if self.previous_beban >= mean:
-                        adjustment = random.uniform(-13, -3)  # Turun
-                    else:
-                        adjustment = random.uniform(3, 13)  # Naik
-                    new_beban = max(430, min(self.previous_beban + adjustment, 500))
-                # Skenario 3: Docket berbeda & mutu sama
-                elif self.previous_docket != docket and self.previous_mutu == mutu:
-                    mean = 475
-                    if self.previous_beban >= mean:
-                        adjustment = random.uniform(-74, -67)  # Turun signifikan
-                    else:
-                        adjustment = random.uniform(59, 76)  # Naik signifikan
-                    new_beban = self.previous_beban + adjustment
-                    # Pastikan tetap dalam range
-                    new_beban = max(398, min(new_beban, 560))
-                
-                # Skenario 4: Docket berbeda & mutu berbeda
-                elif self.previous_docket != docket and self.previous_mutu != mutu:
-                    new_beban = random.uniform(430, 500)
-                    
-                else:
-                    # Fallback (seharusnya tidak terjadi)
-                    new_beban = random.uniform(430, 500)
-                # Update tracking variables
-                self.previous_docket = str(docket) if docket is not None else None
-                self.previous_beban = new_beban
-                
-                return f"{new_beban:.2f}"
-            else:
-                # Umur selain 7 atau 28
-                return "0.00"
+    def read_columns(self, start_row: int = 2) -> dict:
+        """
+        Membaca kolom DOCKET, MUTU, UMUR dan KODE_BENDA_UJI sekaligus (satu kali lewat sheet)
         
-        elif "Fc-25" in mutu:
-        # Logika perhitungan berdasarkan UMUR
-            if umur == 7:
-                random_beban = random.uniform(290.12, 360.34)
-                return f"{random_beban:.2f}"        
-            elif umur == 28:
-                # Umur 28 hari dengan logika khusus
-                # Skenario 1: Kondisi awal (docket & beban sebelumnya = 0.0 atau None)
-                if (self.previous_docket is None or self.previous_docket == 0.0 or 
-                    self.previous_beban is None or self.previous_beban == 0.0):
-                    new_beban = random.uniform(430, 500)
-                
-                # Skenario 2: Docket sama & beban != 0
-                elif self.previous_docket == docket and self.previous_beban != None:
-                    mean = (430 + 500) / 2  # 465
-                    if self.previous_beban >= mean:
-                        adjustment = random.uniform(-29, -3)  # Turun
-                    else:
-                        adjustment = random.uniform(3, 29)  # Naik
-                    new_beban = max(430, min(self.previous_beban + adjustment, 500))
-                # Skenario 3: Docket berbeda & mutu sama
-                elif self.previous_docket != docket and self.previous_mutu == mutu:
-                    mean = (430 + 500) / 2  # 465
-                    if self.previous_beban >= mean:
-                        adjustment = random.uniform(-34, -20)  # Turun signifikan
-                    else:
-                        adjustment = random.uniform(20, 34)  # Naik signifikan
-                    new_beban = self.previous_beban + adjustment
-                    # Pastikan tetap dalam range
-                    new_beban = max(430, min(new_beban, 500))
-                
-                # Skenario 4: Docket berbeda & mutu berbeda
-                elif self.previous_docket != docket and self.previous_mutu != mutu:
-                    new_beban = random.uniform(430, 500)
-                    
-                else:
-                    # Fallback (seharusnya tidak terjadi)
-                    new_beban = random.uniform(430, 500)
-                # Update tracking variables
-                self.previous_docket = str(docket) if docket is not None else None
-                self.previous_beban = new_beban
-                
-                return f"{new_beban:.2f}"
-            else:
-                # Umur selain 7 atau 28
-                return "0.00"
+        Args:
+            start_row: Baris awal data
             
-        elif "K-250" in mutu:
-        # Logika perhitungan berdasarkan UMUR
-            if umur == 7:
-                random_beban = random.uniform(230.12, 285.34)
-                return f"{random_beban:.2f}"        
-            elif umur == 28:
-                # Umur 28 hari dengan logika khusus
-                # Skenario 1: Kondisi awal (docket & beban sebelumnya = 0.0 atau None)
-                if (self.previous_docket is None or self.previous_docket == 0.0 or 
-                    self.previous_beban is None or self.previous_beban == 0.0):
-                    new_beban = random.uniform(365, 475)
-                
-                # Skenario 2: Docket sama & beban != 0
-                elif self.previous_docket == docket and self.previous_beban != None:
-                    mean = 420
-                    if self.previous_beban >= mean:
-                        adjustment = random.uniform(-10, -3)  # Turun
-                    else:
-                        adjustment = random.uniform(3, 10)  # Naik
-                    new_beban = max(365, min(self.previous_beban + adjustment, 475))
-                # Skenario 3: Docket berbeda dan mutu sama
-                elif self.previous_docket != docket:
-                    mean = 400
-                    if self.previous_beban >= mean:
-                        adjustment = random.uniform(-89, -76)  # Turun signifikan
-                    else:
-                        adjustment = random.uniform(66, 75)  # Naik signifikan
-                    new_beban = self.previous_beban + adjustment
-                    # Pastikan tetap dalam range
-                    new_beban = max(300, min(new_beban, 474))                  
-                else:
-                    # Fallback (seharusnya tidak terjadi)
-                    new_beban = random.uniform(365, 475)
-                # Update tracking variables
-                self.previous_docket = str(docket) if docket is not None else None
-                self.previous_beban = new_beban
-                
-                return f"{new_beban:.2f}"
-            else:
-                # Umur selain 7 atau 28
-                return "0.00"
-        
-        elif "Fc-20" in mutu:
-        # Logika perhitungan berdasarkan UMUR
-            if umur == 7:
-                random_beban = random.uniform(230.12, 285.34)
-                return f"{random_beban:.2f}"        
-            elif umur == 28:
-                # Umur 28 hari dengan logika khusus
-                # Skenario 1: Kondisi awal (docket & beban sebelumnya = 0.0 atau None)
-                if (self.previous_docket is None or self.previous_docket == 0.0 or 
-                    self.previous_beban is None or self.previous_beban == 0.0):
-                    new_beban = random.uniform(365, 475)
-                
-                # Skenario 2: Docket sama & beban != 0
-                elif self.previous_docket == docket and self.previous_beban != None:
-                    mean = 420
-                    if self.previous_beban >= mean:
-                        adjustment = random.uniform(-10, -3)  # Turun
-                    else:
-                        adjustment = random.uniform(3, 10)  # Naik
-                    new_beban = max(365, min(self.previous_beban + adjustment, 475))
-                # Skenario 3: Docket berbeda dan mutu sama
-                elif self.previous_docket != docket:
-                    mean = 400
-                    if self.previous_beban >= mean:
-                        adjustment = random.uniform(-89, -76)  # Turun signifikan
-                    else:
-                        adjustment = random.uniform(66, 75)  # Naik signifikan
-                    new_beban = self.previous_beban + adjustment
-                    # Pastikan tetap dalam range
-                    new_beban = max(300, min(new_beban, 474))                  
-                else:
-                    # Fallback (seharusnya tidak terjadi)
-                    new_beban = random.uniform(365, 475)
-                # Update tracking variables
-                self.previous_docket = str(docket) if docket is not None else None
-                self.previous_beban = new_beban
-                
-                return f"{new_beban:.2f}"
-            else:
-                # Umur selain 7 atau 28
-                return "0.00"
-        
-        elif "Class C" in mutu:
-        # Logika perhitungan berdasarkan UMUR
-            if umur == 7:
-                random_beban = random.uniform(230.12, 285.34)
-                return f"{random_beban:.2f}"        
-            elif umur == 28:
-                # Umur 28 hari dengan logika khusus
-                # Skenario 1: Kondisi awal (docket & beban sebelumnya = 0.0 atau None)
-                if (self.previous_docket is None or self.previous_docket == 0.0 or 
-                    self.previous_beban is None or self.previous_beban == 0.0):
-                    new_beban = random.uniform(365, 475)
-                
-                # Skenario 2: Docket sama & beban != 0
-                elif self.previous_docket == docket and self.previous_beban != None:
-                    mean = 420
-                    if self.previous_beban >= mean:
-                        adjustment = random.uniform(-10, -3)  # Turun
-                    else:
-                        adjustment = random.uniform(3, 10)  # Naik
-                    new_beban = max(365, min(self.previous_beban + adjustment, 475))
-                # Skenario 3: Docket berbeda dan mutu sama
-                elif self.previous_docket != docket:
-                    mean = 400
-                    if self.previous_beban >= mean:
-                        adjustment = random.uniform(-89, -76)  # Turun signifikan
-                    else:
-                        adjustment = random.uniform(66, 75)  # Naik signifikan
-                    new_beban = self.previous_beban + adjustment
-                    # Pastikan tetap dalam range
-                    new_beban = max(300, min(new_beban, 474))                  
-                else:
-                    # Fallback (seharusnya tidak terjadi)
-                    new_beban = random.uniform(365, 475)
-                # Update tracking variables
-                self.previous_docket = str(docket) if docket is not None else None
-                self.previous_beban = new_beban
-                
-                return f"{new_beban:.2f}"
-            else:
-                # Umur selain 7 atau 28
-                return "0.00"
-        
-        elif "K-175" in mutu:
-        # Logika perhitungan berdasarkan UMUR
-            if umur == 7:
-                random_beban = random.uniform(165.12, 215.34)
-                return f"{random_beban:.2f}"        
-            elif umur == 28:
-                # Umur 28 hari dengan logika khusus
-                # Skenario 1: Kondisi awal (docket & beban sebelumnya = 0.0 atau None)
-                if (self.previous_docket is None or self.previous_docket == 0.0 or 
-                    self.previous_beban is None or self.previous_beban == 0.0):
-                    new_beban = random.uniform(255, 305)
-                # Skenario 2: Docket sama & beban != 0
-                elif self.previous_docket == docket and self.previous_beban != None:
-                    mean = (255 + 305) / 2  # 280
-                    if self.previous_beban >= mean:
-                        adjustment = random.uniform(-29, -3)  # Turun
-                    else:
-                        adjustment = random.uniform(3, 29)  # Naik
-                    new_beban = max(255, min(self.previous_beban + adjustment, 305))
-                # Skenario 3: Docket berbeda & mutu sama
-                elif self.previous_docket != docket and self.previous_mutu == mutu:
-                    mean = (255 + 305) / 2  # 280
-                    if self.previous_beban >= mean:
-                        adjustment = random.uniform(-24, -8)  # Turun signifikan
-                    else:
-                        adjustment = random.uniform(8, 24)  # Naik signifikan
-                    new_beban = self.previous_beban + adjustment
-                    # Pastikan tetap dalam range
-                    new_beban = max(255, min(new_beban, 305))
-                
-                # Skenario 4: Docket berbeda & mutu berbeda
-                elif self.previous_docket != docket and self.previous_mutu != mutu:
-                    new_beban = random.uniform(255, 305)
-                    
-                else:
-                    # Fallback (seharusnya tidak terjadi)
-                    new_beban = random.uniform(255, 305)
-                # Update tracking variables
-                self.previous_docket = str(docket) if docket is not None else None
-                self.previous_beban = new_beban
-                
-                return f"{new_beban:.2f}"
-            else:
-                # Umur selain 7 atau 28
-                return "0.00"
-        
-        elif "Fc-15" in mutu:
-        # Logika perhitungan berdasarkan UMUR
-            if umur == 7:
-                random_beban = random.uniform(165.12, 215.34)
-                return f"{random_beban:.2f}"        
-            elif umur == 28:
-                # Umur 28 hari dengan logika khusus
-                # Skenario 1: Kondisi awal (docket & beban sebelumnya = 0.0 atau None)
-                if (self.previous_docket is None or self.previous_docket == 0.0 or 
-                    self.previous_beban is None or self.previous_beban == 0.0):
-                    new_beban = random.uniform(255, 305)
-                # Skenario 2: Docket sama & beban != 0
-                elif self.previous_docket == docket and self.previous_beban != None:
-                    mean = (255 + 305) / 2  # 280
-                    if self.previous_beban >= mean:
-                        adjustment = random.uniform(-29, -3)  # Turun
-                    else:
-                        adjustment = random.uniform(3, 29)  # Naik
-                    new_beban = max(255, min(self.previous_beban + adjustment, 305))
-                # Skenario 3: Docket berbeda & mutu sama
-                elif self.previous_docket != docket and self.previous_mutu == mutu:
-                    mean = (255 + 305) / 2  # 280
-                    if self.previous_beban >= mean:
-                        adjustment = random.uniform(-24, -8)  # Turun signifikan
-                    else:
-                        adjustment = random.uniform(8, 24)  # Naik signifikan
-                    new_beban = self.previous_beban + adjustment
-                    # Pastikan tetap dalam range
-                    new_beban = max(255, min(new_beban, 305))
-                
-                # Skenario 4: Docket berbeda & mutu berbeda
-                elif self.previous_docket != docket and self.previous_mutu != mutu:
-                    new_beban = random.uniform(255, 305)
-                    
-                else:
-                    # Fallback (seharusnya tidak terjadi)
-                    new_beban = random.uniform(255, 305)
-                # Update tracking variables
-                self.previous_docket = str(docket) if docket is not None else None
-                self.previous_beban = new_beban
-                
-                return f"{new_beban:.2f}"
-            else:
-                # Umur selain 7 atau 28
-                return "0.00"
+        Returns:
+            Dictionary column key -> list nilai cell mulai start_row
+        """
+        if self.sheet is None:
+            raise RuntimeError("Sheet belum dimuat. Jalankan load_excel() terlebih dahulu.")
         
-        elif "Class D" in mutu:
-        # Logika perhitungan berdasarkan UMUR
-            if umur == 7:
-                random_beban = random.uniform(165.12, 215.34)
-                return f"{random_beban:.2f}"        
-            elif umur == 28:
-                # Umur 28 hari dengan logika khusus
-                # Skenario 1: Kondisi awal (docket & beban sebelumnya = 0.0 atau None)
-                if (self.previous_docket is None or self.previous_docket == 0.0 or 
-                    self.previous_beban is None or self.previous_beban == 0.0):
-                    new_beban = random.uniform(255, 305)
-                
-                # Skenario 2: Docket sama & beban != 0
-                elif self.previous_docket == docket and self.previous_beban != None:
-                    mean = (255 + 305) / 2  # 280
-                    if self.previous_beban >= mean:
-                        adjustment = random.uniform(-29, -3)  # Turun
-                    else:
-                        adjustment = random.uniform(3, 29)  # Naik
-                    new_beban = max(255, min(self.previous_beban + adjustment, 305))
-                # Skenario 3: Docket berbeda & mutu sama
-                elif self.previous_docket != docket and self.previous_mutu == mutu:
-                    mean = (255 + 305) / 2  # 280
-                    if self.previous_beban >= mean:
-                        adjustment = random.uniform(-24, -8)  # Turun signifikan
-                    else:
-                        adjustment = random.uniform(8, 24)  # Naik signifikan
-                    new_beban = self.previous_beban + adjustment
-                    # Pastikan tetap dalam range
-                    new_beban = max(255, min(new_beban, 305))
-                
-                # Skenario 4: Docket berbeda & mutu berbeda
-                elif self.previous_docket != docket and self.previous_mutu != mutu:
-                    new_beban = random.uniform(255, 305)
-                    
-                else:
-                    # Fallback (seharusnya tidak terjadi)
-                    new_beban = random.uniform(255, 305)
-                # Update tracking variables
-                self.previous_docket = str(docket) if docket is not None else None
-                self.previous_beban = new_beban
-                
-                return f"{new_beban:.2f}"
-            else:
-                # Umur selain 7 atau 28
-                return "0.00"
-
-        elif "K-125" in mutu:
-        # Logika perhitungan berdasarkan UMUR
-            if umur == 7:
-                random_beban = random.uniform(120.12, 165.34)
-                return f"{random_beban:.2f}"        
-            elif umur == 28:
-                # Umur 28 hari dengan logika khusus
-                # Skenario 1: Kondisi awal (docket & beban sebelumnya = 0.0 atau None)
-                if (self.previous_docket is None or self.previous_docket == 0.0 or 
-                    self.previous_beban is None or self.previous_beban == 0.0):
-                    new_beban = random.uniform(180, 280)
-                
-                # Skenario 2: Docket sama & beban != 0
-                elif self.previous_docket == docket and self.previous_beban != None:
-                    mean = (180 + 280) / 2
-                    if self.previous_beban >= mean:
-                        adjustment = random.uniform(-11, -3)  # Turun
-                    else:
-                        adjustment = random.uniform(3, 11)  # Naik
-                    new_beban = max(180, min(self.previous_beban + adjustment, 280))
-                # Skenario 3: Docket berbeda
-                elif self.previous_docket != docket:
-                    mean = (180 + 280) / 2
-                    if self.previous_beban >= mean:
-                        adjustment = random.uniform(-48, -38)  # Turun signifikan
-                    else:
-                        adjustment = random.uniform(38, 48)  # Naik signifikan
-                    new_beban = self.previous_beban + adjustment
-                    # Pastikan tetap dalam range
-                    new_beban = max(180, min(new_beban, 280))
-                
-                # Skenario 4: Docket berbeda & mutu berbeda
-                elif self.previous_docket != docket and self.previous_mutu != mutu:
-                    new_beban = random.uniform(180, 280)
-                    
-                else:
-                    # Fallback (seharusnya tidak terjadi)
-                    new_beban = random.uniform(180, 280)
-                # Update tracking variables
-                self.previous_docket = str(docket) if docket is not None else None
-                self.previous_beban = new_beban
-                
-                return f"{new_beban:.2f}"
-            else:
-                # Umur selain 7 atau 28
-                return "0.00"
-            
-        elif "Fc-10" in mutu:
-        # Logika perhitungan berdasarkan UMUR
-            if umur == 7:
-                random_beban = random.uniform(120.12, 165.34)
-                return f"{random_beban:.2f}"        
-            elif umur == 28:
-                # Umur 28 hari dengan logika khusus
-                # Skenario 1: Kondisi awal (docket & beban sebelumnya = 0.0 atau None)
-                if (self.previous_docket is None or self.previous_docket == 0.0 or 
-                    self.previous_beban is None or self.previous_beban == 0.0):
-                    new_beban = random.uniform(180, 280)
-                
-                # Skenario 2: Docket sama & beban != 0
-                elif self.previous_docket == docket and self.previous_beban != None:
-                    mean = (180 + 280) / 2
-                    if self.previous_beban >= mean:
-                        adjustment = random.uniform(-11, -3)  # Turun
-                    else:
-                        adjustment = random.uniform(3, 11)  # Naik
-                    new_beban = max(180, min(self.previous_beban + adjustment, 280))
-                # Skenario 3: Docket berbeda
-                elif self.previous_docket != docket:
-                    mean = (180 + 280) / 2
-                    if self.previous_beban >= mean:
-                        adjustment = random.uniform(-48, -38)  # Turun signifikan
-                    else:
-                        adjustment = random.uniform(38, 48)  # Naik signifikan
-                    new_beban = self.previous_beban + adjustment
-                    # Pastikan tetap dalam range
-                    new_beban = max(180, min(new_beban, 280))
-                
-                # Skenario 4: Docket berbeda & mutu berbeda
-                elif self.previous_docket != docket and self.previous_mutu != mutu:
-                    new_beban = random.uniform(180, 280)
-                    
-                else:
-                    # Fallback (seharusnya tidak terjadi)
-                    new_beban = random.uniform(180, 280)
-                # Update tracking variables
-                self.previous_docket = str(docket) if docket is not None else None
-                self.previous_beban = new_beban
-                
-                return f"{new_beban:.2f}"
-            else:
-                # Umur selain 7 atau 28
-                return "0.00"
+        max_row = self.sheet.max_row
+        kolom = {}
+        for kunci in ('DOCKET', 'MUTU', 'UMUR', 'KODE_BENDA_UJI'):
+            col_index = self.column_map[kunci]
+            # Satu kolom per lewatan, hanya nilai (tanpa kolom di antaranya)
+            isi = next(self.sheet.iter_cols(min_col=col_index, max_col=col_index, min_row=start_row,
+                                            max_row=max_row, values_only=True), ())
+            kolom[kunci] = list(isi)
+        return kolom
 
-        elif "Class E-1" in mutu:
-        # Logika perhitungan berdasarkan UMUR
-            if umur == 7:
-                random_beban = random.uniform(120.12, 165.34)
-                return f"{random_beban:.2f}"        
-            elif umur == 28:
-                # Umur 28 hari dengan logika khusus
-                # Skenario 1: Kondisi awal (docket & beban sebelumnya = 0.0 atau None)
-                if (self.previous_docket is None or self.previous_docket == 0.0 or 
-                    self.previous_beban is None or self.previous_beban == 0.0):
-                    new_beban = random.uniform(180, 280)
-                
-                # Skenario 2: Docket sama & beban != 0
-                elif self.previous_docket == docket and self.previous_beban != None:
-                    mean = (180 + 280) / 2
-                    if self.previous_beban >= mean:
-                        adjustment = random.uniform(-11, -3)  # Turun
-                    else:
-                        adjustment = random.uniform(3, 11)  # Naik
-                    new_beban = max(180, min(self.previous_beban + adjustment, 280))
-                # Skenario 3: Docket berbeda
-                elif self.previous_docket != docket:
-                    mean = (180 + 280) / 2
-                    if self.previous_beban >= mean:
-                        adjustment = random.uniform(-48, -38)  # Turun signifikan
-                    else:
-                        adjustment = random.uniform(38, 48)  # Naik signifikan
-                    new_beban = self.previous_beban + adjustment
-                    # Pastikan tetap dalam range
-                    new_beban = max(180, min(new_beban, 280))
-                
-                # Skenario 4: Docket berbeda & mutu berbeda
-                elif self.previous_docket != docket and self.previous_mutu != mutu:
-                    new_beban = random.uniform(180, 280)
-                    
-                else:
-                    # Fallback (seharusnya tidak terjadi)
-                    new_beban = random.uniform(180, 280)
-                # Update tracking variables
-                self.previous_docket = str(docket) if docket is not None else None
-                self.previous_beban = new_beban
-                
-                return f"{new_beban:.2f}"
-            else:
-                # Umur selain 7 atau 28
-                return "0.00"
+    def calculate_columns(self, kolom: dict) -> list:
+        """
+        Menghitung BEBAN untuk kolom yang sudah dibaca (sheet atau data di memori)
         
-        else:
-            # Default fallback jika mutu tidak dikenali
-            return "0.00"
-    
-
-
+        Args:
+            kolom: Dictionary column key -> list nilai, minimal DOCKET, MUTU dan UMUR
+            
+        Returns:
+            List nilai BEBAN per baris (None = sel tidak ditulis)
+        """
+        hasil, (self.previous_docket, self.previous_beban) = beban_engine.hitung_beban(
+            kolom['DOCKET'], kolom['MUTU'], kolom['UMUR'],
+            keadaan=(self.previous_docket, self.previous_beban), aturan=self.aturan,
+            konteks=self.konteks
+        )
+        return hasil
 
     def process_all_rows(self, start_row: int = 2) -> None:
         """
         Memproses semua baris di Excel
         
+        Kolom dibaca sekali, BEBAN dihitung per kolom oleh beban_engine
+        (hasil sama dengan calculate_beban per baris), lalu kolom BEBAN
+        ditulis dalam satu kali lewat.
+        
         Args:
             start_row: Baris awal data (default: 2, asumsi baris 1 adalah header)
         """
@@ -893,14 +224,26 @@ class ExcelBebanProcessor:
         max_row = self.sheet.max_row
         print(f"Memulai proses perhitungan untuk {max_row - start_row + 1} baris...")
         
+        hasil = self.calculate_columns(self.read_columns(start_row))
+        
+        col_beban = self.column_map['BEBAN']
         count = 0
-        for row in range(start_row, max_row + 1):
-            beban = self.calculate_beban(row)
+        for row, beban in enumerate(hasil, start=start_row):
             if beban:
-                self.set_cell_value(row, 'BEBAN', beban)
+                self.sheet.cell(row=row, column=col_beban).value = beban
                 count += 1
                 
-        print(f"✓ Selesai! {count} baris telah diperbarui.")
+        self.record_seed()
+        print(f"✓ Selesai! {count} baris telah diperbarui (seed {self.konteks.seed}).")
+    
+    def record_seed(self) -> None:
+        """Mencatat seed acak di properti workbook ('seed_beban') untuk audit"""
+        if self.workbook is None:
+            return
+        props = self.workbook.custom_doc_props
+        if 'seed_beban' in props.names:
+            del props['seed_beban']
+        props.append(StringProperty(name='seed_beban', value=str(self.konteks.seed)))
     
     def save_excel(self, output_path: Optional[str] = None) -> bool:
         """
@@ -0,0 +1,172 @@
+"""
+Pembacaan workbook besar (RENCANA, LPH, PENGUJIAN) tanpa memuat semua cell
+
+openpyxl.load_workbook mode penuh membuat objek untuk setiap cell di setiap
+sheet walaupun yang dipakai hanya beberapa kolom. PembacaExcel membaca satu
+sheet baris demi baris (read_only=True, atau python-calamine bila terpasang
+dan yang dibutuhkan nilai hasil rumus), mencari kolom berdasarkan nama
+header dan hanya menyimpan nilai kolom yang diminta:
+
+    with PembacaExcel(path, "bjdt_id", data_only=True) as pembaca:
+        for docket, no_urut in pembaca.baris(["Docket", "No URUT"], tipe={"Docket": teks}):
+            ...
+"""
+from datetime import date, datetime
+
+import openpyxl
+
+try:
+    from python_calamine import CalamineWorkbook
+except ImportError:
+    CalamineWorkbook = None
+
+
+class ExcelStreamError(ValueError):
+    """Raised when a requested column is missing or a value cannot be converted"""
+
+
+def teks(nilai):
+    """Cell value as stripped text, None for an empty cell"""
+    nilai = str(nilai).strip()
+    return nilai or None
+
+
+def _nilai_calamine(nilai):
+    # Samakan dengan openpyxl: sel kosong None, angka bulat int, tanggal datetime
+    if nilai == "":
+        return None
+    if isinstance(nilai, float) and nilai.is_integer():
+        return int(nilai)
+    if type(nilai) is date:
+        return datetime(nilai.year, nilai.month, nilai.day)
+    return nilai
+
+
+class PembacaExcel:
+    """One sheet read row by row, columns selected by header name"""
+
+    def __init__(self, path, sheet, data_only=False, header_row=1, engine="auto"):
+        """
+        Args:
+            path: Excel file
+            sheet: Sheet name
+            data_only: True = cached formula results, False = formulas as written
+            header_row: Row (1-based) holding the column names
+            engine: "openpyxl", "calamine" or "auto" (calamine when installed and data_only)
+
+        Raises:
+            KeyError: sheet not found
+            ExcelStreamError: calamine requested but not usable
+        """
+        if engine == "auto":
+            engine = "calamine" if CalamineWorkbook is not None and data_only else "openpyxl"
+        if engine == "calamine" and (CalamineWorkbook is None or not data_only):
+            # calamine hanya membaca nilai hasil rumus
+            raise ExcelStreamError("engine calamine butuh python-calamine dan data_only=True")
+        self.path = path
+        self.sheet = sheet
+        self.engine = engine
+        self._wb = None
+        self._baris = self._buka(data_only, header_row)
+        self.header = list(next(self._baris, ()))
+        self.header_row = header_row
+
+    def _buka(self, data_only, header_row):
+        """Row iterator starting at header_row"""
+        if self.engine == "calamine":
+            wb = CalamineWorkbook.from_path(self.path)
+            if self.sheet not in wb.sheet_names:
+                raise KeyError(f"Worksheet {self.sheet} does not exist.")
+            self._wb = wb
+            ws = wb.get_sheet_by_name(self.sheet)
+            # Baris calamine dimulai di kolom pertama yang terisi; geser ke kolom A seperti openpyxl
+            kosong = (None,) * (ws.start[1] if ws.start else 0)
+            baris = ws.iter_rows()
+            for _ in range(header_row - 1):
+                next(baris, None)
+            return (kosong + tuple(_nilai_calamine(v) for v in isi) for isi in baris)
+
+        self._wb = openpyxl.load_workbook(self.path, read_only=True, data_only=data_only)
+        try:
+            ws = self._wb[self.sheet]
+        except KeyError:
+            self.close()
+            raise
+        return ws.iter_rows(min_row=header_row, values_only=True)
+
+    def indeks(self, kolom, wajib=True):
+        """
+        0-based positions of the named columns in the header
+
+        Args:
+            kolom: Column names
+            wajib: True = missing column raises, False = missing columns are left out
+
+        Returns:
+            Dictionary name -> position, in the order of `kolom`
+        """
+        posisi = {}
+        for i, nama in enumerate(self.header):
+            if isinstance(nama, str):
+                nama = nama.strip()
+            posisi.setdefault(nama, i)
+        hilang = [k for k in kolom if k not in posisi]
+        if hilang and wajib:
+            raise ExcelStreamError(f"Kolom tidak ditemukan di sheet {self.sheet}: {', '.join(map(str, hilang))}")
+        return {k: posisi[k] for k in kolom if k in posisi}
+
+    def baris(self, kolom, tipe=None):
+        """
+        Data rows (after the header) with only the requested columns
+
+        Consumes the sheet: a reader yields its rows once.
+
+        Args:
+            kolom: Column names, all must exist
+            tipe: Optional dictionary name -> converter applied to non-empty values
+
+        Yields:
+            Tuple of values in the order of `kolom`
+
+        Raises:
+            ExcelStreamError: missing column or converter failure (with row number)
+        """
+        posisi = list(self.indeks(kolom).values())
+        tipe = tipe or {}
+        konversi = [(j, k, tipe[k]) for j, k in enumerate(kolom) if k in tipe]
+        for nomor, isi in enumerate(self._baris, start=self.header_row + 1):
+            nilai = [isi[i] if i < len(isi) else None for i in posisi]
+            for j, nama, fungsi in konversi:
+                if nilai[j] is None:
+                    continue
+                try:
+                    nilai[j] = fungsi(nilai[j])
+                except (TypeError, ValueError) as e:
+                    raise ExcelStreamError(f"Baris {nomor}, kolom {nama}: nilai {nilai[j]!r} tidak valid ({e})")
+            yield tuple(nilai)
+
+    def kolom(self, kolom, tipe=None):
+        """
+        Requested columns as lists (columnar form of baris())
+
+        Returns:
+            Dictionary name -> list of values, one per data row
+        """
+        hasil = {k: [] for k in kolom}
+        daftar = [hasil[k] for k in kolom]
+        for isi in self.baris(kolom, tipe):
+            for tujuan, nilai in zip(daftar, isi):
+                tujuan.append(nilai)
+        return hasil
+
+    def close(self):
+        """Close the workbook file handle"""
+        if self._wb is not None and hasattr(self._wb, "close"):
+            self._wb.close()
+        self._wb = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -1,7 +1,7 @@
-import datetime
 import logging
 import sys
 import os
+import threading
 import time
 
 # Add project root to sys.path so we can import from modules
@@ -11,6 +11,7 @@ import wx
 import wx.adv
 
 from modules import db_controller as dbctrl
+from modules import db_pool
 
 logging.basicConfig(
     level=logging.DEBUG,
@@ -19,6 +20,195 @@ logging.basicConfig(
 )
 
 
+class CacheGrid:
+    """
+    Columnar store of grid rows, formatted to text only when asked
+
+    Rows are kept as one list per column instead of one tuple per row, and
+    nothing is converted to a string until the list control paints a cell.
+    """
+
+    JUMLAH_KOLOM = 12
+
+    def __init__(self):
+        self.kosongkan()
+
+    def kosongkan(self):
+        """Drop all rows"""
+        self._kolom = [[] for _ in range(self.JUMLAH_KOLOM)]
+
+    def tambah(self, halaman):
+        """
+        Append a page of rows (db_controller.KOLOM_GRID order)
+
+        Args:
+            halaman: List of row tuples
+        """
+        for i, nilai in enumerate(zip(*halaman)):
+            self._kolom[i].extend(nilai)
+
+    def __len__(self):
+        return len(self._kolom[0])
+
+    def teks(self, baris, kolom):
+        """
+        Display text of one cell
+
+        Args:
+            baris: Row index
+            kolom: Column index of lstBendaUji
+
+        Returns:
+            String
+        """
+        if kolom == 0:
+            # Kolom NO adalah nomor urut tampilan, bukan idpengujian
+            return str(baris + 1)
+        nilai = self._kolom[kolom][baris]
+        if nilai is None:
+            return ""
+        if kolom == 1:
+            try:
+                return nilai.strftime("%d/%m/%Y")
+            except AttributeError:
+                return str(nilai)
+        if kolom == 2:
+            return str(nilai).strip()
+        return str(nilai)
+
+
+class PencariGrid(threading.Thread):
+    """
+    Background grid search: fetches keyset pages and hands them to the panel
+
+    The first page is fetched right away, then the totals, then further
+    pages only while the cache is less than PREFETCH pages ahead of the row
+    the user has scrolled to (see minta()). Every result is delivered with
+    wx.CallAfter and tagged with the search generation, so pages of a search
+    the user has already replaced are dropped by the panel.
+    """
+
+    # Jumlah halaman yang diambil lebih dulu di depan baris yang terlihat
+    PREFETCH = 2
+
+    def __init__(self, panel, generasi, paramList, ukuran=dbctrl.UKURAN_HALAMAN):
+        threading.Thread.__init__(self, name="PencariGrid", daemon=True)
+        self.panel = panel
+        self.generasi = generasi
+        self.paramList = paramList
+        self.ukuran = ukuran
+        self._stop_event = threading.Event()
+        self._lanjut = threading.Event()
+        self._lock = threading.Lock()
+        self._konekdb = None
+        self._target = ukuran * self.PREFETCH
+
+    def minta(self, baris):
+        """Ask for rows up to `baris` (plus the prefetch margin) to be loaded"""
+        with self._lock:
+            target = baris + 1 + self.ukuran * self.PREFETCH
+            if target <= self._target:
+                return
+            self._target = target
+        self._lanjut.set()
+
+    def stop(self):
+        """Stop the search and cancel the query currently running on the server"""
+        self._stop_event.set()
+        self._lanjut.set()
+        with self._lock:
+            if self._konekdb is not None:
+                try:
+                    self._konekdb.cancel()
+                except Exception as e:
+                    logging.debug(f"Pembatalan query grid gagal: {e}")
+
+    def is_stopped(self):
+        return self._stop_event.is_set()
+
+    def _jalankan(self, fungsi, *args, **kwargs):
+        """Run one query on a pooled connection that stop() can cancel"""
+        with db_pool.connection() as konekdb:
+            with self._lock:
+                self._konekdb = konekdb
+            try:
+                return fungsi(*args, konekdb=konekdb, **kwargs)
+            finally:
+                with self._lock:
+                    self._konekdb = None
+
+    def run(self):
+        mulai = time.perf_counter()
+        dimuat = 0
+        kunci = None
+        try:
+            while not self.is_stopped():
+                with self._lock:
+                    cukup = dimuat >= self._target
+                    if cukup:
+                        self._lanjut.clear()
+                if cukup:
+                    self._lanjut.wait()
+                    continue
+
+                halaman = self._jalankan(dbctrl.queryGridHalaman, self.paramList, kunci, self.ukuran)
+                if self.is_stopped():
+                    return
+                dimuat += len(halaman)
+                wx.CallAfter(self.panel.terimaHalaman, self.generasi, halaman, time.perf_counter() - mulai)
+
+                if kunci is None:
+                    # Halaman pertama sudah tampil; total (dari ringkasan_harian) untuk scrollbar
+                    ringkasan = self._jalankan(dbctrl.ringkasanGrid, self.paramList)
+                    if self.is_stopped():
+                        return
+                    wx.CallAfter(self.panel.terimaRingkasan, self.generasi, ringkasan)
+
+                if len(halaman) < self.ukuran:
+                    break
+                kunci = dbctrl.kunciHalaman(halaman[-1])
+            if not self.is_stopped():
+                wx.CallAfter(self.panel.selesaiCari, self.generasi, time.perf_counter() - mulai)
+        except Exception as e:
+            if self.is_stopped():
+                # Query dibatalkan karena filter berubah
+                logging.debug(f"Pencarian grid generasi {self.generasi} dibatalkan: {e}")
+                return
+            logging.error("Error pada saat menjalankan pencarian grid : %s", str(e))
+            wx.CallAfter(self.panel.gagalCari, self.generasi, str(e))
+
+
+class ListBendaUji(wx.ListCtrl):
+    """Virtual report list; cells are read from a CacheGrid while painting"""
+
+    def __init__(self, parent, cache):
+        wx.ListCtrl.__init__(
+            self, parent, wx.ID_ANY, wx.DefaultPosition, wx.DefaultSize,
+            wx.LC_REPORT | wx.LC_VIRTUAL
+        )
+        self.cache = cache
+        # Dipanggil dengan nomor baris yang terlihat tetapi belum dimuat
+        self.saatKurang = None
+
+    def OnGetItemText(self, item, col):
+        try:
+            return self.cache.teks(item, col)
+        except IndexError:
+            if self.saatKurang is not None:
+                self.saatKurang(item)
+            return ""
+
+    def muatUlang(self, jumlah=None):
+        """
+        Resize the list and repaint
+
+        Args:
+            jumlah: Total rows of the search (default: rows in the cache)
+        """
+        self.SetItemCount(len(self.cache) if jumlah is None else max(jumlah, len(self.cache)))
+        self.Refresh()
+
+
 class GridBendaUji(wx.Panel):
     def __init__(self, parent):
         logging.info("Inisialisasi Aplikasi Pengendali Alat Penguji Tekanan")
@@ -69,7 +259,7 @@ class GridBendaUji(wx.Panel):
         )
         self.lblKosong1.Wrap(-1)
         self.lblKosong1.SetMinSize(wx.Size(50, -1))
-        rbSinkronChoices = ["Semua", "Belum", "Sinkron"]
+        rbSinkronChoices = list(dbctrl.STATUS_SINKRON)
         self.rbSinkron = wx.RadioBox(
             self,
             wx.ID_ANY,
@@ -77,7 +267,7 @@ class GridBendaUji(wx.Panel):
             wx.DefaultPosition,
             wx.DefaultSize,
             rbSinkronChoices,
-            3,
+            len(rbSinkronChoices),
             wx.RA_SPECIFY_COLS,
         )
         self.rbSinkron.SetSelection(0)
@@ -104,9 +294,8 @@ class GridBendaUji(wx.Panel):
 
         sizerBoxList = wx.BoxSizer(wx.VERTICAL)
 
-        self.lstBendaUji = wx.ListCtrl(
-            self, wx.ID_ANY, wx.DefaultPosition, wx.DefaultSize, wx.LC_REPORT
-        )
+        self.cache = CacheGrid()
+        self.lstBendaUji = ListBendaUji(self, self.cache)
         self.lstBendaUji.SetMinSize(wx.Size(-1, 450))
 
         # idpengujian, tgluji, nodocket, nourutbenda, bujnama, umur,
@@ -173,14 +362,31 @@ class GridBendaUji(wx.Panel):
         )
         self.txtJumlahBenda.SetToolTipString("Berat bersih benda uji")
         sizerFlexsum.Add(self.txtJumlahBenda, 0, wx.ALL | wx.ALIGN_CENTER_VERTICAL, 5)
+        self.lblStatusCari = wx.StaticText(
+            self, wx.ID_ANY, wx.EmptyString, wx.DefaultPosition, wx.DefaultSize, 0
+        )
+        sizerFlexsum.Add(self.lblStatusCari, 0, wx.ALL | wx.ALIGN_CENTER_VERTICAL, 5)
+        self.lblRingkasan = wx.StaticText(
+            self, wx.ID_ANY, wx.EmptyString, wx.DefaultPosition, wx.DefaultSize, 0
+        )
+        sizerFlexsum.Add(self.lblRingkasan, 0, wx.ALL | wx.ALIGN_CENTER_VERTICAL, 5)
 
         sizerBoxUtama.Add(sizerFlexsum, 1, wx.ALL | wx.EXPAND, 5)
 
         self.SetSizer(sizerBoxUtama)
         self.Layout()
 
+        self._generasi = 0
+        self._pencari = None
+        self._jumlahCari = None
+
         # Connect Events
         self.btnCari.Bind(wx.EVT_BUTTON, self.cariSelect)
+        # Filter berubah: pencarian yang sedang berjalan dibatalkan dan diganti
+        self.tglAwal.Bind(wx.adv.EVT_DATE_CHANGED, self.cariSelect)
+        self.tglAkhir.Bind(wx.adv.EVT_DATE_CHANGED, self.cariSelect)
+        self.rbSinkron.Bind(wx.EVT_RADIOBOX, self.cariSelect)
+        self.Bind(wx.EVT_WINDOW_DESTROY, self.saatDitutup)
 
     # Virtual event handlers, overide them in your derived class
     def cariSelect(self, paramList):
@@ -192,57 +398,83 @@ class GridBendaUji(wx.Panel):
         tglAkhir = str(self.tglAkhir.GetValue())
         tglAkhirNya = time.strptime(tglAkhir, "%c")
         paramList.append(time.strftime("%Y-%m-%d", tglAkhirNya))
-        s = self.rbSinkron.GetSelection()
-        if s == 0:
-            paramList.append("%")
-        elif s == 1:
-            paramList.append("B")
-        else:
-            paramList.append("S")
-        hasilCari = dbctrl.queryGrid(paramList)
-        if hasilCari is None:
-            hasilCari = []
-
-        self.lstBendaUji.DeleteAllItems()
-        for i, r in enumerate(hasilCari, start=1):
-            # idpengujian, tgluji, nodocket, nourutbenda, bujnama, umur,
-            # nilaikn,  bebanmpa, kuattekan, beratbenda, tiperetak, sinkron
-            
-            # PERBAIKAN: Ganti sys.maxsize dengan GetItemCount() untuk mendapatkan index yang valid
-            # Ini akan menambahkan item di akhir list tanpa menyebabkan error
-            index = self.lstBendaUji.InsertStringItem(self.lstBendaUji.GetItemCount(), str(i))
-            
-            # Format tanggal
-            try:
-                date1 = datetime.datetime.strptime(str(r[1]), "%Y-%m-%d")
-                date2 = datetime.datetime.strftime(date1, "%d/%m/%Y")
-                self.lstBendaUji.SetStringItem(index, 1, date2)
-            except (ValueError, TypeError) as e:
-                logging.warning(f"Error parsing date {r[1]}: {e}")
-                self.lstBendaUji.SetStringItem(index, 1, str(r[1]))
-            
-            # Set data lainnya dengan error handling
-            try:
-                docketnya = str(r[2]).strip() if r[2] is not None else ""
-                self.lstBendaUji.SetStringItem(index, 2, docketnya)
-                self.lstBendaUji.SetStringItem(index, 3, str(r[3]) if r[3] is not None else "")
-                self.lstBendaUji.SetStringItem(index, 4, str(r[4]) if r[4] is not None else "")
-                self.lstBendaUji.SetStringItem(index, 5, str(r[5]) if r[5] is not None else "")
-                self.lstBendaUji.SetStringItem(index, 6, str(r[6]) if r[6] is not None else "")
-                self.lstBendaUji.SetStringItem(index, 7, str(r[7]) if r[7] is not None else "")
-                self.lstBendaUji.SetStringItem(index, 8, str(r[8]) if r[8] is not None else "")
-                self.lstBendaUji.SetStringItem(index, 9, str(r[9]) if r[9] is not None else "")
-                self.lstBendaUji.SetStringItem(index, 10, str(r[10]) if r[10] is not None else "")
-                self.lstBendaUji.SetStringItem(index, 11, str(r[11]) if r[11] is not None else "")
-            except (IndexError, TypeError) as e:
-                logging.error(f"Error setting list item data: {e}")
-                continue
-
-        if hasilCari:
-            self.txtJumlahBenda.SetValue(str(len(hasilCari)))
-        else:
-            self.txtJumlahBenda.SetValue("0")
+        s = self.rbSinkron.GetStringSelection()
+        paramList.append(dbctrl.STATUS_SINKRON[s])
+        self.mulaiCari(paramList)
+
+    def mulaiCari(self, paramList):
+        """Cancel the running search and start a new one on a worker thread"""
+        self._hentikanPencari()
+        self._generasi += 1
+        self._jumlahCari = None
+        self.cache.kosongkan()
+        self.lstBendaUji.muatUlang()
+        self.txtJumlahBenda.SetValue("")
+        self.lblStatusCari.SetLabel("Mencari...")
+        self.lblRingkasan.SetLabel("")
+        self._pencari = PencariGrid(self, self._generasi, paramList)
+        self.lstBendaUji.saatKurang = self._pencari.minta
+        self._pencari.start()
+
+    def _hentikanPencari(self):
+        if self._pencari is not None:
+            self._pencari.stop()
+            self._pencari = None
+        self.lstBendaUji.saatKurang = None
+
+    def terimaHalaman(self, generasi, halaman, durasi):
+        """One page arrived from PencariGrid (UI thread)"""
+        if not self or generasi != self._generasi:
+            return
+        self.cache.tambah(halaman)
+        self.lstBendaUji.muatUlang(self._jumlahCari)
+        self._tampilkanStatus(durasi)
+
+    def terimaRingkasan(self, generasi, ringkasan):
+        """Totals of the search arrived (UI thread)"""
+        if not self or generasi != self._generasi or ringkasan is None:
+            return
+        jumlah = ringkasan["jumlah"]
+        self._jumlahCari = jumlah
+        self.txtJumlahBenda.SetValue(str(jumlah))
+        rata2 = "-" if ringkasan["rata2_mpa"] is None else str(ringkasan["rata2_mpa"])
+        self.lblRingkasan.SetLabel(
+            f"Sinkron {ringkasan['sinkron']}, belum {ringkasan['belum']}, gagal {ringkasan['gagal']}, "
+            f"rata-rata {rata2} MPa"
+        )
+        self.lstBendaUji.muatUlang(jumlah)
+
+    def selesaiCari(self, generasi, durasi):
+        """All rows of the search are loaded (UI thread)"""
+        if not self or generasi != self._generasi:
+            return
+        self._jumlahCari = len(self.cache)
+        self.txtJumlahBenda.SetValue(str(len(self.cache)))
+        self.lstBendaUji.muatUlang()
+        self._tampilkanStatus(durasi)
+
+    def gagalCari(self, generasi, pesanError):
+        """The search failed (UI thread)"""
+        if not self or generasi != self._generasi:
+            return
+        self.lblStatusCari.SetLabel("Pencarian gagal")
+        dlg = wx.MessageDialog(
+            None, pesanError, "Error Koneksi Database", wx.OK | wx.ICON_INFORMATION
+        )
+        dlg.ShowModal()
+        dlg.Destroy()
+
+    def _tampilkanStatus(self, durasi):
+        jumlah = "?" if self._jumlahCari is None else str(self._jumlahCari)
+        self.lblStatusCari.SetLabel(
+            f"{len(self.cache)} dari {jumlah} baris dimuat, {durasi * 1000:.0f} ms"
+        )
+        self.Layout()
 
+    def saatDitutup(self, event):
+        if event.GetEventObject() is self:
+            self._hentikanPencari()
+        event.Skip()
 
 if __name__ == '__main__':
     app = wx.App(False)
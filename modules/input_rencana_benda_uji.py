@@ -23,6 +23,7 @@ from modules.data_generators import (
     calculate_jam_sample
 )
 from modules.excel_handler import ExcelDataProcessor
+from modules.acak import KonteksAcak, kunci_docket
 
 # Setup logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(funcName)s : %(lineno)d - %(message)s')
@@ -84,8 +85,13 @@ def fill_proyek_form(driver, wait, row_data):
     tgl_field.clear()
     tgl_field.send_keys(tgl_mulai_prod)
 
-def fill_docket_form(driver, wait, row_data):
-    """Fill docket form using Excel data"""
+def fill_docket_form(driver, wait, row_data, konteks=None):
+    """
+    Fill docket form using Excel data
+
+    Args:
+        konteks: KonteksAcak of the run for slump/yield/jam sample (None = unseeded)
+    """
     # No. Docket field - from Excel column 2 (index 1)
     wait_for_loading_overlay_to_disappear(driver, wait)
     no_docket = str(row_data.iloc[1]) if len(row_data) > 1 else "None"
@@ -146,8 +152,10 @@ def fill_docket_form(driver, wait, row_data):
     (value for key, value in slump_mapping.items() if key in slump_value),
     "default_value"  # fallback if no match
     )
-    slump_test = generate_random_slump_test(slump_rencana)
-    yield_value = generate_random_yield()
+    # Satu generator per (docket, baris Excel): hasil sama di setiap percobaan ulang dan bisa diulang dari seed
+    rng = konteks.baru(kunci_docket(no_docket), row_data.name) if konteks else None
+    slump_test = generate_random_slump_test(slump_rencana, rng)
+    yield_value = generate_random_yield(rng)
     nama_teknisi = str(row_data.iloc[4]) if len(row_data) > 4 else "TEKNISI"  # Column 5 (index 4)
     # Try to extract base_jam from web
     try:
@@ -158,7 +166,7 @@ def fill_docket_form(driver, wait, row_data):
     except Exception as e:
         logger.warning(f"Could not extract base_jam from web, falling back to Excel. Error: {e}")
         base_jam = str(row_data.iloc[8]) if len(row_data) > 8 else "10:30"  # Column 9 (index 8)
-    jam_sample = calculate_jam_sample(base_jam)
+    jam_sample = calculate_jam_sample(base_jam, rng)
     logger.info(f"Calculated jam_sample: {jam_sample}")
     base_xpath = "/html/body/div[2]/div/div/div[2]/div/div/div[2]/div[1]/div[2]/"
     form_fields = [
@@ -386,7 +394,7 @@ def create_form(wait):
     logger.info("Create button found, clicking...")
     create_button.click()
 
-def duplicate_form(driver, wait, next_row_data, stop_event=None):
+def duplicate_form(driver, wait, next_row_data, stop_event=None, konteks=None):
     """Duplicate form for next entry with same kode_benda_uji and proyek"""
     wait_for_loading_overlay_to_disappear(driver, wait)
     logger.info("Duplicating Rencana Benda Uji...")
@@ -399,18 +407,18 @@ def duplicate_form(driver, wait, next_row_data, stop_event=None):
     time.sleep(2)
     # Update the duplicated form with next row data
     logger.info("Updating duplicated form with next row data...")
-    fill_docket_form(driver, wait, next_row_data)
+    fill_docket_form(driver, wait, next_row_data, konteks)
     logger.info("Input data to the table row using Excel data")
     if stop_event and stop_event.is_set():
         driver.quit()
         return
     add_table_rows(driver, wait, next_row_data, stop_event=stop_event)
 
-def alternative_form(driver, wait, next_row_data, stop_event=None):
+def alternative_form(driver, wait, next_row_data, stop_event=None, konteks=None):
     # Update the duplicated form with next row data
     wait_for_loading_overlay_to_disappear(driver, wait)
     logger.info("Updating duplicated form with next row data...")
-    fill_docket_form(driver, wait, next_row_data)
+    fill_docket_form(driver, wait, next_row_data, konteks)
     logger.info("Input data to the table row using Excel data")
     if stop_event and stop_event.is_set():
         driver.quit()
@@ -425,7 +433,8 @@ def refresh_and_wait(driver, wait):
     wait_for_loading_overlay_to_disappear(driver, wait)
     time.sleep(2)
 
-def process_excel_row_with_retry(driver, wait, excel_processor, row_data, row_index, max_retries=3, stop_event=None):
+def process_excel_row_with_retry(driver, wait, excel_processor, row_data, row_index, max_retries=3, stop_event=None,
+                                 konteks=None):
     """Process single Excel row with retry logic for click intercepted errors"""
     no_docket = row_data.get('No. Docket', 'Unknown')
     logger.info(f"Processing Excel row {row_index + 1} - No. Docket: {no_docket}")
@@ -441,7 +450,7 @@ def process_excel_row_with_retry(driver, wait, excel_processor, row_data, row_in
             fill_proyek_form(driver, wait, row_data)
 
             wait_for_loading_overlay_to_disappear(driver, wait)
-            fill_docket_form(driver, wait, row_data)
+            fill_docket_form(driver, wait, row_data, konteks)
 
             wait_for_loading_overlay_to_disappear(driver, wait)
             if stop_event and stop_event.is_set():
@@ -483,7 +492,8 @@ def process_excel_row_with_retry(driver, wait, excel_processor, row_data, row_in
             
     return False, no_docket, "Unknown error after all retries"
 
-def process_duplicate_row_with_retry(driver, wait, next_row_data, next_row_index, max_retries=3, stop_event=None):
+def process_duplicate_row_with_retry(driver, wait, next_row_data, next_row_index, max_retries=3, stop_event=None,
+                                     konteks=None):
     """Process next row using duplicate form with retry logic"""
     no_docket = next_row_data.get('No. Docket', 'Unknown')
     logger.info(f"Processing row {next_row_index + 1} using duplicate form - No. Docket: {no_docket}")
@@ -496,10 +506,10 @@ def process_duplicate_row_with_retry(driver, wait, next_row_data, next_row_index
             # DUA OPSI: duplicate_form atau alternative_form
             if use_duplicate:
                 logger.info(f"Using duplicate_form on attempt {attempt + 1}")
-                duplicate_form(driver, wait, next_row_data, stop_event=stop_event)
+                duplicate_form(driver, wait, next_row_data, stop_event=stop_event, konteks=konteks)
             else:
                 logger.info(f"Using alternative_form on attempt {attempt + 1}")
-                alternative_form(driver, wait, next_row_data, stop_event=stop_event)
+                alternative_form(driver, wait, next_row_data, stop_event=stop_event, konteks=konteks)
             
             # Selalu panggil save_form setelah form processing
             save_form(driver, wait)
@@ -625,7 +635,7 @@ def initialize_components(excel_file_path):
         return None, None
 
 
-def process_all_rows(driver, wait, excel_processor, stop_event=None):
+def process_all_rows(driver, wait, excel_processor, stop_event=None, konteks=None):
     """
     Process all rows from Excel with proper tracking and stop event support
     
@@ -634,6 +644,7 @@ def process_all_rows(driver, wait, excel_processor, stop_event=None):
         wait: WebDriverWait instance
         excel_processor: ExcelDataProcessor instance
         stop_event: threading.Event object for stopping the process (optional)
+        konteks: KonteksAcak of the run, passed down to fill_docket_form (optional)
     
     Returns:
         dict: Results containing successful_rows, failed_rows, skipped_rows, and stopped status
@@ -678,7 +689,7 @@ def process_all_rows(driver, wait, excel_processor, stop_event=None):
             break
         
         success, processed_no_docket, error_message = process_excel_row_with_retry(
-            driver, wait, excel_processor, row_data, row_index, stop_event=stop_event
+            driver, wait, excel_processor, row_data, row_index, stop_event=stop_event, konteks=konteks
         )
         
         # CHECK STOP EVENT after processing
@@ -692,7 +703,7 @@ def process_all_rows(driver, wait, excel_processor, stop_event=None):
             # Handle successful row processing
             row_index = handle_successful_row(
                 driver, wait, excel_processor, results, 
-                row_index, total_rows, processed_no_docket, stop_event
+                row_index, total_rows, processed_no_docket, stop_event, konteks
             )
         else:
             # Handle failed row processing
@@ -722,7 +733,7 @@ def process_all_rows(driver, wait, excel_processor, stop_event=None):
 
 
 def handle_successful_row(driver, wait, excel_processor, results, 
-                         row_index, total_rows, processed_no_docket, stop_event=None):
+                         row_index, total_rows, processed_no_docket, stop_event=None, konteks=None):
     """Handle successful row processing and potential duplicates with stop event support"""
     success_info = create_row_info(row_index + 1, processed_no_docket)
     results['successful_rows'].append(success_info)
@@ -742,7 +753,7 @@ def handle_successful_row(driver, wait, excel_processor, results,
     if row_index + 1 < total_rows:
         return handle_next_row_preparation(
             driver, wait, excel_processor, results, 
-            row_index, total_rows, stop_event
+            row_index, total_rows, stop_event, konteks
         )
     else:
         logger.info("This is the last row - no next action needed")
@@ -751,7 +762,7 @@ def handle_successful_row(driver, wait, excel_processor, results,
 
 
 def handle_next_row_preparation(driver, wait, excel_processor, results, 
-                               row_index, total_rows, stop_event=None):
+                               row_index, total_rows, stop_event=None, konteks=None):
     """Handle preparation for next row and potential duplicate processing with stop event support"""
     
     # CHECK STOP EVENT before preparing next row
@@ -766,7 +777,7 @@ def handle_next_row_preparation(driver, wait, excel_processor, results,
     if next_action == "duplicate":
         return process_duplicate_sequence(
             driver, wait, excel_processor, results, 
-            row_index, total_rows, stop_event
+            row_index, total_rows, stop_event, konteks
         )
     elif next_action == "error":
         logger.error(f"Error preparing for next row after {row_index + 1}")
@@ -775,7 +786,7 @@ def handle_next_row_preparation(driver, wait, excel_processor, results,
 
 
 def process_duplicate_sequence(driver, wait, excel_processor, results, 
-                              row_index, total_rows, stop_event=None):
+                              row_index, total_rows, stop_event=None, konteks=None):
     """Process sequence of duplicate rows with stop event support"""
     current_row = row_index
     
@@ -805,7 +816,7 @@ def process_duplicate_sequence(driver, wait, excel_processor, results,
             break
         
         duplicate_success, duplicate_no_docket, duplicate_error = process_duplicate_row_with_retry(
-            driver, wait, next_row_data, current_row, stop_event=stop_event
+            driver, wait, next_row_data, current_row, stop_event=stop_event, konteks=konteks
         )
         
         # CHECK STOP EVENT after processing duplicate
@@ -961,25 +972,28 @@ def main():
     except Exception as e:
         logger.error(f"Unexpected error in main: {e}")
 
-def run_with_custom_path_and_stop(excel_path, stop_event=None):
+def run_with_custom_path_and_stop(excel_path, stop_event=None, seed=None):
     """
     Run the process with stop event support - COMPLETE IMPLEMENTATION
     
     Args:
         excel_path: Path to Excel file
         stop_event: threading.Event object for stopping the process
+        seed: Random seed for slump/yield/jam sample; pass a logged seed to repeat a run
     
     Returns:
-        dict: Results with successful_rows, failed_rows, and stopped status
+        dict: Results with successful_rows, failed_rows, stopped status and seed
     """
     driver = None
     excel_processor = None
+    konteks = KonteksAcak(seed)
     
     try:
         logger.info("="*60)
         logger.info("Starting Rencana Benda Uji process with stop event support")
         logger.info(f"Excel file: {excel_path}")
         logger.info("="*60)
+        logger_debug(f"Seed acak: {konteks.seed} ({excel_path})")
         
         # Initialize components
         driver, excel_processor = initialize_components(excel_path)
@@ -1016,7 +1030,7 @@ def run_with_custom_path_and_stop(excel_path, stop_event=None):
             }
         
         # Process all rows dengan stop event
-        results = process_all_rows(driver, wait, excel_processor, stop_event)
+        results = process_all_rows(driver, wait, excel_processor, stop_event, konteks)
         
         # Format hasil untuk return
         return_results = {
@@ -1024,6 +1038,7 @@ def run_with_custom_path_and_stop(excel_path, stop_event=None):
             'failed_rows': len(results['failed_rows']),
             'skipped_rows': len(results['skipped_rows']),
             'stopped': results.get('stopped', False),
+            'seed': konteks.seed,
             'details': results
         }
         
@@ -0,0 +1,279 @@
+"""
+Laporan ukuran dan waktu query tabel pengujian
+
+- ukuran heap, TOAST dan setiap index pengujian, serta lebar rata-rata baris
+  (dijumlah dari partisi daun bila pengujian sudah dipartisi)
+- waktu eksekusi (EXPLAIN ANALYZE, median beberapa putaran) dan jenis scan
+  untuk query yang sering dijalankan aplikasi
+
+Jalankan sebelum dan sesudah migrasi skema untuk membandingkan:
+    python -m modules.laporan_skema --json sebelum.json
+    python -m modules.laporan_skema --bandingkan sebelum.json
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+from datetime import timedelta
+
+import psycopg2
+
+# Add project root to sys.path so we can import from modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from modules import settings
+
+# Sama dengan db_controller.queryGridHalaman / hitungGrid (modul itu memuat wx)
+SQL_GRID = """ FROM pengujian WHERE (tgluji BETWEEN %s AND %s) AND sinkron = ANY(%s) """
+
+# Query yang diukur: (nama, SQL, fungsi parameter dari sampel)
+QUERY = (
+    (
+        "antrian_daemon",
+        """ SELECT idpengujian FROM pengujian
+            WHERE sinkron IN ('B', 'P') AND (sinkron = 'B' OR klaim_sampai < now())
+            ORDER BY idpengujian LIMIT 50 """,
+        lambda sampel: (),
+    ),
+    (
+        "backlog_daemon",
+        " SELECT count(*) FROM pengujian WHERE sinkron IN ('B', 'P') ",
+        lambda sampel: (),
+    ),
+    (
+        "grid_halaman_30_hari",
+        "SELECT idpengujian, tgluji, nodocket, nourutbenda, bujnama, umur, nilaikn, bebanmpa, "
+        "kuattekan, beratbenda, tiperetak, sinkron" + SQL_GRID + " ORDER BY tgluji, idpengujian LIMIT 500 ",
+        lambda sampel: (sampel["tgl_akhir"] - timedelta(days=30), sampel["tgl_akhir"], ["B", "P", "S", "G"]),
+    ),
+    (
+        "grid_jumlah_90_hari",
+        "SELECT count(*)" + SQL_GRID,
+        lambda sampel: (sampel["tgl_akhir"] - timedelta(days=90), sampel["tgl_akhir"], ["B", "P", "S", "G"]),
+    ),
+    (
+        "per_docket_urut",
+        " SELECT * FROM pengujian WHERE nodocket = %s AND nourutbenda = %s ",
+        lambda sampel: (sampel["nodocket"], sampel["nourutbenda"]),
+    ),
+    (
+        "per_idbendauji",
+        " SELECT * FROM pengujian WHERE idbendauji = %s ",
+        lambda sampel: (sampel["idbendauji"],),
+    ),
+)
+
+
+def ambil_sampel(kursor):
+    """Parameter values taken from the newest row, so every query finds data"""
+    kursor.execute(
+        """ SELECT tgluji, rtrim(nodocket), rtrim(nourutbenda), rtrim(idbendauji)
+            FROM pengujian ORDER BY idpengujian DESC LIMIT 1 """
+    )
+    baris = kursor.fetchone()
+    if baris is None:
+        raise SystemExit("Tabel pengujian kosong, tidak ada yang bisa diukur")
+    return {
+        "tgl_akhir": baris[0],
+        "nodocket": baris[1],
+        "nourutbenda": baris[2],
+        "idbendauji": baris[3],
+    }
+
+
+def ukuran(kursor):
+    """
+    Sizes of pengujian from the catalog
+
+    A partitioned pengujian (schema section 12) has no storage of its own, so
+    the table and each index are summed over the leaf partitions.
+
+    Returns:
+        Dictionary with heap, toast, total bytes, per-index bytes and average row width
+    """
+    kursor.execute("SELECT relkind = 'p' FROM pg_class WHERE oid = to_regclass('pengujian')")
+    terpartisi = kursor.fetchone()[0]
+    if terpartisi:
+        kursor.execute(
+            """ SELECT COALESCE(sum(pg_relation_size(c.oid)), 0)::bigint,
+                       COALESCE(sum(pg_total_relation_size(c.reltoastrelid)) FILTER (WHERE c.reltoastrelid <> 0), 0)::bigint,
+                       COALESCE(sum(pg_total_relation_size(c.oid)), 0)::bigint,
+                       COALESCE(sum(GREATEST(c.reltuples, 0)), 0)::bigint
+                FROM pg_partition_tree('pengujian') t JOIN pg_class c ON c.oid = t.relid
+                WHERE t.isleaf """
+        )
+    else:
+        kursor.execute(
+            """ SELECT pg_relation_size(c.oid),
+                       COALESCE(pg_total_relation_size(c.reltoastrelid), 0),
+                       pg_total_relation_size(c.oid),
+                       c.reltuples::bigint
+                FROM pg_class c WHERE c.oid = to_regclass('pengujian') """
+        )
+    heap, toast, total, baris = kursor.fetchone()
+    # Index partisi (relkind 'I'): jumlah index di setiap partisi daun
+    kursor.execute(
+        """ SELECT i.relname,
+                   CASE WHEN i.relkind = 'I' THEN
+                       (SELECT COALESCE(sum(pg_relation_size(t.relid)), 0)::bigint
+                        FROM pg_partition_tree(i.oid) t WHERE t.isleaf)
+                   ELSE pg_relation_size(i.oid) END
+            FROM pg_index x JOIN pg_class i ON i.oid = x.indexrelid
+            WHERE x.indrelid = to_regclass('pengujian')
+            ORDER BY i.relname """
+    )
+    index = dict(kursor.fetchall())
+    if terpartisi:
+        # Autovacuum tidak meng-ANALYZE tabel induk: rata-rata per kolom dari statistik partisi
+        kursor.execute(
+            """ SELECT COALESCE(sum(lebar), 0) FROM (
+                    SELECT avg(s.avg_width) AS lebar
+                    FROM pg_partition_tree('pengujian') t
+                    JOIN pg_class c ON c.oid = t.relid
+                    JOIN pg_namespace n ON n.oid = c.relnamespace
+                    JOIN pg_stats s ON s.schemaname = n.nspname AND s.tablename = c.relname
+                    WHERE t.isleaf
+                    GROUP BY s.attname) kolom """
+        )
+    else:
+        kursor.execute(
+            """ SELECT COALESCE(sum(avg_width), 0) FROM pg_stats
+                WHERE schemaname = current_schema() AND tablename = 'pengujian' """
+        )
+    lebar = kursor.fetchone()[0]
+    return {
+        "baris": baris,
+        "heap_bytes": heap,
+        "toast_bytes": toast,
+        "index_bytes": sum(index.values()),
+        "total_bytes": total,
+        "lebar_baris_rata2": int(lebar),
+        "index": index,
+    }
+
+
+def ukur_query(kursor, sql, parameter, putaran):
+    """
+    Time one query with EXPLAIN ANALYZE
+
+    Returns:
+        Dictionary with median execution/planning time (ms), buffers and top scan node
+    """
+    eksekusi, perencanaan, buffer = [], [], []
+    rencana = None
+    for _ in range(putaran):
+        kursor.execute("EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) " + sql, parameter)
+        hasil = kursor.fetchone()[0][0]
+        eksekusi.append(hasil["Execution Time"])
+        perencanaan.append(hasil["Planning Time"])
+        rencana = hasil["Plan"]
+        buffer.append(rencana.get("Shared Hit Blocks", 0) + rencana.get("Shared Read Blocks", 0))
+    return {
+        "eksekusi_ms": round(statistics.median(eksekusi), 3),
+        "perencanaan_ms": round(statistics.median(perencanaan), 3),
+        "buffer": int(statistics.median(buffer)),
+        "scan": _scan(rencana),
+    }
+
+
+def _scan(rencana):
+    """Names of the scan nodes in a plan, e.g. 'Index Scan idx_pengujian_antrian'"""
+    hasil = []
+    simpul = [rencana]
+    while simpul:
+        s = simpul.pop()
+        if "Scan" in s["Node Type"]:
+            hasil.append(f"{s['Node Type']} {s.get('Index Name', s.get('Relation Name', ''))}".strip())
+        simpul.extend(s.get("Plans", []))
+    return ", ".join(hasil)
+
+
+def buat_laporan(dsn, putaran=5):
+    """Collect sizes and query timings into one dictionary"""
+    conn = psycopg2.connect(dsn)
+    try:
+        # Hanya membaca; EXPLAIN ANALYZE tetap dijalankan di transaksi read only
+        conn.set_session(readonly=True)
+        with conn.cursor() as kursor:
+            sampel = ambil_sampel(kursor)
+            laporan = {"ukuran": ukuran(kursor), "query": {}}
+            for nama, sql, parameter in QUERY:
+                laporan["query"][nama] = ukur_query(kursor, sql, parameter(sampel), putaran)
+        conn.rollback()
+        return laporan
+    finally:
+        conn.close()
+
+
+def _mb(nilai):
+    return f"{nilai / 1048576:.2f} MB"
+
+
+def _selisih(lama, baru):
+    if not lama:
+        return ""
+    return f"{(baru - lama) / lama * 100:+.1f}%"
+
+
+def cetak(laporan, pembanding=None):
+    """Print a report, side by side with an earlier one when given"""
+    lama = pembanding or {"ukuran": {"index": {}}, "query": {}}
+    print("=" * 72)
+    print("UKURAN TABEL pengujian")
+    print("=" * 72)
+    for kunci in ("baris", "lebar_baris_rata2", "heap_bytes", "toast_bytes", "index_bytes", "total_bytes"):
+        baru = laporan["ukuran"][kunci]
+        sebelum = lama["ukuran"].get(kunci)
+        tampil = _mb if kunci.endswith("_bytes") else str
+        kolom = f"{tampil(sebelum):>14} -> " if sebelum is not None else ""
+        print(f"{kunci:22s}: {kolom}{tampil(baru):>14} {_selisih(sebelum, baru)}")
+    print("-" * 72)
+    semua_index = sorted(set(laporan["ukuran"]["index"]) | set(lama["ukuran"]["index"]))
+    for nama in semua_index:
+        sebelum = lama["ukuran"]["index"].get(nama)
+        baru = laporan["ukuran"]["index"].get(nama)
+        kiri = _mb(sebelum) if sebelum is not None else "-"
+        kanan = _mb(baru) if baru is not None else "(dihapus)"
+        print(f"  {nama:32s}: {kiri if pembanding else ''} {'-> ' if pembanding else ''}{kanan}")
+
+    print("=" * 72)
+    print("WAKTU QUERY (median EXPLAIN ANALYZE)")
+    print("=" * 72)
+    for nama, baru in laporan["query"].items():
+        sebelum = lama["query"].get(nama)
+        if sebelum:
+            print(f"{nama:22s}: {sebelum['eksekusi_ms']:9.3f} ms -> {baru['eksekusi_ms']:9.3f} ms "
+                  f"{_selisih(sebelum['eksekusi_ms'], baru['eksekusi_ms'])}, "
+                  f"buffer {sebelum['buffer']} -> {baru['buffer']}")
+            if sebelum["scan"] != baru["scan"]:
+                print(f"{'':22s}  {sebelum['scan']} -> {baru['scan']}")
+            else:
+                print(f"{'':22s}  {baru['scan']}")
+        else:
+            print(f"{nama:22s}: {baru['eksekusi_ms']:9.3f} ms, buffer {baru['buffer']}, {baru['scan']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Laporan ukuran dan waktu query tabel pengujian")
+    parser.add_argument("--dsn", help="DSN PostgreSQL (default: [data] di config.cnf)")
+    parser.add_argument("--putaran", type=int, default=5, help="jumlah eksekusi per query (median)")
+    parser.add_argument("--json", help="simpan laporan ke file JSON (misal sebelum migrasi)")
+    parser.add_argument("--bandingkan", help="file JSON laporan sebelumnya untuk dibandingkan")
+    args = parser.parse_args()
+
+    laporan = buat_laporan(args.dsn or settings.get_settings().data.dsn, args.putaran)
+    pembanding = None
+    if args.bandingkan:
+        with open(args.bandingkan) as f:
+            pembanding = json.load(f)
+    cetak(laporan, pembanding)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(laporan, f, indent=2)
+        print(f"Laporan disimpan ke {args.json}")
+
+
+if __name__ == "__main__":
+    main()
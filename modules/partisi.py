@@ -0,0 +1,265 @@
+"""
+Pengelolaan partisi bulanan tabel pengujian (PARTITION BY RANGE (tgluji))
+
+- membuat partisi bulan berjalan dan beberapa bulan ke depan; baris yang
+  terlanjur masuk ke pengujian_default dipindah ke partisi barunya
+- melepas (DETACH) partisi lama dan memindahkannya ke schema arsip
+
+Dipanggil otomatis oleh daemon sinkronisasi sekali sehari, atau manual:
+    python -m modules.partisi --ke-depan 3
+    python -m modules.partisi --arsip-sebelum 2023-01 --schema-arsip arsip
+"""
+import argparse
+import logging
+import os
+import re
+import sys
+from datetime import date
+
+from psycopg2 import sql
+
+# Add project root to sys.path so we can import from modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from modules import db_pool
+
+logger = logging.getLogger(__name__)
+
+TABEL = "pengujian"
+PARTISI_DEFAULT = "pengujian_default"
+TABEL_KUNCI = "pengujian_kunci"
+TABEL_RINGKASAN = "ringkasan_harian"
+POLA_NAMA = re.compile(r"^pengujian_p(\d{4})_(\d{2})$")
+
+
+def awal_bulan(tanggal):
+    """First day of the month of `tanggal`"""
+    return tanggal.replace(day=1)
+
+
+def geser_bulan(bulan, jumlah):
+    """First day of the month `jumlah` months after `bulan` (negative = before)"""
+    indeks = bulan.year * 12 + bulan.month - 1 + jumlah
+    return date(indeks // 12, indeks % 12 + 1, 1)
+
+
+def nama_partisi(bulan):
+    """Partition table name for a month, e.g. pengujian_p2025_10"""
+    return f"{TABEL}_p{bulan.year:04d}_{bulan.month:02d}"
+
+
+def terpartisi(kursor):
+    """True when pengujian is a partitioned table (schema section 12 applied)"""
+    kursor.execute("SELECT relkind FROM pg_class WHERE oid = to_regclass(%s)", (TABEL,))
+    baris = kursor.fetchone()
+    return baris is not None and baris[0] == "p"
+
+
+def daftar_partisi(kursor):
+    """
+    Monthly partitions currently attached to pengujian
+
+    Returns:
+        Dictionary of month (date, first day) to partition name, sorted by month
+    """
+    kursor.execute(
+        """ SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid
+            WHERE i.inhparent = to_regclass(%s) """,
+        (TABEL,),
+    )
+    hasil = {}
+    for (nama,) in kursor.fetchall():
+        cocok = POLA_NAMA.match(nama)
+        if cocok:
+            hasil[date(int(cocok.group(1)), int(cocok.group(2)), 1)] = nama
+    return dict(sorted(hasil.items()))
+
+
+def buat_partisi(kursor, bulan):
+    """
+    Create and attach the partition of one month
+
+    The partition is built as a plain table first, rows of that month are
+    moved into it from the default partition, and only then attached, so
+    ATTACH never fails on rows that landed in the default partition while
+    the month had no partition yet.
+
+    Args:
+        kursor: Cursor inside a transaction
+        bulan: First day of the month
+
+    Returns:
+        Number of rows moved out of the default partition
+    """
+    nama = sql.Identifier(nama_partisi(bulan))
+    sampai = geser_bulan(bulan, 1)
+    kursor.execute(
+        sql.SQL("CREATE TABLE {} (LIKE {} INCLUDING DEFAULTS)").format(nama, sql.Identifier(TABEL))
+    )
+    kursor.execute(
+        sql.SQL(
+            "WITH pindah AS (DELETE FROM {} WHERE tgluji >= %s AND tgluji < %s RETURNING *) "
+            "INSERT INTO {} SELECT * FROM pindah"
+        ).format(sql.Identifier(PARTISI_DEFAULT), nama),
+        (bulan, sampai),
+    )
+    dipindah = kursor.rowcount
+    # Batas partisi bernilai konstan; format() dengan Literal, bukan parameter
+    kursor.execute(
+        sql.SQL("ALTER TABLE {} ATTACH PARTITION {} FOR VALUES FROM ({}) TO ({})").format(
+            sql.Identifier(TABEL), nama, sql.Literal(bulan.isoformat()), sql.Literal(sampai.isoformat())
+        )
+    )
+    return dipindah
+
+
+def pastikan_partisi(ke_depan=3, hari_ini=None):
+    """
+    Make sure partitions exist from the current month up to `ke_depan` months ahead
+
+    Also creates partitions for any earlier month that only has rows in the
+    default partition (e.g. a late upload of old CSVs). A no-op when
+    pengujian is not partitioned.
+
+    Args:
+        ke_depan: Months to create ahead of the current one
+        hari_ini: Reference date (default: today)
+
+    Returns:
+        List of partition names created
+    """
+    bulan_ini = awal_bulan(hari_ini or date.today())
+    dibuat = []
+    with db_pool.connection() as konekdb:
+        konekdb.autocommit = False
+        try:
+            with konekdb.cursor() as kursor:
+                if not terpartisi(kursor):
+                    konekdb.rollback()
+                    return dibuat
+                # Serialisasi dengan instance lain (GUI dan daemon terpisah)
+                kursor.execute("SELECT pg_advisory_xact_lock(hashtext(%s))", (PARTISI_DEFAULT,))
+                ada = daftar_partisi(kursor)
+                kursor.execute(
+                    sql.SQL(
+                        "SELECT DISTINCT date_trunc('month', tgluji)::date FROM {} WHERE tgluji IS NOT NULL"
+                    ).format(sql.Identifier(PARTISI_DEFAULT))
+                )
+                perlu = {baris[0] for baris in kursor.fetchall()}
+                perlu.update(geser_bulan(bulan_ini, i) for i in range(ke_depan + 1))
+                for bulan in sorted(perlu - set(ada)):
+                    dipindah = buat_partisi(kursor, bulan)
+                    dibuat.append(nama_partisi(bulan))
+                    logger.info(f"Partisi {nama_partisi(bulan)} dibuat, {dipindah} baris dipindah dari default")
+            konekdb.commit()
+        except Exception:
+            konekdb.rollback()
+            raise
+        finally:
+            konekdb.autocommit = True
+    return dibuat
+
+
+def lepas_partisi(sebelum, schema_arsip=None, hapus=False):
+    """
+    Detach the monthly partitions of months before `sebelum`
+
+    Detached partitions stay as ordinary tables (optionally moved to
+    `schema_arsip`), so old data leaves the grid, vacuum and index upkeep of
+    pengujian but can still be queried or dumped. Their keys are removed from
+    pengujian_kunci and their days from ringkasan_harian, which only hold rows
+    still in pengujian (the pengujian triggers do not fire on DETACH).
+
+    Args:
+        sebelum: Months strictly before this month are detached
+        schema_arsip: Schema to move detached tables into (created if missing)
+        hapus: Drop detached tables instead of keeping them
+
+    Returns:
+        List of detached partition names
+    """
+    batas = awal_bulan(sebelum)
+    dilepas = []
+    with db_pool.connection() as konekdb:
+        konekdb.autocommit = False
+        try:
+            with konekdb.cursor() as kursor:
+                if not terpartisi(kursor):
+                    konekdb.rollback()
+                    return dilepas
+                kursor.execute("SELECT to_regclass(%s) IS NOT NULL", (TABEL_KUNCI,))
+                ada_kunci = kursor.fetchone()[0]
+                kursor.execute("SELECT to_regclass(%s) IS NOT NULL", (TABEL_RINGKASAN,))
+                ada_ringkasan = kursor.fetchone()[0]
+                if schema_arsip and not hapus:
+                    kursor.execute(sql.SQL("CREATE SCHEMA IF NOT EXISTS {}").format(sql.Identifier(schema_arsip)))
+                for bulan, nama in daftar_partisi(kursor).items():
+                    if bulan >= batas:
+                        break
+                    kursor.execute(
+                        sql.SQL("ALTER TABLE {} DETACH PARTITION {}").format(
+                            sql.Identifier(TABEL), sql.Identifier(nama)
+                        )
+                    )
+                    if ada_kunci:
+                        # Baris yang lepas bukan lagi bagian pengujian, kuncinya ikut dilepas
+                        kursor.execute(
+                            sql.SQL("DELETE FROM {} k USING {} p WHERE k.idpengujian = p.idpengujian").format(
+                                sql.Identifier(TABEL_KUNCI), sql.Identifier(nama)
+                            )
+                        )
+                    if ada_ringkasan:
+                        # Ringkasan bulan itu juga tidak lagi dihitung di grid dan dashboard
+                        kursor.execute(
+                            sql.SQL("DELETE FROM {} WHERE tgluji >= %s AND tgluji < %s").format(
+                                sql.Identifier(TABEL_RINGKASAN)
+                            ),
+                            (bulan, geser_bulan(bulan, 1)),
+                        )
+                    if hapus:
+                        kursor.execute(sql.SQL("DROP TABLE {}").format(sql.Identifier(nama)))
+                    elif schema_arsip:
+                        kursor.execute(
+                            sql.SQL("ALTER TABLE {} SET SCHEMA {}").format(
+                                sql.Identifier(nama), sql.Identifier(schema_arsip)
+                            )
+                        )
+                    dilepas.append(nama)
+                    logger.info(f"Partisi {nama} dilepas" + (" dan dihapus" if hapus else ""))
+            konekdb.commit()
+        except Exception:
+            konekdb.rollback()
+            raise
+        finally:
+            konekdb.autocommit = True
+    return dilepas
+
+
+def _bulan(teks):
+    """argparse type for YYYY-MM"""
+    try:
+        tahun, bulan = teks.split("-")
+        return date(int(tahun), int(bulan), 1)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"format bulan harus YYYY-MM: {teks!r}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Kelola partisi bulanan tabel pengujian")
+    parser.add_argument("--ke-depan", type=int, default=3, help="jumlah bulan partisi yang dibuat di depan")
+    parser.add_argument("--arsip-sebelum", type=_bulan, help="lepas partisi bulan sebelum YYYY-MM")
+    parser.add_argument("--schema-arsip", help="schema tujuan partisi yang dilepas")
+    parser.add_argument("--hapus", action="store_true", help="hapus partisi yang dilepas (bukan arsip)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - [%(levelname)s] %(message)s")
+    dibuat = pastikan_partisi(args.ke_depan)
+    print(f"Partisi dibuat: {', '.join(dibuat) or '-'}")
+    if args.arsip_sebelum:
+        dilepas = lepas_partisi(args.arsip_sebelum, args.schema_arsip, args.hapus)
+        print(f"Partisi dilepas: {', '.join(dilepas) or '-'}")
+    db_pool.close_pool()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,393 @@
+"""
+Proses PENGUJIAN dalam satu kali muat dan satu kali simpan
+
+Langkah terpisah di GUI (copy_excel_data, get_bjdt_ids, _generate_csv_files_logic)
+membuka dan menyimpan PENGUJIAN.xlsx berulang kali dan memakai Excel
+(xlwings) hanya untuk menghitung rumus sheet bjdt_id dan pengujian. Rumus
+kedua sheet itu hanya mengambil kolom ODOO di baris yang sama (plus beberapa
+rumus turunan di RUMUS_TURUNAN), sehingga PipelinePengujian menghitungnya
+langsung dari kolom di memori:
+
+- file sumber dibaca sekali (excel_stream), file PENGUJIAN dimuat sekali
+- tahap salin, beban, idpengujian, bjdt_id dan csv bekerja pada list per kolom
+- file PENGUJIAN disimpan sekali di akhir, dalam keadaan yang sama seperti
+  sesudah langkah terpisah: ODOO dan kolom ID bjdt_id kosong, idpengujian
+  baris 2 berisi id berikutnya, seed BEBAN tercatat di properti seed_beban
+
+Template yang rumusnya tidak dikenali ditolak dengan PipelineError sebelum
+ada yang diubah, supaya pemanggil bisa kembali ke langkah terpisah.
+
+Beda dengan langkah terpisah (dibandingkan di tests/test_pipeline.py):
+
+- sel sumber dibaca sebagai nilai (data_only, hasil rumus yang tersimpan),
+  sedangkan copy_excel_data menyalin rumusnya apa adanya ke ODOO. Hasilnya
+  sama selama file sumber tidak berisi rumus, seperti export RENCANA/LPH.
+- baris sumber yang seluruhnya kosong dilewati. Langkah terpisah tetap
+  membawanya sebagai baris berisi 0 dengan idpengujian sendiri (seperti baris
+  template di bawah data), yang tglrencanauji-nya 0 sehingga tidak masuk CSV
+  tanggal rencana mana pun yang valid; di pipeline idpengujian baris data
+  berurutan tanpa celah.
+"""
+import logging
+import os
+import re
+import time
+from contextlib import contextmanager
+from decimal import Decimal, ROUND_HALF_UP
+
+import openpyxl
+import pandas as pd
+import requests
+from openpyxl.utils import column_index_from_string, get_column_letter
+
+from modules import excel_stream
+from modules.acak import kunci_docket
+from modules.excel_handler import ExcelBebanProcessor
+
+logger = logging.getLogger(__name__)
+
+# Kolom sumber (RENCANA/LPH) yang disalin ke sheet ODOO, mulai kolom A
+KOLOM_ODOO = ['Docket', 'Nomor Kontrak', 'Nomor SPP', 'Proyek', 'Kontraktor', 'Mutu', 'No. Urut',
+              'Tanggal Rencana', 'Rencana Umur Test', 'Bentuk Benda Uji', 'Target (%)',
+              'Tanggal Realisasi Test', 'Realisasi Umur Test', 'Hasil Test', 'Rusak',
+              'Kode Benda Uji', 'Jenis Retakan', 'Kn', 'Mpa', 'Kg/cm2', 'Berat (kg)',
+              'Persentase Kekuatan (%)']
+
+URL_BJDT = "https://rmc.adhimix.web.id/benda_uji/?doc_no={doc_no}&no_urut={no_urut}"
+FILE_ERROR_BJDT = "bjdt_error_log.txt"
+
+# Referensi sel di baris yang sama: =ODOO!H2, ='Sheet X'!$C$2
+_REFERENSI = re.compile(r"^=(?:'([^']+)'|([A-Za-z0-9_.]+))!\$?([A-Z]{1,3})\$?(\d+)$")
+
+
+class PipelineError(Exception):
+    """Raised when the PENGUJIAN template cannot be computed without Excel"""
+
+
+def _bulat2(nilai):
+    # ROUND(x, 2) Excel: setengah dibulatkan menjauhi nol
+    return float(Decimal(repr(nilai)).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP))
+
+
+def _angka(nilai):
+    """Numeric value of a referenced cell as Excel coerces it (blank = 0, non-numeric text = None)"""
+    if nilai is None:
+        return 0.0
+    try:
+        return float(nilai)
+    except (TypeError, ValueError):
+        return None
+
+
+# Rumus sheet pengujian selain referensi langsung: (rumus baris {r}, kolom sumber di sheet
+# pengujian atau None untuk undian acak, fungsi per nilai)
+RUMUS_TURUNAN = [
+    ("=ROUND(RAND()*(12.4-12)+12.1,2)", None, lambda u: _bulat2(u * 0.4 + 12.1)),
+    ('=CHOOSE(RANDBETWEEN(1,5), "A", "B", "C", "D", "E")', None, lambda u: "ABCDE"[int(u * 5)]),
+    ("=ROUND(G{r}*101.971/176.71/0.83,2)", "G", lambda kn: _bulat2(kn * 101.971 / 176.71 / 0.83)),
+    ("=ROUND(G{r}/17671*1000.2,2)", "G", lambda kn: _bulat2(kn / 17671 * 1000.2)),
+]
+
+
+def _normal(rumus):
+    return re.sub(r"\s+", "", rumus).upper()
+
+
+def ambil_bjdt_id(doc_no, no_urut, sesi=requests):
+    """
+    bjdt_id of one benda uji from the RMC web service
+
+    Args:
+        doc_no: Docket number (stripped text)
+        no_urut: No urut (stripped text)
+        sesi: requests module or a requests.Session (keeps the connection open)
+
+    Returns:
+        bjdt_id, "" if the service does not know it
+
+    Raises:
+        requests.RequestException: HTTP or connection error
+    """
+    response = sesi.get(URL_BJDT.format(doc_no=doc_no, no_urut=no_urut))
+    response.raise_for_status()
+    return response.json().get("bjdt_id", "")
+
+
+class PipelinePengujian:
+    """Copy, BEBAN, idpengujian, bjdt_id and CSV stages over one in-memory PENGUJIAN workbook"""
+
+    def __init__(self, file_sumber, sheet_sumber, file_pengujian, output_dir, sheet_odoo='ODOO',
+                 sheet_pengujian='pengujian', sheet_bjdt='bjdt_id', id_berikutnya=None, seed=None, log=None):
+        """
+        Args:
+            file_sumber: Source workbook (RENCANA/LPH)
+            sheet_sumber: Source sheet name
+            file_pengujian: PENGUJIAN workbook (template, saved once at the end)
+            output_dir: Directory for the per-date CSV files
+            sheet_odoo / sheet_pengujian / sheet_bjdt: Sheet names in the PENGUJIAN workbook
+            id_berikutnya: Callable returning the next idpengujian (default: 1)
+            seed: Seed for BEBAN and the RAND columns (default: new seed)
+            log: Logger for progress messages (default: module logger)
+        """
+        self.file_sumber = file_sumber
+        self.sheet_sumber = sheet_sumber
+        self.file_pengujian = file_pengujian
+        self.output_dir = output_dir
+        self.sheet_odoo = sheet_odoo
+        self.sheet_pengujian = sheet_pengujian
+        self.sheet_bjdt = sheet_bjdt
+        self.id_berikutnya = id_berikutnya or (lambda: 1)
+        self.log = log or logger
+        self.beban = ExcelBebanProcessor(file_pengujian, sheet_odoo, seed=seed)
+        self.waktu = {}
+        self.file_csv = []
+        self.workbook = None
+        self.odoo = []
+        self.n = 0
+        self.next_id = None
+        self.id_bjdt = []
+        self._kolom = {}
+
+    @contextmanager
+    def _tahap(self, nama):
+        mulai = time.monotonic()
+        yield
+        self.waktu[nama] = round(time.monotonic() - mulai, 3)
+        self.log.info(f"Tahap {nama} selesai dalam {self.waktu[nama]}s")
+
+    def ringkasan(self):
+        """One-line timing summary per stage"""
+        tahap = ", ".join(f"{nama} {detik}s" for nama, detik in self.waktu.items())
+        return f"{tahap} (total {round(sum(self.waktu.values()), 3)}s)"
+
+    def jalankan(self):
+        """
+        Run all stages and save the PENGUJIAN workbook once
+
+        Returns:
+            Dictionary stage name -> seconds
+
+        Raises:
+            PipelineError: template formulas not supported (nothing changed yet)
+            KeyError: sheet not found
+        """
+        try:
+            with self._tahap("muat"):
+                self.workbook = openpyxl.load_workbook(self.file_pengujian)
+                self._periksa_template()
+            with self._tahap("salin"):
+                self.salin()
+            with self._tahap("beban"):
+                self.hitung_beban()
+            with self._tahap("idpengujian"):
+                self.next_id = self.id_berikutnya()
+            with self._tahap("bjdt_id"):
+                self.ambil_bjdt()
+            with self._tahap("csv"):
+                self.tulis_csv()
+            with self._tahap("simpan"):
+                self.simpan()
+        finally:
+            if self.workbook is not None:
+                self.workbook.close()
+        self.log.info(f"Pipeline PENGUJIAN selesai: {self.ringkasan()}")
+        return self.waktu
+
+    # ------------------------------------------------------------------ template
+
+    def _sheet(self, nama):
+        for ws in self.workbook.worksheets:
+            if ws.title.lower() == nama.lower():
+                return ws
+        raise KeyError(nama)
+
+    def _header(self, sheet):
+        ws = self._sheet(sheet)
+        return {sel.value: sel.column_letter for sel in ws[1] if sel.value is not None}
+
+    def _jenis(self, sheet, huruf):
+        """
+        Classify the row-2 template formula of column `huruf` in `sheet`
+
+        Returns:
+            ("kosong",), ("tetap", nilai), ("id",), ("ref", sheet, huruf) or ("turunan", index)
+        """
+        ws = self._sheet(sheet)
+        rumus = ws[f"{huruf}2"].value
+        if sheet.lower() == self.sheet_pengujian.lower() and self._header(sheet).get('idpengujian') == huruf:
+            lanjut = ws[f"{huruf}3"].value
+            if lanjut is not None and _normal(str(lanjut)) != f"={huruf}2+1":
+                raise PipelineError(f"Rumus {sheet}!{huruf}3 tidak dikenali: {lanjut}")
+            return ("id",)
+        if rumus is None:
+            return ("kosong",)
+        if not (isinstance(rumus, str) and rumus.startswith("=")):
+            return ("tetap", rumus)
+        cocok = _REFERENSI.match(rumus.strip())
+        if cocok and cocok.group(4) == "2":
+            return ("ref", cocok.group(1) or cocok.group(2), cocok.group(3))
+        for i, (pola, _, _) in enumerate(RUMUS_TURUNAN):
+            if _normal(pola.format(r=2)) == _normal(rumus):
+                return ("turunan", i)
+        raise PipelineError(f"Rumus {sheet}!{huruf}2 tidak dikenali: {rumus}")
+
+    def _periksa_template(self):
+        """Check every formula the CSV depends on before anything is changed"""
+        header_bjdt = self._header(self.sheet_bjdt)
+        for nama in ('Docket', 'No URUT', 'ID'):
+            if nama not in header_bjdt:
+                raise PipelineError(f"Kolom {nama} tidak ada di sheet {self.sheet_bjdt}")
+        for nama in ('Docket', 'No URUT'):
+            jenis = self._jenis(self.sheet_bjdt, header_bjdt[nama])
+            if jenis[0] != "ref" or jenis[1].lower() != self.sheet_odoo.lower():
+                raise PipelineError(f"Kolom {nama} di sheet {self.sheet_bjdt} harus merujuk ke {self.sheet_odoo}")
+
+        sudah = set()
+        antrian = [(self.sheet_pengujian, h) for h in self._header(self.sheet_pengujian).values()]
+        while antrian:
+            sheet, huruf = antrian.pop()
+            if (sheet.lower(), huruf) in sudah or sheet.lower() == self.sheet_odoo.lower():
+                continue
+            sudah.add((sheet.lower(), huruf))
+            if sheet.lower() == self.sheet_bjdt.lower() and huruf == header_bjdt['ID']:
+                continue
+            if sheet.lower() not in (self.sheet_pengujian.lower(), self.sheet_bjdt.lower()):
+                raise PipelineError(f"Rumus merujuk ke sheet {sheet} yang tidak dihitung pipeline")
+            jenis = self._jenis(sheet, huruf)
+            if jenis[0] == "ref":
+                antrian.append((jenis[1], jenis[2]))
+            elif jenis[0] == "turunan" and RUMUS_TURUNAN[jenis[1]][1]:
+                antrian.append((self.sheet_pengujian, RUMUS_TURUNAN[jenis[1]][1]))
+
+    # ------------------------------------------------------------------ tahap
+
+    def salin(self):
+        """Read the copied columns of the source sheet (ODOO sheet as columns A, B, ...)"""
+        # Hanya nilai yang dipakai (tidak ada sel yang ditulis ke ODOO), jadi cukup hasil rumus;
+        # copy_excel_data menyalin rumusnya, lihat docstring modul
+        with excel_stream.PembacaExcel(self.file_sumber, self.sheet_sumber, data_only=True) as pembaca:
+            nama_kolom = list(pembaca.indeks(KOLOM_ODOO, wajib=False))
+            self.log.info(f"Found {len(nama_kolom)} columns to copy")
+            isi = pembaca.kolom(nama_kolom)
+        kolom = [isi[k] for k in nama_kolom]
+        # Baris yang seluruhnya kosong tidak ikut (langkah terpisah: baris berisi 0, lihat docstring modul)
+        terisi = [i for i, baris in enumerate(zip(*kolom)) if any(v is not None for v in baris)]
+        self.odoo = [[k[i] for i in terisi] for k in kolom]
+        self.n = len(terisi)
+        self.log.info(f"Total rows to process: {self.n}")
+
+    def _odoo(self, huruf):
+        j = column_index_from_string(huruf) - 1
+        return self.odoo[j] if j < len(self.odoo) else [None] * self.n
+
+    def hitung_beban(self):
+        """BEBAN into the in-memory ODOO column, exactly as ExcelBebanProcessor.process_all_rows would"""
+        peta = self.beban.column_map
+        kolom = {k: self._odoo(get_column_letter(peta[k])) for k in ('DOCKET', 'MUTU', 'UMUR')}
+        hasil = self.beban.calculate_columns(kolom)
+        j = peta['BEBAN'] - 1
+        while len(self.odoo) <= j:
+            self.odoo.append([None] * self.n)
+        self.odoo[j] = [b if b else lama for b, lama in zip(hasil, self.odoo[j])]
+        self.log.info(f"BEBAN dihitung untuk {self.n} baris (seed {self.beban.konteks.seed})")
+
+    def ambil_bjdt(self):
+        """bjdt_id per row from the web service (ID column of the bjdt_id sheet)"""
+        header = self._header(self.sheet_bjdt)
+        docket = self.kolom(self.sheet_bjdt, header['Docket'])
+        no_urut = self.kolom(self.sheet_bjdt, header['No URUT'])
+        self.id_bjdt = [None] * self.n
+        error_logs = []
+        with requests.Session() as sesi:
+            for i, (doc_no, urut) in enumerate(zip(docket, no_urut)):
+                if not (doc_no and urut):
+                    continue
+                doc_no, urut = str(doc_no).strip(), str(urut).strip()
+                self.log.info(f"[{i + 2}] Getting bjdt_id for Doc: {doc_no}, No Urut: {urut}...")
+                try:
+                    bjdt_id = ambil_bjdt_id(doc_no, urut, sesi)
+                except Exception as e:
+                    url = URL_BJDT.format(doc_no=doc_no, no_urut=urut)
+                    self.log.error(f"ERROR on {url}: {e}")
+                    error_logs.append(f"ERROR on {url}: {e}")
+                    bjdt_id = ""
+                else:
+                    if not bjdt_id:
+                        self.log.warning(f"bjdt_id NOT FOUND for Doc: {doc_no}, No Urut: {urut}")
+                        error_logs.append(f"bjdt_id not found for {doc_no} no_urut {urut}")
+                self.id_bjdt[i] = bjdt_id
+        if error_logs:
+            with open(FILE_ERROR_BJDT, mode="w", encoding="utf-8") as error_file:
+                for log in error_logs:
+                    error_file.write(log + "\n")
+            self.log.warning(f"Saved {len(error_logs)} errors to {FILE_ERROR_BJDT}")
+
+    def kolom(self, sheet, huruf):
+        """
+        Values of template column `huruf` of `sheet` for every data row, as Excel would compute them
+
+        Returns:
+            List with one value per copied row
+        """
+        kunci = (sheet.lower(), huruf)
+        if kunci in self._kolom:
+            return self._kolom[kunci]
+        if sheet.lower() == self.sheet_odoo.lower():
+            return self._odoo(huruf)
+        if sheet.lower() == self.sheet_bjdt.lower() and huruf == self._header(self.sheet_bjdt)['ID']:
+            return self.id_bjdt
+
+        jenis = self._jenis(sheet, huruf)
+        if jenis[0] == "id":
+            hasil = [self.next_id + i for i in range(self.n)]
+        elif jenis[0] == "kosong":
+            hasil = [None] * self.n
+        elif jenis[0] == "tetap":
+            hasil = [jenis[1]] * self.n
+        elif jenis[0] == "ref":
+            # Sel kosong yang dirujuk rumus bernilai 0 di Excel
+            hasil = [0 if v is None else v for v in self.kolom(jenis[1], jenis[2])]
+        else:
+            _, sumber, fungsi = RUMUS_TURUNAN[jenis[1]]
+            if sumber is None:
+                docket = self._odoo(get_column_letter(self.beban.column_map['DOCKET']))
+                u = self.beban.konteks.undian([(sheet, huruf, kunci_docket(d)) for d in docket])
+                hasil = [fungsi(x) for x in u.tolist()]
+            else:
+                nilai = [_angka(v) for v in self.kolom(self.sheet_pengujian, sumber)]
+                hasil = [None if v is None else fungsi(v) for v in nilai]
+        self._kolom[kunci] = hasil
+        return hasil
+
+    def tulis_csv(self):
+        """Write the pengujian sheet rows as one CSV per tglrencanauji (like _generate_csv_files_logic)"""
+        header = self._header(self.sheet_pengujian)
+        df = pd.DataFrame({nama: self.kolom(self.sheet_pengujian, huruf) for nama, huruf in header.items()})
+        df['tglrencanauji'] = pd.to_datetime(df['tglrencanauji'], errors='coerce')
+        os.makedirs(self.output_dir, exist_ok=True)
+        for tgl, group in df.groupby(df['tglrencanauji'].dt.date):
+            output_filename = os.path.join(self.output_dir, f"{tgl}.csv")
+            group.to_csv(output_filename, index=False, sep=';', encoding='utf-8-sig')
+            self.file_csv.append(output_filename)
+            self.log.info(f"Saved: {output_filename}")
+
+    def simpan(self):
+        """Leave the workbook as the separate steps did (next idpengujian, seed, ODOO and ID cleared) and save it"""
+        ws = self._sheet(self.sheet_pengujian)
+        huruf_id = self._header(self.sheet_pengujian).get('idpengujian')
+        if huruf_id:
+            ws[f"{huruf_id}2"].value = self.next_id
+
+        ws = self._sheet(self.sheet_odoo)
+        for row in ws.iter_rows(min_row=2, max_row=ws.max_row, min_col=1, max_col=ws.max_column):
+            for cell in row:
+                cell.value = None
+        ws = self._sheet(self.sheet_bjdt)
+        for row in ws.iter_rows(min_row=2, max_row=ws.max_row, min_col=3, max_col=ws.max_column):
+            for cell in row:
+                cell.value = None
+
+        self.beban.load_excel(self.workbook)
+        self.beban.record_seed()
+        self.workbook.save(self.file_pengujian)
+        self.log.info(f"Updated idpengujian to: {self.next_id}")
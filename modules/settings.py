@@ -0,0 +1,231 @@
+import configparser
+import logging
+import os
+import sys
+import threading
+import time
+from dataclasses import MISSING, dataclass, field, fields, replace
+
+logger = logging.getLogger(__name__)
+
+NAMA_FILE = "config.cnf"
+
+
+def resource_path(relative_path):
+    """Get absolute path to resource, works for dev and for PyInstaller"""
+    try:
+        base_path = sys._MEIPASS # type: ignore
+    except Exception:
+        base_path = os.path.abspath(".")
+    return os.path.join(base_path, relative_path)
+
+
+class SettingsError(ValueError):
+    """Raised when config.cnf is missing a required option or has an invalid value"""
+
+
+def _kutip(nilai):
+    """Quote a value for a libpq connection string"""
+    return "'" + str(nilai).replace("\\", "\\\\").replace("'", "\\'") + "'"
+
+
+@dataclass(frozen=True)
+class DataSettings:
+    """[data] - PostgreSQL connection and shared pool"""
+    database: str
+    host: str
+    user: str
+    password: str
+    port: int = 5432
+    pool_min: int = 1
+    pool_max: int = 5
+    pool_timeout: float = 10.0
+
+    @property
+    def dsn(self):
+        """libpq connection string"""
+        return (
+            f"dbname={_kutip(self.database)} user={_kutip(self.user)} host={_kutip(self.host)} "
+            f"port={self.port} password={_kutip(self.password)}"
+        )
+
+
+@dataclass(frozen=True)
+class WebserSettings:
+    """[webser] - ERP webservice"""
+    webser_hasilUji: str
+    webser_bendaUji: str = ""
+    http_user: str = ""
+    http_pass: str = ""
+    delay: float = 2.0
+    connect_timeout: float = 5.0
+    timeout: float = 30.0
+    breaker_ambang: int = 5
+    breaker_jeda: float = 60.0
+
+
+@dataclass(frozen=True)
+class AlatUjiSettings:
+    """[alatUji] - serial port of the compression machine"""
+    baudrate: int = 9600
+    bytesize: int = 8
+
+
+@dataclass(frozen=True)
+class PerintahSettings:
+    """[perintah] - hex commands sent to the compression machine"""
+    bersih: str = ""
+    start: str = ""
+    stop: str = ""
+
+
+@dataclass(frozen=True)
+class DaemonSettings:
+    """[daemon] - threadSinkData options"""
+    delay: float = 2.0
+    batch_size: int = 1
+    concurrency: int = 1
+    listen: bool = False
+    poll_fallback: float = 60.0
+    lease: float = 120.0
+    max_percobaan: int = 8
+    backoff_dasar: float = 5.0
+    backoff_maks: float = 900.0
+    metrics_port: int = 0
+    stall_detik: float = 600.0
+    partisi_ke_depan: int = 3
+
+    def sebagai_kwargs(self):
+        """
+        Keyword arguments for threadSinkData (everything except delay)
+
+        Returns:
+            Dictionary of option name to value
+        """
+        return {f.name: getattr(self, f.name) for f in fields(self) if f.name != "delay"}
+
+
+@dataclass(frozen=True)
+class Settings:
+    """Typed, read-only snapshot of config.cnf"""
+    data: DataSettings
+    webser: WebserSettings
+    alatUji: AlatUjiSettings = field(default_factory=AlatUjiSettings)
+    perintah: PerintahSettings = field(default_factory=PerintahSettings)
+    daemon: DaemonSettings = field(default_factory=DaemonSettings)
+    path: str = ""
+    mtime: float = 0.0
+
+
+def _bagian(config, section, cls):
+    """Build one section dataclass, converting each option to the field's type"""
+    nilai = {}
+    for f in fields(cls):
+        if not config.has_option(section, f.name):
+            continue
+        mentah = config.get(section, f.name).strip()
+        try:
+            if f.type is bool:
+                nilai[f.name] = config.getboolean(section, f.name)
+            elif f.type is int:
+                nilai[f.name] = int(mentah)
+            elif f.type is float:
+                nilai[f.name] = float(mentah)
+            else:
+                # Nilai di config.cnf boleh diberi kutip, misal database = 'alatujidb'
+                nilai[f.name] = mentah.strip("'\"")
+        except ValueError:
+            raise SettingsError(f"[{section}] {f.name} = {mentah!r} tidak valid")
+    try:
+        return cls(**nilai)
+    except TypeError:
+        wajib = [f.name for f in fields(cls)
+                 if f.name not in nilai and f.default is MISSING and f.default_factory is MISSING]
+        raise SettingsError(f"[{section}] opsi wajib tidak ada: {', '.join(wajib)}")
+
+
+def muat(path=None):
+    """
+    Parse and validate config.cnf
+
+    Args:
+        path: File to read (default: config.cnf next to the application)
+
+    Returns:
+        Settings instance
+
+    Raises:
+        SettingsError: file missing, required option missing or invalid value
+    """
+    path = path or resource_path(NAMA_FILE)
+    config = configparser.RawConfigParser(inline_comment_prefixes=(";",))
+    mtime = os.path.getmtime(path) if os.path.exists(path) else 0.0
+    if not config.read(path):
+        raise SettingsError(f"File konfigurasi tidak ditemukan: {path}")
+
+    hasil = Settings(
+        data=_bagian(config, "data", DataSettings),
+        webser=_bagian(config, "webser", WebserSettings),
+        alatUji=_bagian(config, "alatUji", AlatUjiSettings),
+        perintah=_bagian(config, "perintah", PerintahSettings),
+        daemon=_bagian(config, "daemon", DaemonSettings),
+        path=path,
+        mtime=mtime,
+    )
+    if hasil.data.pool_min < 0 or hasil.data.pool_max < max(1, hasil.data.pool_min):
+        raise SettingsError("[data] pool_max harus >= pool_min dan >= 1")
+    return hasil
+
+
+_settings = None
+_settings_lock = threading.Lock()
+_cek_terakhir = 0.0
+
+# Jeda minimum (detik) antara dua pemeriksaan mtime config.cnf
+INTERVAL_CEK = 2.0
+
+
+def get_settings():
+    """
+    Get the current settings, loading config.cnf on first use
+
+    The file's mtime is checked at most every INTERVAL_CEK seconds. When it
+    changed, the file is parsed into a new Settings object that replaces the
+    old one in a single assignment, so readers never see a half-updated
+    configuration. A reload that fails validation is logged and the previous
+    settings are kept.
+
+    Returns:
+        Settings instance
+    """
+    global _settings, _cek_terakhir
+    sekarang = time.monotonic()
+    if _settings is not None and sekarang - _cek_terakhir < INTERVAL_CEK:
+        return _settings
+    with _settings_lock:
+        if _settings is None:
+            _settings = muat()
+            _cek_terakhir = sekarang
+            return _settings
+        if sekarang - _cek_terakhir < INTERVAL_CEK:
+            return _settings
+        _cek_terakhir = sekarang
+        try:
+            mtime = os.path.getmtime(_settings.path)
+        except OSError:
+            return _settings
+        if mtime != _settings.mtime:
+            try:
+                _settings = muat(_settings.path)
+                logger.info(f"Konfigurasi dimuat ulang dari {_settings.path}")
+            except Exception as e:
+                logger.error(f"Gagal memuat ulang konfigurasi, tetap memakai yang lama: {e}")
+                # Jangan coba file yang sama terus-menerus
+                _settings = replace(_settings, mtime=mtime)
+    return _settings
+
+
+def reload_settings():
+    """Force the next get_settings() call to check the file"""
+    global _cek_terakhir
+    _cek_terakhir = 0.0
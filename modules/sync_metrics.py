@@ -0,0 +1,259 @@
+import json
+import logging
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+logger = logging.getLogger(__name__)
+
+# Batas bucket histogram latensi (detik), gaya Prometheus
+BUCKET_ERP = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+BUCKET_DB = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+
+
+class Histogram:
+    """Cumulative-bucket latency histogram (thread-safe)"""
+
+    def __init__(self, bucket):
+        self.bucket = tuple(bucket)
+        self._lock = threading.Lock()
+        self._hitung = [0] * len(self.bucket)
+        self._jumlah = 0
+        self._total = 0.0
+
+    def amati(self, detik):
+        """Record one observation in seconds"""
+        with self._lock:
+            self._jumlah += 1
+            self._total += detik
+            for i, batas in enumerate(self.bucket):
+                if detik <= batas:
+                    self._hitung[i] += 1
+
+    def snapshot(self):
+        """
+        Returns:
+            Dictionary with bucket counts (cumulative), count and sum
+        """
+        with self._lock:
+            return {
+                "bucket": dict(zip(self.bucket, self._hitung)),
+                "count": self._jumlah,
+                "sum": round(self._total, 6),
+            }
+
+
+class SyncMetrics:
+    """
+    Counters and gauges of one threadSinkData instance
+
+    Updated by the daemon thread, read by the GUI (snapshot()) and by the
+    local /metrics and /health endpoints.
+    """
+
+    def __init__(self, stall_detik=600.0):
+        """
+        Initialize metrics
+
+        Args:
+            stall_detik: Backlog without a successful push for this long is reported unhealthy
+        """
+        self.stall_detik = stall_detik
+        self._lock = threading.Lock()
+        self.mulai = time.time()
+        self.siklus = 0
+        self.tersinkron = 0
+        self.gagal = 0
+        self.ditolak = 0
+        self.dead_letter = 0
+        self.backlog = None
+        self.sukses_terakhir = None
+        self.durasi_siklus_terakhir = 0.0
+        self.breaker = "tertutup"
+        self.berjalan = False
+        self.latensi_erp = Histogram(BUCKET_ERP)
+        self.latensi_db = Histogram(BUCKET_DB)
+
+    def tambah(self, tersinkron=0, gagal=0, ditolak=0, dead_letter=0):
+        """Add to the row counters"""
+        with self._lock:
+            self.tersinkron += tersinkron
+            self.gagal += gagal
+            self.ditolak += ditolak
+            self.dead_letter += dead_letter
+            if tersinkron:
+                self.sukses_terakhir = time.time()
+
+    def catat_siklus(self, durasi, backlog=None, breaker=None):
+        """Record the end of a sync cycle"""
+        with self._lock:
+            self.siklus += 1
+            self.durasi_siklus_terakhir = durasi
+            if backlog is not None:
+                self.backlog = backlog
+            if breaker is not None:
+                self.breaker = breaker
+
+    def ukur_db(self):
+        """Context manager timing a database call into latensi_db"""
+        return _Stopwatch(self.latensi_db)
+
+    def kesehatan(self):
+        """
+        Health verdict for /health
+
+        Returns:
+            Tuple (sehat, alasan)
+        """
+        with self._lock:
+            if not self.berjalan:
+                return False, "daemon tidak berjalan"
+            if self.breaker == "terbuka":
+                return False, "circuit breaker ERP terbuka"
+            if self.backlog:
+                acuan = self.sukses_terakhir or self.mulai
+                if time.time() - acuan > self.stall_detik:
+                    return False, f"backlog {self.backlog} baris tanpa sukses selama > {self.stall_detik:.0f}s"
+            return True, "ok"
+
+    def snapshot(self):
+        """
+        Point-in-time copy of all metrics (safe to call from the GUI thread)
+
+        Returns:
+            Dictionary of counters, gauges and histograms
+        """
+        sehat, alasan = self.kesehatan()
+        with self._lock:
+            return {
+                "berjalan": self.berjalan,
+                "sehat": sehat,
+                "alasan": alasan,
+                "uptime_s": round(time.time() - self.mulai, 1),
+                "siklus": self.siklus,
+                "tersinkron": self.tersinkron,
+                "gagal": self.gagal,
+                "ditolak": self.ditolak,
+                "dead_letter": self.dead_letter,
+                "backlog": self.backlog,
+                "sukses_terakhir": self.sukses_terakhir,
+                "durasi_siklus_terakhir_s": round(self.durasi_siklus_terakhir, 4),
+                "breaker": self.breaker,
+                "latensi_erp": self.latensi_erp.snapshot(),
+                "latensi_db": self.latensi_db.snapshot(),
+            }
+
+
+class _Stopwatch:
+    def __init__(self, histogram):
+        self.histogram = histogram
+
+    def __enter__(self):
+        self.mulai = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.amati(time.perf_counter() - self.mulai)
+        return False
+
+
+def format_prometheus(snap):
+    """
+    Render a snapshot in the Prometheus text exposition format
+
+    Args:
+        snap: SyncMetrics.snapshot() result
+
+    Returns:
+        String for the /metrics response body
+    """
+    baris = []
+
+    def metrik(nama, jenis, bantuan, nilai):
+        baris.append(f"# HELP {nama} {bantuan}")
+        baris.append(f"# TYPE {nama} {jenis}")
+        baris.append(f"{nama} {nilai}")
+
+    metrik("sinkron_up", "gauge", "1 jika daemon berjalan", int(snap["berjalan"]))
+    metrik("sinkron_sehat", "gauge", "1 jika /health ok", int(snap["sehat"]))
+    metrik("sinkron_siklus_total", "counter", "Jumlah siklus sinkronisasi", snap["siklus"])
+    metrik("sinkron_baris_tersinkron_total", "counter", "Baris berhasil dikirim ke ERP", snap["tersinkron"])
+    metrik("sinkron_baris_gagal_total", "counter", "Pengiriman baris yang gagal", snap["gagal"])
+    metrik("sinkron_baris_ditolak_total", "counter", "Baris ditunda karena circuit breaker", snap["ditolak"])
+    metrik("sinkron_baris_dead_letter_total", "counter", "Baris dipindah ke status G", snap["dead_letter"])
+    metrik("sinkron_backlog", "gauge", "Baris sinkron B/P yang belum terkirim",
+           snap["backlog"] if snap["backlog"] is not None else "NaN")
+    metrik("sinkron_sukses_terakhir_timestamp", "gauge", "Unix time sukses terakhir",
+           snap["sukses_terakhir"] or 0)
+    metrik("sinkron_durasi_siklus_detik", "gauge", "Durasi siklus terakhir", snap["durasi_siklus_terakhir_s"])
+    metrik("sinkron_breaker_terbuka", "gauge", "1 jika circuit breaker ERP terbuka",
+           int(snap["breaker"] == "terbuka"))
+
+    for nama, bantuan, kunci in (
+        ("sinkron_latensi_erp_detik", "Latensi request ke ERP", "latensi_erp"),
+        ("sinkron_latensi_db_detik", "Latensi query database daemon", "latensi_db"),
+    ):
+        h = snap[kunci]
+        baris.append(f"# HELP {nama} {bantuan}")
+        baris.append(f"# TYPE {nama} histogram")
+        for batas, jumlah in h["bucket"].items():
+            baris.append(f'{nama}_bucket{{le="{batas}"}} {jumlah}')
+        baris.append(f'{nama}_bucket{{le="+Inf"}} {h["count"]}')
+        baris.append(f"{nama}_sum {h['sum']}")
+        baris.append(f"{nama}_count {h['count']}")
+
+    return "\n".join(baris) + "\n"
+
+
+class MetricsServer(ThreadingHTTPServer):
+    """
+    Local HTTP endpoint for a SyncMetrics instance
+
+    - GET /metrics  Prometheus text format
+    - GET /health   JSON, HTTP 200 when healthy, 503 otherwise
+    - GET /snapshot JSON of SyncMetrics.snapshot()
+    """
+
+    daemon_threads = True
+
+    def __init__(self, metrics, port, host="127.0.0.1"):
+        super().__init__((host, port), _MetricsHandler)
+        self.metrics = metrics
+        self._thread = None
+
+    def start(self):
+        """Serve in a background thread"""
+        self._thread = threading.Thread(target=self.serve_forever, name="SyncMetrics", daemon=True)
+        self._thread.start()
+        logger.info(f"Endpoint metrics aktif di http://{self.server_address[0]}:{self.server_address[1]}/metrics")
+
+    def stop(self):
+        """Stop serving and release the port"""
+        self.shutdown()
+        self.server_close()
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        snap = self.server.metrics.snapshot()
+        if self.path == "/metrics":
+            self._kirim(200, format_prometheus(snap), "text/plain; version=0.0.4")
+        elif self.path == "/health":
+            isi = {"status": "ok" if snap["sehat"] else "tidak sehat", "alasan": snap["alasan"],
+                   "backlog": snap["backlog"], "sukses_terakhir": snap["sukses_terakhir"]}
+            self._kirim(200 if snap["sehat"] else 503, json.dumps(isi), "application/json")
+        elif self.path == "/snapshot":
+            self._kirim(200, json.dumps(snap, default=str), "application/json")
+        else:
+            self._kirim(404, "not found", "text/plain")
+
+    def _kirim(self, kode, isi, jenis):
+        data = isi.encode("utf-8")
+        self.send_response(kode)
+        self.send_header("Content-Type", jenis)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
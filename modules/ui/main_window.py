@@ -12,15 +12,13 @@ from tkinter import ttk, messagebox
 from tkinter.scrolledtext import ScrolledText
 
 from modules.utils import resource_path, ThreadSafeLogHandler
+from modules import bulk_loader, excel_stream, pipeline_pengujian, settings
 
 import pandas as pd
 import openpyxl
-import requests
 import glob
 from datetime import datetime
-import configparser
 import xlwings as xw
-from sqlalchemy import create_engine
 from tkinter import filedialog
 
 # Import other necessary modules
@@ -65,11 +63,16 @@ class ExcelProcessorGUI:
         self.file_excel_2 = tk.StringVar()
         self.output_dir = tk.StringVar()
         self.file_csv = tk.StringVar()
-        self.db_user = tk.StringVar(value='postgres')
-        self.db_password = tk.StringVar(value='adhimix')
-        self.db_host = tk.StringVar(value='localhost')
-        self.db_port = tk.StringVar(value='5432')
-        self.db_name = tk.StringVar(value='alatujidb')
+        # Default koneksi database diambil dari [data] di config.cnf
+        try:
+            dataDb = settings.get_settings().data
+        except settings.SettingsError:
+            dataDb = settings.DataSettings(database='alatujidb', host='localhost', user='postgres', password='adhimix')
+        self.db_user = tk.StringVar(value=dataDb.user)
+        self.db_password = tk.StringVar(value=dataDb.password)
+        self.db_host = tk.StringVar(value=dataDb.host)
+        self.db_port = tk.StringVar(value=str(dataDb.port))
+        self.db_name = tk.StringVar(value=dataDb.database)
         self.table_name = tk.StringVar(value='pengujian')
         
         # Default values
@@ -878,19 +881,20 @@ class ExcelProcessorGUI:
         try:
             self.update_status("Starting full process...")
             
-            # Step 1: Copy data
+            # Steps 1-3: Copy data, BEBAN, idpengujian, BJDT ID and CSV in one pass
             if self.logger is None:
                 self.setup_logging()
-            self.logger.info("=== Starting Data Copy Process ===")
-            self.copy_excel_data()
-            
-            # Step 2: Get BJDT ID
-            self.logger.info("=== Starting BJDT ID Process ===")
-            self.get_bjdt_ids()
-            
-            # Step 3: Generate CSV files
-            self.logger.info("=== Starting CSV Generation ===")
-            self.generate_csv_files()
+            self.logger.info("=== Starting PENGUJIAN Pipeline (copy, BEBAN, idpengujian, BJDT ID, CSV) ===")
+            try:
+                self.run_pipeline()
+            except pipeline_pengujian.PipelineError as e:
+                self.logger.warning(f"Pipeline tidak bisa dipakai ({e}), menjalankan langkah terpisah")
+                self.logger.info("=== Starting Data Copy Process ===")
+                self.copy_excel_data()
+                self.logger.info("=== Starting BJDT ID Process ===")
+                self.get_bjdt_ids()
+                self.logger.info("=== Starting CSV Generation ===")
+                self._generate_csv_files_logic()
             messagebox.showinfo("Success", "Generate CSV files separated by date successfully!")
             
             # Step 4: Upload to database
@@ -909,6 +913,16 @@ class ExcelProcessorGUI:
         finally:
             self.enable_buttons()
 
+    def run_pipeline(self):
+        """Copy, BEBAN, idpengujian, BJDT ID and CSV with one load and one save of the PENGUJIAN workbook"""
+        pipeline = pipeline_pengujian.PipelinePengujian(
+            self.file_excel_1.get(), self.nama_sheet_1.get(), self.file_excel_2.get(), self.output_dir.get(),
+            sheet_odoo=self.nama_sheet_2.get(), sheet_pengujian=self.nama_sheet_3.get(),
+            sheet_bjdt=self.nama_sheet_4.get(), id_berikutnya=self._next_idpengujian, log=self.logger
+        )
+        pipeline.jalankan()
+        return pipeline
+
     def copy_data_only(self):
         threading.Thread(target=self.copy_data_process, daemon=True).start()
 
@@ -986,31 +1000,15 @@ class ExcelProcessorGUI:
         """Copy data from source Excel to target Excel"""
         try:
         # Column names to copy
-            kolom_yang_dicopy = ['Docket', 'Nomor Kontrak', 'Nomor SPP', 'Proyek', 'Kontraktor', 'Mutu', 'No. Urut', 
-                            'Tanggal Rencana', 'Rencana Umur Test', 'Bentuk Benda Uji', 'Target (%)', 
-                            'Tanggal Realisasi Test', 'Realisasi Umur Test', 'Hasil Test', 'Rusak', 
-                            'Kode Benda Uji', 'Jenis Retakan', 'Kn', 'Mpa', 'Kg/cm2', 'Berat (kg)', 
-                            'Persentase Kekuatan (%)']
+            kolom_yang_dicopy = pipeline_pengujian.KOLOM_ODOO
             
-            # Load source workbook
+            # Read source workbook (read-only, only the copied columns)
             self.logger.info("Loading source Excel file...")
-            wb1 = openpyxl.load_workbook(self.file_excel_1.get())
-            sheet1 = wb1[self.nama_sheet_1.get()]
-            
-            # Get header and column indices
-            header = [cell.value for cell in sheet1[1]]
-            index_kolom = [header.index(k) + 1 for k in kolom_yang_dicopy if k in header]
-            
-            self.logger.info(f"Found {len(index_kolom)} columns to copy")
-            
-            # Extract data from specified columns
-            data_kolom = []
-            for col in index_kolom:
-                col_data = []
-                for row in sheet1.iter_rows(min_row=2, min_col=col, max_col=col):
-                    val = row[0].value
-                    col_data.append(val)
-                data_kolom.append(col_data)
+            with excel_stream.PembacaExcel(self.file_excel_1.get(), self.nama_sheet_1.get()) as pembaca:
+                nama_kolom = list(pembaca.indeks(kolom_yang_dicopy, wajib=False))
+                self.logger.info(f"Found {len(nama_kolom)} columns to copy")
+                isi_kolom = pembaca.kolom(nama_kolom)
+            data_kolom = [isi_kolom[k] for k in nama_kolom]
             
             # Check for duplicates (simplified version)
             total_rows = len(data_kolom[0]) if data_kolom else 0
@@ -1042,7 +1040,7 @@ class ExcelProcessorGUI:
                 
                 # Save the results
                 if beban_processor.save_excel():
-                    self.logger.info("BEBAN values calculated and saved successfully")
+                    self.logger.info(f"BEBAN values calculated and saved successfully (seed {beban_processor.konteks.seed})")
                 else:
                     self.logger.error("Failed to save BEBAN calculations")
                 
@@ -1073,6 +1071,32 @@ class ExcelProcessorGUI:
         
     def update_idpengujian(self):
         """Update idpengujian in pengujian sheet"""
+        self._write_idpengujian(self._next_idpengujian())
+
+    def _next_idpengujian(self):
+        """Next idpengujian: database first, latest CSV when the database is unreachable"""
+        next_id = self._next_idpengujian_db()
+        if next_id is None:
+            next_id = self._next_idpengujian_csv()
+        return next_id
+
+    def _next_idpengujian_db(self):
+        """Next idpengujian from the database (max id / serial sequence), None if unreachable"""
+        try:
+            conn = bulk_loader.koneksi(
+                self.db_user.get(), self.db_password.get(), self.db_host.get(),
+                self.db_port.get(), self.db_name.get()
+            )
+            try:
+                return bulk_loader.id_berikutnya(conn, self.table_name.get())
+            finally:
+                conn.close()
+        except Exception as e:
+            self.logger.warning(f"idpengujian dari database gagal ({e}), memakai CSV terakhir")
+            return None
+
+    def _next_idpengujian_csv(self):
+        """Next idpengujian from the latest generated CSV (fallback when the database is unreachable)"""
         csv_files = glob.glob(os.path.join(self.output_dir.get(), "*.csv"))
         if csv_files:
             latest_csv = max(csv_files, key=os.path.getctime)
@@ -1084,8 +1108,9 @@ class ExcelProcessorGUI:
                 next_id = 1
         else:
             next_id = 1
-        
-        # Update idpengujian value in pengujian sheet
+        return next_id
+
+    def _write_idpengujian(self, next_id):
         wb_pengujian = openpyxl.load_workbook(self.file_excel_2.get())
         ws_pengujian = wb_pengujian[self.nama_sheet_3.get()]
         
@@ -1109,23 +1134,19 @@ class ExcelProcessorGUI:
             wb.save()
             wb.close()
         
-        # Load workbooks
-        wb_data = openpyxl.load_workbook(self.file_excel_2.get(), data_only=True)
-        sheet_data = wb_data[self.nama_sheet_4.get()]
+        # Read Docket / No URUT (formula results) without loading the whole workbook
+        with excel_stream.PembacaExcel(self.file_excel_2.get(), self.nama_sheet_4.get(), data_only=True) as pembaca:
+            header = pembaca.header
+            try:
+                data_bjdt = list(pembaca.baris(['Docket', 'No URUT'], tipe={'Docket': excel_stream.teks,
+                                                                          'No URUT': excel_stream.teks}))
+            except excel_stream.ExcelStreamError as e:
+                self.logger.error(f"Required column not found: {e}")
+                return
         
         wb_write = openpyxl.load_workbook(self.file_excel_2.get())
         sheet_write = wb_write[self.nama_sheet_4.get()]
         
-        # Get header and column indices
-        header = [cell.value for cell in sheet_data[1]]
-        
-        try:
-            index_doc_no = header.index('Docket')
-            index_no_urut = header.index('No URUT')
-        except ValueError as e:
-            self.logger.error(f"Required column not found: {e}")
-            return
-        
         # Add ID column if not exists
         if 'ID' not in header:
             sheet_write.cell(row=1, column=len(header) + 1, value='ID')
@@ -1136,25 +1157,14 @@ class ExcelProcessorGUI:
         error_logs = []
         
         # Process each row
-        for i, (row_data, row_write) in enumerate(zip(
-            sheet_data.iter_rows(min_row=2), 
-            sheet_write.iter_rows(min_row=2)
-        ), start=2):
-            
-            doc_no = row_data[index_doc_no].value
-            no_urut = row_data[index_no_urut].value
+        for i, (doc_no, no_urut) in enumerate(data_bjdt, start=2):
             
             if doc_no and no_urut:
-                doc_no = str(doc_no).strip()
-                no_urut = str(no_urut).strip()
-                url = f"https://rmc.adhimix.web.id/benda_uji/?doc_no={doc_no}&no_urut={no_urut}"
+                url = pipeline_pengujian.URL_BJDT.format(doc_no=doc_no, no_urut=no_urut)
                 
                 try:
                     self.logger.info(f"[{i}] Getting bjdt_id for Doc: {doc_no}, No Urut: {no_urut}...")
-                    response = requests.get(url)
-                    response.raise_for_status()
-                    data = response.json()
-                    bjdt_id = data.get("bjdt_id", "")
+                    bjdt_id = pipeline_pengujian.ambil_bjdt_id(doc_no, no_urut)
                     
                     if not bjdt_id:
                         self.logger.warning(f"bjdt_id NOT FOUND")
@@ -1162,13 +1172,13 @@ class ExcelProcessorGUI:
                     else:
                         self.logger.info(f"Found bjdt_id: {bjdt_id}")
                     
-                    row_write[index_bjdt_id].value = bjdt_id
+                    sheet_write.cell(row=i, column=index_bjdt_id + 1, value=bjdt_id)
                     
                 except Exception as e:
                     self.logger.error(f"ERROR on {url}: {e}")
                     error_logs.append(f"ERROR on {url}: {e}")
-                    # row_write cells can be MergedCell instances; runtime assignment is OK
-                    row_write[index_bjdt_id].value = ""  # type: ignore
+                    # The target cell can be a MergedCell instance; runtime assignment is OK
+                    sheet_write.cell(row=i, column=index_bjdt_id + 1).value = ""  # type: ignore
         
         # Save workbook
         wb_write.save(self.file_excel_2.get())
@@ -1229,75 +1239,53 @@ class ExcelProcessorGUI:
         """Upload CSV data to PostgreSQL database"""
         today = datetime.now().strftime('%Y-%m-%d')
         csv_file = os.path.join(self.output_dir.get(), f'{today}.csv')
-        
-        if not os.path.isfile(csv_file):
-            self.logger.error(f"File {csv_file} does not exist.")
-            return
-        
-        # Create database connection
-        engine = create_engine(f'postgresql+psycopg2://{self.db_user.get()}:{self.db_password.get()}@{self.db_host.get()}:{self.db_port.get()}/{self.db_name.get()}')
-        
-        # Read CSV
-        df = pd.read_csv(csv_file, delimiter=';')
-        self.logger.info(f"Number of rows to upload: {len(df)}")
-        
-        # Upload to PostgreSQL
-        try:
-            df.to_sql(self.table_name.get(), engine, if_exists='append', index=False)
-            self.logger.info("Upload completed successfully")
-            
-            # Display uploaded data
-            try:
-                uploaded_df = pd.read_sql_table(self.table_name.get(), engine)
-                self.logger.info(f"Total records in database: {len(uploaded_df)}")
-            except Exception as e:
-                self.logger.error(f"Failed to display uploaded data: {e}")
-                
-        except Exception as e:
-            # Some DB exceptions (like SQLAlchemy DBAPIError) expose an 'orig' with pgcode.
-            # Access it safely to avoid static type errors on generic Exception.
-            orig = getattr(e, 'orig', None)
-            pgcode = getattr(orig, 'pgcode', None)
-            if pgcode == '23505':
-                self.logger.error("Upload failed: DUPLICATE DATA DETECTED")
-            else:
-                self.logger.error(f"Upload error: {e}")
+        self._upload_csv(csv_file)
 
     def upload_to_database_files(self):
         """Upload CSV data to PostgreSQL database"""
-        today = datetime.now().strftime('%Y-%m-%d')
         csv_file = os.path.join(self.file_csv.get())
+        self._upload_csv(csv_file)
+
+    def _upload_csv(self, csv_file):
+        """
+        Bulk-load one daily CSV into the pengujian table (COPY via staging table)
         
+        Returns:
+            bulk_loader.UploadReport, or None when the upload failed
+        """
         if not os.path.isfile(csv_file):
             self.logger.error(f"File {csv_file} does not exist.")
             return
         
-        # Create database connection
-        engine = create_engine(f'postgresql+psycopg2://{self.db_user.get()}:{self.db_password.get()}@{self.db_host.get()}:{self.db_port.get()}/{self.db_name.get()}')
-        
-        # Read CSV
-        df = pd.read_csv(csv_file, delimiter=';')
-        self.logger.info(f"Number of rows to upload: {len(df)}")
+        try:
+            conn = bulk_loader.koneksi(
+                self.db_user.get(), self.db_password.get(), self.db_host.get(),
+                self.db_port.get(), self.db_name.get()
+            )
+        except Exception as e:
+            self.logger.error(f"Upload error: {e}")
+            return
         
         # Upload to PostgreSQL
         try:
-            df.to_sql(self.table_name.get(), engine, if_exists='append', index=False)
-            self.logger.info("Upload completed successfully")
-            
-            # Display uploaded data
-            try:
-                uploaded_df = pd.read_sql_table(self.table_name.get(), engine)
-                self.logger.info(f"Total records in database: {len(uploaded_df)}")
-            except Exception as e:
-                self.logger.error(f"Failed to display uploaded data: {e}")
-                
+            laporan = bulk_loader.muat_csv(conn, csv_file, tabel=self.table_name.get())
+            self.logger.info(f"Upload completed successfully: {laporan.ringkasan()}")
+            if laporan.bentrok_id:
+                self.logger.warning(
+                    f"{laporan.bentrok_id} baris tidak dimuat karena idpengujian sudah dipakai; "
+                    "jalankan update idpengujian lalu generate ulang CSV"
+                )
+            return laporan
+        except bulk_loader.BulkLoadError as e:
+            self.logger.error(f"Upload failed: {e}")
         except Exception as e:
-            orig = getattr(e, 'orig', None)
-            pgcode = getattr(orig, 'pgcode', None)
+            pgcode = getattr(e, 'pgcode', None)
             if pgcode == '23505':
                 self.logger.error("Upload failed: DUPLICATE DATA DETECTED")
             else:
                 self.logger.error(f"Upload error: {e}")
+        finally:
+            conn.close()
 
     def toggle_sync(self):
         """Toggle ODOO sync daemon on/off"""
@@ -1323,10 +1311,7 @@ class ExcelProcessorGUI:
             from modules.daemon_sync import threadSinkData
             
             # Read config (I/O operation in worker thread)
-            fileConfig = resource_path("config.cnf")
-            config = configparser.RawConfigParser()
-            config.read(fileConfig)
-            tunda = config.get("daemon", "delay") if config.has_option("daemon", "delay") else '2'
+            opsiDaemon = settings.get_settings().daemon
             
             # Update GUI from main thread
             self.root.after(0, self._update_sync_ui_starting)
@@ -1335,8 +1320,9 @@ class ExcelProcessorGUI:
             self.daemon = threadSinkData(
                 1, 
                 "ThreadSinkron", 
-                float(tunda),
-                log_queue=self.log_queue  # Pass queue, NOT widget
+                opsiDaemon.delay,
+                log_queue=self.log_queue,  # Pass queue, NOT widget
+                **opsiDaemon.sebagai_kwargs()
             )
             self.daemon.start()
             self.daemon_running = True
@@ -1368,6 +1354,19 @@ class ExcelProcessorGUI:
             self.logger.info(f"Thread name: {self.daemon.name if self.daemon else 'N/A'}")
             self.logger.info(f"Is alive: {self.daemon.is_alive() if self.daemon else False}")
             self.logger.info("=" * 60)
+        self.root.after(2000, self._poll_sync_metrics)
+    
+    def _poll_sync_metrics(self):
+        """Show daemon metrics in the status label every 2 s (main thread only)"""
+        if not self.daemon_running or not self.daemon:
+            return
+        snap = self.daemon.snapshot()
+        status = "OK" if snap["sehat"] else f"PERINGATAN - {snap['alasan']}"
+        backlog = snap["backlog"] if snap["backlog"] is not None else "-"
+        self.status_label.configure(
+            text=f"ODOO Sync {status} | terkirim: {snap['tersinkron']} | gagal: {snap['gagal']} | backlog: {backlog}"
+        )
+        self.root.after(2000, self._poll_sync_metrics)
         
     
     def _show_sync_error(self, error_msg):
@@ -1433,9 +1432,11 @@ class ExcelProcessorGUI:
 
     def test_db_connection(self):
         try:
-            engine = create_engine(f'postgresql+psycopg2://{self.db_user.get()}:{self.db_password.get()}@{self.db_host.get()}:{self.db_port.get()}/{self.db_name.get()}')
-            connection = engine.connect()
-            connection.close()
+            conn = bulk_loader.koneksi(
+                self.db_user.get(), self.db_password.get(), self.db_host.get(),
+                self.db_port.get(), self.db_name.get()
+            )
+            conn.close()
             messagebox.showinfo("Success", "Database connection successful!")
         except Exception as e:
             messagebox.showerror("Error", f"Database connection failed: {str(e)}")
@@ -0,0 +1,70 @@
+"""
+Fixture database untuk test yang butuh PostgreSQL
+
+Test database dilewati kecuali PENGUJIAN_TEST_DSN menunjuk ke server lokal
+yang boleh dipakai membuat database sementara, misalnya:
+
+    PENGUJIAN_TEST_DSN="postgresql://postgres:@/postgres?host=/tmp/pgdata" python -m pytest -q
+
+database_schema.sql dijalankan sekali per sesi pada database baru yang
+dihapus lagi di akhir sesi.
+"""
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+SKEMA = ROOT / "database_schema.sql"
+
+# Tabel yang dikosongkan sebelum setiap test
+TABEL = ("pengujian", "pengujian_kunci", "pengujian_duplikat", "ringkasan_harian")
+
+
+@pytest.fixture(scope="session")
+def dsn():
+    """DSN of a throwaway database with database_schema.sql applied"""
+    psycopg2 = pytest.importorskip("psycopg2")
+    from psycopg2.extensions import make_dsn, parse_dsn
+
+    utama = os.environ.get("PENGUJIAN_TEST_DSN")
+    if not utama:
+        pytest.skip("PENGUJIAN_TEST_DSN tidak diset")
+    nama = f"pengujian_test_{os.getpid()}"
+    admin = psycopg2.connect(utama)
+    admin.autocommit = True
+    with admin.cursor() as kursor:
+        kursor.execute(f"DROP DATABASE IF EXISTS {nama}")
+        kursor.execute(f"CREATE DATABASE {nama}")
+    hasil = make_dsn(**{**parse_dsn(utama), "dbname": nama})
+    try:
+        konekdb = psycopg2.connect(hasil)
+        konekdb.autocommit = True
+        with konekdb.cursor() as kursor:
+            kursor.execute(SKEMA.read_text(encoding="utf-8"))
+        konekdb.close()
+        yield hasil
+    finally:
+        with admin.cursor() as kursor:
+            kursor.execute(f"DROP DATABASE IF EXISTS {nama} WITH (FORCE)")
+        admin.close()
+
+
+@pytest.fixture
+def konekdb(dsn):
+    """Autocommit connection to the test database, with empty tables"""
+    import psycopg2
+
+    konekdb = psycopg2.connect(dsn)
+    konekdb.autocommit = True
+    with konekdb.cursor() as kursor:
+        kursor.execute(
+            "SELECT string_agg(t, ', ') FROM unnest(%s::text[]) t WHERE to_regclass(t) IS NOT NULL",
+            (list(TABEL),),
+        )
+        kursor.execute(f"TRUNCATE {kursor.fetchone()[0]} RESTART IDENTITY")
+    yield konekdb
+    konekdb.close()
@@ -0,0 +1,162 @@
+"""Upload CSV (modules/bulk_loader.py) dan kunci global pengujian_kunci (database_schema.sql bagian 14)"""
+import pytest
+
+psycopg2 = pytest.importorskip("psycopg2")
+
+from modules import bulk_loader
+
+HEADER = "idpengujian;tgluji;nodocket;nourutbenda;bujnama;umur;bebanmpa"
+
+
+def _csv(tmp_path, *baris, nama="harian.csv", header=HEADER):
+    path = tmp_path / nama
+    path.write_text("\n".join((header,) + baris) + "\n", encoding="utf-8")
+    return str(path)
+
+
+def _jumlah(konekdb):
+    with konekdb.cursor() as kursor:
+        kursor.execute("SELECT count(*) FROM pengujian")
+        return kursor.fetchone()[0]
+
+
+def _kunci_cocok(konekdb):
+    with konekdb.cursor() as kursor:
+        kursor.execute("SELECT idpengujian, nodocket, nourutbenda FROM pengujian_kunci ORDER BY 1")
+        kunci = kursor.fetchall()
+        kursor.execute("SELECT idpengujian, nodocket, nourutbenda FROM pengujian ORDER BY 1")
+        assert kunci == kursor.fetchall()
+
+
+def test_upload_ulang_tanggal_lain_dilewati(konekdb, tmp_path):
+    pertama = bulk_loader.muat_csv(konekdb, _csv(tmp_path, "1;2024-01-05;D001;01;K-225;7;20.5", "2;2024-01-05;D001;02;K-225;7;21"))
+    assert pertama.dimasukkan == 2
+    # Benda uji yang sama, tanggal uji (partisi) lain, tanpa idpengujian
+    ulang = bulk_loader.muat_csv(
+        konekdb,
+        _csv(tmp_path, "2024-02-05;D001;01;K-225;7;20.5", "2024-02-05;D001;03;K-225;7;22",
+             nama="ulang.csv", header="tgluji;nodocket;nourutbenda;bujnama;umur;bebanmpa"),
+    )
+    assert (ulang.dibaca, ulang.dimasukkan, ulang.dilewati, ulang.bentrok_id) == (2, 1, 1, 0)
+    assert _jumlah(konekdb) == 3
+    _kunci_cocok(konekdb)
+
+
+def test_upload_file_sama_dua_kali(konekdb, tmp_path):
+    path = _csv(tmp_path, "1;2024-01-05;D001;01;K-225;7;20.5", "2;2024-03-05;D002;01;K-300;28;30")
+    bulk_loader.muat_csv(konekdb, path)
+    ulang = bulk_loader.muat_csv(konekdb, path)
+    assert (ulang.dimasukkan, ulang.dilewati, ulang.bentrok_id) == (0, 2, 0)
+
+
+def test_bentrok_idpengujian(konekdb, tmp_path):
+    bulk_loader.muat_csv(konekdb, _csv(tmp_path, "1;2024-01-05;D001;01;K-225;7;20.5"))
+    # id 1 sudah dipakai D001/01 di bulan lain: dilewati dan dilaporkan
+    laporan = bulk_loader.muat_csv(konekdb, _csv(tmp_path, "1;2024-02-05;D009;01;K-225;7;20.5", nama="b.csv"))
+    assert (laporan.dimasukkan, laporan.bentrok_id) == (0, 1)
+    assert "idpengujian bentrok" in laporan.ringkasan()
+    _kunci_cocok(konekdb)
+
+
+def test_duplikat_dalam_satu_file(konekdb, tmp_path):
+    laporan = bulk_loader.muat_csv(
+        konekdb,
+        _csv(
+            tmp_path,
+            "1;2024-01-05;D001;01;K-225;7;20.5",
+            "2;2024-02-05;D001;01;K-225;7;20.5",
+            "2;2024-02-06;D002;01;K-225;7;20.5",
+        ),
+    )
+    # Baris pertama setiap kunci yang masuk; baris 3 kalah id dengan baris 2 yang dilewati
+    assert (laporan.dimasukkan, laporan.dilewati, laporan.bentrok_id) == (1, 2, 0)
+    _kunci_cocok(konekdb)
+
+
+def test_kunci_null_tidak_dihitung_bentrok(konekdb, tmp_path):
+    laporan = bulk_loader.muat_csv(
+        konekdb,
+        _csv(tmp_path, "1;2024-01-05;;01;K-225;7;20.5", "2;2024-01-05;;01;K-225;7;21", "3;2024-01-05;D001;01;K-225;7;19"),
+    )
+    assert (laporan.dimasukkan, laporan.dilewati, laporan.bentrok_id) == (3, 0, 0)
+
+
+def test_urutan_maju_setelah_upload(konekdb, tmp_path):
+    bulk_loader.muat_csv(konekdb, _csv(tmp_path, "41;2024-01-05;D001;01;K-225;7;20.5"))
+    assert bulk_loader.id_berikutnya(konekdb) == 42
+    with konekdb.cursor() as kursor:
+        kursor.execute("INSERT INTO pengujian(tgluji, nodocket, nourutbenda) VALUES ('2024-01-06', 'D002', '01') RETURNING idpengujian")
+        assert kursor.fetchone()[0] == 42
+
+
+def test_insert_langsung_ditolak(konekdb):
+    with konekdb.cursor() as kursor:
+        kursor.execute("INSERT INTO pengujian(tgluji, nodocket, nourutbenda) VALUES ('2024-01-05', 'D001', '01')")
+        with pytest.raises(psycopg2.errors.UniqueViolation):
+            kursor.execute("INSERT INTO pengujian(tgluji, nodocket, nourutbenda) VALUES ('2024-05-05', 'D001', '01')")
+        with pytest.raises(psycopg2.errors.UniqueViolation):
+            kursor.execute("INSERT INTO pengujian(idpengujian, tgluji, nodocket, nourutbenda) VALUES (1, '2024-05-05', 'D002', '01')")
+    assert _jumlah(konekdb) == 1
+
+
+def test_kunci_mengikuti_update_dan_delete(konekdb):
+    with konekdb.cursor() as kursor:
+        kursor.execute(
+            """ INSERT INTO pengujian(tgluji, nodocket, nourutbenda)
+                VALUES ('2024-01-05', 'D001', '01'), ('2024-01-05', 'D001', '02'), ('2024-01-06', 'D002', '01') """
+        )
+        # Tanpa mengubah kunci, termasuk pindah partisi
+        kursor.execute("UPDATE pengujian SET sinkron = 'S'")
+        kursor.execute("UPDATE pengujian SET tgluji = '2024-03-01' WHERE nodocket = 'D002'")
+        # Kunci berubah: kunci lama dilepas dan bisa dipakai baris lain
+        kursor.execute("UPDATE pengujian SET nourutbenda = '03' WHERE nodocket = 'D001' AND nourutbenda = '02'")
+        kursor.execute("UPDATE pengujian SET nourutbenda = '02' WHERE nodocket = 'D002'")
+        kursor.execute("UPDATE pengujian SET nodocket = 'D001' WHERE nodocket = 'D002'")
+        with pytest.raises(psycopg2.errors.UniqueViolation):
+            kursor.execute("UPDATE pengujian SET nourutbenda = '01' WHERE tgluji = '2024-03-01'")
+        kursor.execute("DELETE FROM pengujian WHERE nodocket = 'D001' AND nourutbenda = '01'")
+        # Kunci yang dihapus boleh dipakai lagi
+        kursor.execute("INSERT INTO pengujian(tgluji, nodocket, nourutbenda) VALUES ('2024-04-01', 'D001', '01')")
+    _kunci_cocok(konekdb)
+
+
+def test_tabel_partisi_tanpa_kunci(konekdb, tmp_path):
+    with konekdb.cursor() as kursor:
+        kursor.execute("DROP TABLE IF EXISTS uji_partisi")
+        kursor.execute("CREATE TABLE uji_partisi (LIKE pengujian INCLUDING DEFAULTS) PARTITION BY RANGE (tgluji)")
+    try:
+        with pytest.raises(bulk_loader.BulkLoadError, match="uji_partisi_kunci"):
+            bulk_loader.muat_csv(konekdb, _csv(tmp_path, "1;2024-01-05;D001;01;K-225;7;20.5"), tabel="uji_partisi")
+    finally:
+        with konekdb.cursor() as kursor:
+            kursor.execute("DROP TABLE uji_partisi")
+
+
+def test_truncate_mengosongkan_kunci(konekdb):
+    with konekdb.cursor() as kursor:
+        kursor.execute("INSERT INTO pengujian(tgluji, nodocket, nourutbenda) VALUES ('2024-01-05', 'D001', '01')")
+        kursor.execute("TRUNCATE pengujian")
+        kursor.execute("INSERT INTO pengujian(tgluji, nodocket, nourutbenda) VALUES ('2024-01-05', 'D001', '01')")
+    _kunci_cocok(konekdb)
+
+
+def test_skema_ulang_memindah_duplikat(konekdb):
+    from tests.conftest import SKEMA
+
+    with konekdb.cursor() as kursor:
+        kursor.execute("ALTER TABLE pengujian DISABLE TRIGGER trg_kunci_insert")
+        try:
+            kursor.execute(
+                """ INSERT INTO pengujian(idpengujian, tgluji, nodocket, nourutbenda, sinkron) VALUES
+                    (1, '2024-01-05', 'D001', '01', 'B'), (2, '2024-02-05', 'D001', '01', 'S'),
+                    (3, '2024-01-05', 'D002', '01', 'B'), (3, '2024-03-05', 'D003', '01', 'B') """
+            )
+        finally:
+            kursor.execute("ALTER TABLE pengujian ENABLE TRIGGER trg_kunci_insert")
+        kursor.execute(SKEMA.read_text(encoding="utf-8"))
+        kursor.execute("SELECT idpengujian, nodocket FROM pengujian ORDER BY 1")
+        # Baris 'S' dipertahankan; id ganda: tgluji paling awal
+        assert kursor.fetchall() == [(2, "D001"), (3, "D002")]
+        kursor.execute("SELECT idpengujian, nodocket FROM pengujian_duplikat ORDER BY 1, 2")
+        assert kursor.fetchall() == [(1, "D001"), (3, "D003")]
+    _kunci_cocok(konekdb)
@@ -0,0 +1,155 @@
+"""Prepared statement modules/dao.py dan query grid/benda uji db_controller"""
+from datetime import date
+
+import pytest
+
+psycopg2 = pytest.importorskip("psycopg2")
+
+from modules import dao, db_pool
+
+SEMUA = ["B", "P", "S", "G"]
+
+
+@pytest.fixture
+def pool(konekdb, dsn):
+    """Shared pool with a single connection, so every checkout reuses the same session"""
+    pool = db_pool.init_pool(dsn, minconn=1, maxconn=1)
+    yield pool
+    db_pool.close_pool()
+
+
+@pytest.fixture
+def data_uji(konekdb):
+    baris = [
+        (date(2024, 1, 5), "D001", "01", "K-225", 7, "S", 20.5),
+        (date(2024, 1, 5), "D001", "02", "K-225", 7, "B", 21.0),
+        (date(2024, 1, 6), "D002", "01", "K-300", 28, "P", 30.0),
+        (date(2024, 1, 7), "D003", "01", "K-300", 28, "G", 29.0),
+        (date(2024, 2, 1), "D004", "01", "K-300", 28, "B", 31.0),
+    ]
+    with konekdb.cursor() as kursor:
+        kursor.executemany(
+            """ INSERT INTO pengujian(tgluji, nodocket, nourutbenda, bujnama, umur, sinkron, bebanmpa)
+                VALUES (%s, %s, %s, %s, %s, %s, %s) """,
+            baris,
+        )
+    return baris
+
+
+def _di_server(kursor):
+    kursor.execute("SELECT name FROM pg_prepared_statements ORDER BY name")
+    return [baris[0] for baris in kursor.fetchall()]
+
+
+def test_prepare_sekali_lalu_execute(pool, data_uji):
+    with pool.connection() as konekdb:
+        with konekdb.cursor() as kursor:
+            dao.jalankan(kursor, "nourut_terakhir", ("D001",))
+            assert kursor.fetchall() == [("02",)]
+            assert konekdb.pernyataan_siap == {"nourut_terakhir"}
+            assert _di_server(kursor) == ["nourut_terakhir"]
+
+            sebelum = konekdb.jumlah_query
+            dao.jalankan(kursor, "nourut_terakhir", ("D002",))
+            assert kursor.fetchall() == [("01",)]
+            # Pemanggilan kedua hanya EXECUTE
+            assert konekdb.jumlah_query == sebelum + 1
+
+
+def test_siapkan_ulang_setelah_discard_all(pool, data_uji):
+    with pool.connection() as konekdb:
+        with konekdb.cursor() as kursor:
+            dao.jalankan(kursor, "nourut_terakhir", ("D001",))
+            kursor.execute("DISCARD ALL")
+            assert _di_server(kursor) == []
+            # Koneksi masih mengira pernyataan siap; EXECUTE gagal lalu di-PREPARE ulang
+            dao.jalankan(kursor, "nourut_terakhir", ("D001",))
+            assert kursor.fetchall() == [("02",)]
+            assert _di_server(kursor) == ["nourut_terakhir"]
+
+
+def test_siapkan_ulang_setelah_alter_table(pool, data_uji, konekdb):
+    with pool.connection() as koneksi_pool:
+        with koneksi_pool.cursor() as kursor:
+            dao.jalankan(kursor, "benda_uji", ("D001", "01"))
+            assert kursor.fetchone()[4] == "D001"
+            # Tipe kolom hasil berubah: "cached plan must not change result type"
+            with konekdb.cursor() as lain:
+                lain.execute("ALTER TABLE pengujian ALTER COLUMN bujnama TYPE VARCHAR(30)")
+            try:
+                dao.jalankan(kursor, "benda_uji", ("D001", "01"))
+                assert kursor.fetchone()[4] == "D001"
+                assert _di_server(kursor) == ["benda_uji"]
+            finally:
+                with konekdb.cursor() as lain:
+                    lain.execute("ALTER TABLE pengujian ALTER COLUMN bujnama TYPE VARCHAR(20)")
+
+
+def test_transaksi_tidak_diulang(pool, data_uji):
+    with pool.connection() as konekdb:
+        with konekdb.cursor() as kursor:
+            dao.jalankan(kursor, "nourut_terakhir", ("D001",))
+            kursor.execute("DISCARD ALL")
+            konekdb.autocommit = False
+            try:
+                # Error di dalam transaksi membatalkan transaksinya; tidak dicoba ulang, diteruskan ke pemanggil
+                with pytest.raises(psycopg2.errors.InvalidSqlStatementName):
+                    dao.jalankan(kursor, "nourut_terakhir", ("D001",))
+                assert "nourut_terakhir" in konekdb.pernyataan_siap
+            finally:
+                konekdb.rollback()
+                konekdb.autocommit = True
+
+
+def test_benda_uji_terbaru(pool, data_uji):
+    with pool.connection() as konekdb:
+        with konekdb.cursor() as kursor:
+            dao.jalankan(kursor, "benda_uji", ("D002", "01"))
+            baris = dict(zip((k.name for k in kursor.description), kursor.fetchone()))
+            assert kursor.fetchone() is None
+    assert (baris["nodocket"], baris["sinkron"], baris["umur"]) == ("D002", "P", 28)
+    assert baris["tgluji"] == date(2024, 1, 6)
+
+
+def test_grid_awal_dan_lanjut(pool, data_uji):
+    rentang = (date(2024, 1, 1), date(2024, 1, 31))
+    with pool.connection() as konekdb:
+        with konekdb.cursor() as kursor:
+            dao.jalankan(kursor, "grid_awal", rentang + (SEMUA, 2))
+            halaman1 = kursor.fetchall()
+            terakhir = halaman1[-1]
+            dao.jalankan(kursor, "grid_lanjut", rentang + (SEMUA, terakhir[1], terakhir[0], 10))
+            halaman2 = kursor.fetchall()
+            dao.jalankan(kursor, "grid_awal", rentang + (["B", "P", "G"], 10))
+            belum = kursor.fetchall()
+    assert [b[2:4] for b in halaman1] == [("D001", "01"), ("D001", "02")]
+    assert [b[2:4] for b in halaman2] == [("D002", "01"), ("D003", "01")]
+    assert [b[11] for b in belum] == ["B", "P", "G"]
+
+
+@pytest.fixture
+def dbctrl(pool):
+    pytest.importorskip("wx")
+    from modules import db_controller
+
+    return db_controller
+
+
+def test_query_benda_uji(dbctrl, data_uji):
+    baris = dbctrl.queryBendaUji(("D001 ", "02"))
+    assert (baris[4], baris[5], baris[9]) == ("D001", "02", "B")
+
+
+def test_query_grid(dbctrl, data_uji):
+    rentang = [date(2024, 1, 1), date(2024, 2, 28)]
+    semua = dbctrl.queryGrid(rentang + [dbctrl.STATUS_SINKRON["Semua"]])
+    assert [b[2] for b in semua] == ["D001", "D001", "D002", "D003", "D004"]
+    assert [b[11] for b in dbctrl.queryGrid(rentang + [dbctrl.STATUS_SINKRON["Belum"]])] == ["B", "P", "G", "B"]
+    assert [b[2] for b in dbctrl.queryGrid(rentang + [dbctrl.STATUS_SINKRON["Gagal"]])] == ["D003"]
+
+    halaman = dbctrl.queryGridHalaman(rentang + [dbctrl.STATUS_SINKRON["Semua"]], ukuran=3)
+    lanjut = dbctrl.queryGridHalaman(rentang + [dbctrl.STATUS_SINKRON["Semua"]], dbctrl.kunciHalaman(halaman[-1]))
+    assert halaman + lanjut == semua
+
+    ringkasan = dbctrl.ringkasanGrid(rentang + [dbctrl.STATUS_SINKRON["Belum"]])
+    assert (ringkasan["jumlah"], ringkasan["belum"], ringkasan["gagal"]) == (4, 3, 1)
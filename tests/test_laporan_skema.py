@@ -0,0 +1,46 @@
+"""Ukuran tabel pengujian di modules/laporan_skema.py, terpartisi dan tabel biasa"""
+import pytest
+
+pytest.importorskip("psycopg2")
+
+from modules import laporan_skema
+
+
+def _isi(kursor):
+    kursor.execute(
+        """ INSERT INTO pengujian(tgluji, nodocket, nourutbenda, bujnama, umur, bebanmpa)
+            SELECT date '2024-01-01' + (i % 60), 'D' || i, '01', 'K-225', 7, i % 40
+            FROM generate_series(1, 2000) i """
+    )
+
+
+def _periksa(hasil):
+    assert hasil["baris"] == 2000
+    assert hasil["heap_bytes"] > 0
+    assert hasil["index"] and all(nilai > 0 for nilai in hasil["index"].values())
+    assert hasil["total_bytes"] >= hasil["heap_bytes"] + hasil["index_bytes"]
+    assert hasil["lebar_baris_rata2"] > 0
+
+
+def test_ukuran_terpartisi(konekdb):
+    with konekdb.cursor() as kursor:
+        kursor.execute("SELECT relkind FROM pg_class WHERE oid = to_regclass('pengujian')")
+        assert kursor.fetchone()[0] == "p"
+        _isi(kursor)
+        kursor.execute("ANALYZE pengujian_default")
+        _periksa(laporan_skema.ukuran(kursor))
+
+
+def test_ukuran_tabel_biasa(konekdb):
+    with konekdb.cursor() as kursor:
+        kursor.execute("DROP SCHEMA IF EXISTS uji_polos CASCADE")
+        kursor.execute("CREATE SCHEMA uji_polos")
+        try:
+            kursor.execute("CREATE TABLE uji_polos.pengujian (LIKE public.pengujian INCLUDING ALL)")
+            kursor.execute("SET search_path TO uji_polos")
+            _isi(kursor)
+            kursor.execute("ANALYZE pengujian")
+            _periksa(laporan_skema.ukuran(kursor))
+        finally:
+            kursor.execute("RESET search_path")
+            kursor.execute("DROP SCHEMA uji_polos CASCADE")
@@ -0,0 +1,199 @@
+"""
+PipelinePengujian dibandingkan dengan langkah terpisah GUI pada template repo
+
+Langkah terpisah (copy_excel_data, ExcelBebanProcessor, _write_idpengujian,
+get_bjdt_ids, _generate_csv_files_logic) memakai Excel untuk menghitung rumus.
+Di sini perhitungan Excel diganti _Excel: rumus template dievaluasi per sel,
+di baris tempat rumus itu berada, dari isi workbook yang ditulis langkah
+terpisah, lalu hasilnya dibandingkan dengan kolom yang ditulis pipeline ke CSV.
+"""
+import re
+import shutil
+from decimal import Decimal, ROUND_HALF_UP
+from pathlib import Path
+
+import openpyxl
+import pandas as pd
+import pytest
+
+from modules import excel_stream, pipeline_pengujian
+from modules.excel_handler import ExcelBebanProcessor
+
+ROOT = Path(__file__).resolve().parents[1]
+TEMPLATE = ROOT / "Pengujian" / "PENGUJIAN.xlsx"
+SUMBER = ROOT / "Rencana" / "RENCANA - Copy.xlsx"
+SHEET_SUMBER = "Report Excel"
+SEED = 20240105
+ID_AWAL = 5000
+
+# Kolom RAND()/RANDBETWEEN(): Excel dan pipeline mengundi sendiri-sendiri
+KOLOM_ACAK = {"beratbenda", "tiperetak"}
+
+_REFERENSI = re.compile(r"^=(?:'([^']+)'|([A-Za-z0-9_.]+))!\$?([A-Z]{1,3})\$?(\d+)$")
+
+
+def _bjdt(doc_no, no_urut, sesi=None):
+    return f"BJ-{doc_no}-{no_urut}"
+
+
+def _bulat2(nilai):
+    return float(Decimal(str(nilai)).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP))
+
+
+class _Excel:
+    """Formula results of a saved workbook, cell by cell, for the formulas used by the template"""
+
+    ACAK = object()
+
+    def __init__(self, path):
+        self.wb = openpyxl.load_workbook(path)
+        self._hasil = {}
+
+    def nilai(self, sheet, koordinat):
+        kunci = (sheet, koordinat)
+        if kunci not in self._hasil:
+            self._hasil[kunci] = self._hitung(sheet, koordinat)
+        return self._hasil[kunci]
+
+    def _hitung(self, sheet, koordinat):
+        rumus = self.wb[sheet][koordinat].value
+        if not (isinstance(rumus, str) and rumus.startswith("=")):
+            return rumus
+        cocok = _REFERENSI.match(rumus)
+        if cocok:
+            nilai = self.nilai(cocok.group(1) or cocok.group(2), cocok.group(3) + cocok.group(4))
+            return 0 if nilai is None else nilai
+        cocok = re.fullmatch(r"=([A-Z]+)(\d+)\+1", rumus)
+        if cocok:
+            return self.nilai(sheet, cocok.group(1) + cocok.group(2)) + 1
+        cocok = re.fullmatch(r"=ROUND\(([A-Z]+)(\d+)\*101\.971/176\.71/0\.83,2\)", rumus)
+        if cocok:
+            return _bulat2(float(self.nilai(sheet, cocok.group(1) + cocok.group(2))) * 101.971 / 176.71 / 0.83)
+        cocok = re.fullmatch(r"=ROUND\(([A-Z]+)(\d+)/17671\*1000\.2,2\)", rumus)
+        if cocok:
+            return _bulat2(float(self.nilai(sheet, cocok.group(1) + cocok.group(2))) / 17671 * 1000.2)
+        if "RAND" in rumus:
+            return self.ACAK
+        raise AssertionError(f"Rumus {sheet}!{koordinat} tidak dikenal test: {rumus}")
+
+
+def _langkah_terpisah(sumber, pengujian):
+    """
+    The GUI's separate steps on `pengujian`, with _Excel in place of the Excel recalculation
+
+    Returns:
+        List of rows (dictionary column -> value) of the pengujian sheet
+    """
+    # copy_excel_data
+    with excel_stream.PembacaExcel(sumber, SHEET_SUMBER) as pembaca:
+        nama_kolom = list(pembaca.indeks(pipeline_pengujian.KOLOM_ODOO, wajib=False))
+        isi = pembaca.kolom(nama_kolom)
+    wb = openpyxl.load_workbook(pengujian)
+    ws = wb["ODOO"]
+    for i, nama in enumerate(nama_kolom):
+        for j, nilai in enumerate(isi[nama]):
+            ws.cell(row=2 + j, column=1 + i, value=nilai)
+    wb.save(pengujian)
+    beban = ExcelBebanProcessor(str(pengujian), "ODOO", seed=SEED)
+    assert beban.load_excel()
+    beban.process_all_rows(start_row=2)
+    beban.save_excel()
+    beban.close()
+    # _write_idpengujian
+    wb = openpyxl.load_workbook(pengujian)
+    wb["pengujian"]["A2"].value = ID_AWAL
+    wb.save(pengujian)
+
+    # get_bjdt_ids: Docket / No URUT hasil rumus, ID ke kolom C
+    excel = _Excel(pengujian)
+    wb = openpyxl.load_workbook(pengujian)
+    ws = wb["bjdt_id"]
+    for r in range(2, ws.max_row + 1):
+        doc_no = excel_stream.teks(excel.nilai("bjdt_id", f"A{r}"))
+        no_urut = excel_stream.teks(excel.nilai("bjdt_id", f"B{r}"))
+        if doc_no and no_urut and doc_no != "0":
+            ws[f"C{r}"].value = _bjdt(doc_no, no_urut)
+    wb.save(pengujian)
+
+    # _generate_csv_files_logic: baris rumus sheet pengujian (kolom idpengujian terisi); sel lain di
+    # bawahnya tidak punya tglrencanauji sehingga tidak masuk CSV mana pun
+    excel = _Excel(pengujian)
+    ws = excel.wb["pengujian"]
+    header = [sel.value for sel in ws[1]]
+    return [
+        {nama: excel.nilai("pengujian", f"{sel.column_letter}{r}") for nama, sel in zip(header, ws[r])}
+        for r in range(2, ws.max_row + 1)
+        if ws.cell(row=r, column=1).value is not None
+    ]
+
+
+def _pipeline(sumber, pengujian, output_dir, monkeypatch):
+    monkeypatch.setattr(pipeline_pengujian, "ambil_bjdt_id", _bjdt)
+    pipeline = pipeline_pengujian.PipelinePengujian(
+        str(sumber), SHEET_SUMBER, str(pengujian), str(output_dir), id_berikutnya=lambda: ID_AWAL, seed=SEED
+    )
+    pipeline.workbook = openpyxl.load_workbook(pengujian)
+    pipeline._periksa_template()
+    pipeline.salin()
+    pipeline.hitung_beban()
+    pipeline.next_id = pipeline.id_berikutnya()
+    pipeline.ambil_bjdt()
+    pipeline.tulis_csv()
+    header = pipeline._header("pengujian")
+    kolom = {nama: pipeline.kolom("pengujian", huruf) for nama, huruf in header.items()}
+    return pipeline, [dict(zip(kolom, baris)) for baris in zip(*kolom.values())]
+
+
+def _sama(lama, baru, tanpa=()):
+    for nama, nilai in lama.items():
+        if nama in KOLOM_ACAK or nama in tanpa:
+            continue
+        if isinstance(nilai, float) or isinstance(baru[nama], float):
+            assert float(baru[nama]) == pytest.approx(float(nilai)), nama
+        else:
+            assert baru[nama] == nilai, nama
+    assert 12.1 <= baru["beratbenda"] <= 12.5
+    assert baru["tiperetak"] in "ABCDE"
+
+
+@pytest.fixture
+def kerja(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    for nama in ("lama", "baru"):
+        shutil.copy(TEMPLATE, tmp_path / f"PENGUJIAN_{nama}.xlsx")
+    return tmp_path
+
+
+def test_sama_dengan_langkah_terpisah(kerja, monkeypatch):
+    lama = _langkah_terpisah(SUMBER, kerja / "PENGUJIAN_lama.xlsx")
+    pipeline, baru = _pipeline(SUMBER, kerja / "PENGUJIAN_baru.xlsx", kerja / "csv", monkeypatch)
+
+    assert pipeline.n == len(baru) > 0
+    for baris_lama, baris_baru in zip(lama, baru):
+        _sama(baris_lama, baris_baru)
+    # Sisa baris rumus template di langkah terpisah hanya berisi 0 (tanpa data ODOO)
+    assert all(b["nodocket"] == 0 and b["tglrencanauji"] == 0 for b in lama[len(baru):])
+
+    # CSV: satu file per tglrencanauji, berisi baris data yang sama
+    df = pd.concat(pd.read_csv(f, sep=";", encoding="utf-8-sig") for f in pipeline.file_csv)
+    assert sorted(df["idpengujian"]) == [b["idpengujian"] for b in lama[:len(baru)]]
+
+
+def test_baris_kosong_di_tengah_dilewati(kerja, monkeypatch):
+    sumber = kerja / "sumber.xlsx"
+    wb = openpyxl.load_workbook(SUMBER)
+    wb[SHEET_SUMBER].insert_rows(5, amount=2)
+    wb.save(sumber)
+
+    lama = _langkah_terpisah(sumber, kerja / "PENGUJIAN_lama.xlsx")
+    pipeline, baru = _pipeline(sumber, kerja / "PENGUJIAN_baru.xlsx", kerja / "csv", monkeypatch)
+
+    # Langkah terpisah: baris 5-6 menjadi baris berisi 0 dengan idpengujian sendiri;
+    # pipeline tidak menyertakannya dan idpengujian tetap berurutan
+    kosong = [i for i, b in enumerate(lama) if b["nodocket"] == 0]
+    assert kosong[:2] == [3, 4]
+    data_lama = [b for b in lama if b["nodocket"] != 0]
+    assert len(data_lama) == len(baru) == pipeline.n
+    for baris_lama, baris_baru in zip(data_lama, baru):
+        _sama(baris_lama, baris_baru, tanpa=("idpengujian",))
+    assert [b["idpengujian"] for b in baru] == list(range(ID_AWAL, ID_AWAL + len(baru)))
@@ -0,0 +1,115 @@
+"""Trigger ringkasan_harian (database_schema.sql bagian 13) tetap sama dengan GROUP BY pengujian"""
+from datetime import date
+
+from modules import db_pool, partisi
+
+SQL_RINGKASAN = """ SELECT tgluji, bujnama, umur, sinkron, jumlah, jumlah_mpa, total_mpa
+    FROM ringkasan_harian
+    WHERE jumlah <> 0 OR jumlah_mpa <> 0 OR total_mpa <> 0
+    ORDER BY 1, 2, 3, 4 """
+
+SQL_PENGUJIAN = """ SELECT tgluji, COALESCE(rtrim(bujnama), ''), COALESCE(umur, -1), COALESCE(sinkron, ''),
+        count(*), count(bebanmpa), COALESCE(sum(bebanmpa), 0)
+    FROM pengujian
+    WHERE tgluji IS NOT NULL
+    GROUP BY 1, 2, 3, 4
+    ORDER BY 1, 2, 3, 4 """
+
+
+def _cocok(konekdb):
+    with konekdb.cursor() as kursor:
+        kursor.execute(SQL_RINGKASAN)
+        ringkasan = kursor.fetchall()
+        kursor.execute(SQL_PENGUJIAN)
+        harapan = kursor.fetchall()
+    assert ringkasan == harapan
+    return ringkasan
+
+
+def _isi(konekdb):
+    baris = [
+        (date(2024, 1, 5), "D001", "01", "K-225", 7, "B", 20.5),
+        (date(2024, 1, 5), "D001", "02", "K-225", 7, "B", None),
+        (date(2024, 1, 5), "D002", "01", "K-300", 28, "S", 30.25),
+        (date(2024, 2, 1), "D003", "01", None, None, "B", 18.0),
+        (None, "D004", "01", "K-225", 7, "B", 19.0),
+    ]
+    with konekdb.cursor() as kursor:
+        kursor.executemany(
+            """ INSERT INTO pengujian(tgluji, nodocket, nourutbenda, bujnama, umur, sinkron, bebanmpa)
+                VALUES (%s, %s, %s, %s, %s, %s, %s) """,
+            baris,
+        )
+
+
+def test_insert(konekdb):
+    _isi(konekdb)
+    ringkasan = _cocok(konekdb)
+    # bujnama NULL -> '' dan umur NULL -> -1; tgluji NULL tidak diringkas
+    assert (date(2024, 2, 1), "", -1, "B", 1, 1, 18) in ringkasan
+    assert sum(r[4] for r in ringkasan) == 4
+
+
+def test_insert_banyak_baris_satu_statement(konekdb):
+    with konekdb.cursor() as kursor:
+        kursor.execute(
+            """ INSERT INTO pengujian(tgluji, nodocket, nourutbenda, bujnama, umur, bebanmpa)
+                SELECT date '2024-03-01' + (i % 10), 'D' || i, '01', 'K-' || (i % 3), 7, i % 40
+                FROM generate_series(1, 500) i """
+        )
+    _cocok(konekdb)
+
+
+def test_update(konekdb):
+    _isi(konekdb)
+    with konekdb.cursor() as kursor:
+        kursor.execute("UPDATE pengujian SET sinkron = 'S' WHERE nodocket = 'D001'")
+        kursor.execute("UPDATE pengujian SET bebanmpa = 25 WHERE nodocket = 'D001' AND nourutbenda = '02'")
+        kursor.execute("UPDATE pengujian SET bujnama = 'K-350', umur = 14 WHERE nodocket = 'D002'")
+        # Kolom di luar ringkasan: tidak ada kelompok yang berubah
+        kursor.execute("UPDATE pengujian SET klaim_sampai = now()")
+    ringkasan = _cocok(konekdb)
+    assert (date(2024, 1, 5), "K-225", 7, "S", 2, 2, 45.5) in ringkasan
+
+
+def test_update_pindah_partisi(konekdb):
+    _isi(konekdb)
+    with konekdb.cursor() as kursor:
+        kursor.execute("UPDATE pengujian SET tgluji = date '2024-04-10' WHERE nodocket = 'D003'")
+        kursor.execute("UPDATE pengujian SET tgluji = date '2024-01-06' WHERE tgluji IS NULL")
+        kursor.execute("UPDATE pengujian SET tgluji = NULL WHERE nodocket = 'D002'")
+    _cocok(konekdb)
+
+
+def test_delete(konekdb):
+    _isi(konekdb)
+    with konekdb.cursor() as kursor:
+        kursor.execute("DELETE FROM pengujian WHERE nodocket = 'D001' AND nourutbenda = '01'")
+        kursor.execute("DELETE FROM pengujian WHERE nodocket = 'D003'")
+    ringkasan = _cocok(konekdb)
+    assert sum(r[4] for r in ringkasan) == 2
+
+
+def test_bangun_ulang(konekdb):
+    _isi(konekdb)
+    with konekdb.cursor() as kursor:
+        kursor.execute("UPDATE pengujian SET sinkron = 'S'")
+        kursor.execute("SELECT ringkasan_harian_bangun_ulang()")
+        # Kelompok yang menjadi 0 ikut dibersihkan
+        kursor.execute("SELECT count(*) FROM ringkasan_harian WHERE jumlah = 0")
+        assert kursor.fetchone()[0] == 0
+    _cocok(konekdb)
+
+
+def test_lepas_partisi(konekdb, dsn):
+    _isi(konekdb)
+    with konekdb.cursor() as kursor:
+        partisi.buat_partisi(kursor, date(2024, 1, 1))
+    db_pool.init_pool(dsn, minconn=1, maxconn=1)
+    try:
+        assert partisi.lepas_partisi(date(2024, 2, 1), hapus=True) == ["pengujian_p2024_01"]
+    finally:
+        db_pool.close_pool()
+    # Bulan yang dilepas tidak lagi dihitung; trigger pengujian tidak jalan saat DETACH
+    ringkasan = _cocok(konekdb)
+    assert [r[0] for r in ringkasan] == [date(2024, 2, 1)]